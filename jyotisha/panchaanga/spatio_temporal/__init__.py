@@ -1,15 +1,19 @@
 #!/usr/bin/python3
 #  -*- coding: utf-8 -*-
 
+import bisect
 import logging
 import os
 import sys
 
+import methodtools
+import numpy
 import swisseph as swe
 
 from jyotisha import custom_transliteration
 from jyotisha.custom_transliteration import sexastr2deci
 from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
+from jyotisha.panchaanga.spatio_temporal import rise_set_store
 from sanskrit_data.schema import common
 from sanskrit_data.schema.common import JsonObject
 
@@ -71,13 +75,51 @@ class City(JsonObject):
     city = City(name=address, latitude=location.latitude, longitude=location.longitude, timezone=timezone_str)
     return city
 
+  @methodtools.lru_cache(maxsize=None)
   @classmethod
-  def get_city_from_db(cls, name):
+  def _get_city_db(cls):
     import pandas
-    df = pandas.read_csv(os.path.join(os.path.dirname(__file__), "data", "places_lat_lon_tz_db.tsv"), sep="\t", index_col="Name", keep_default_na=False)
+    return pandas.read_csv(os.path.join(os.path.dirname(__file__), "data", "places_lat_lon_tz_db.tsv"), sep="\t", index_col="Name", keep_default_na=False)
+
+  @classmethod
+  def get_city_from_db(cls, name):
+    df = cls._get_city_db()
     city = City(name=name, name_hk=df.at[name, "saMskRta-nAma"], latitude=df.at[name, "Lat"], longitude=df.at[name, "Long"], timezone=df.at[name, "Timezone"])
     return city
 
+  @methodtools.lru_cache(maxsize=None)
+  @classmethod
+  def _get_db_coordinates(cls):
+    """Names, and latitudes and longitudes (in radians) of cities in the db."""
+    df = cls._get_city_db()
+    cities = [City(name=name, latitude=row["Lat"], longitude=row["Long"], timezone=row["Timezone"]) for name, row in df.iterrows()]
+    return ([city.name for city in cities], numpy.radians([city.latitude for city in cities]), numpy.radians([city.longitude for city in cities]))
+
+  @classmethod
+  def get_nearest_city_from_db(cls, latitude, longitude, max_distance_km=None):
+    """The city in the db nearest to the given location - None if farther than max_distance_km.
+
+    Lets callers reuse results precomputed (or cached) for that city.
+    """
+    location = City(name="", latitude=latitude, longitude=longitude, timezone=None)
+    (names, latitudes, longitudes) = cls._get_db_coordinates()
+    latitude = numpy.radians(location.latitude)
+    longitude = numpy.radians(location.longitude)
+    # Haversine formula.
+    a = numpy.sin((latitudes - latitude) / 2) ** 2 + numpy.cos(latitude) * numpy.cos(latitudes) * numpy.sin((longitudes - longitude) / 2) ** 2
+    distances_km = 2 * 6371.0 * numpy.arcsin(numpy.sqrt(a))
+    index = int(numpy.argmin(distances_km))
+    if max_distance_km is not None and distances_km[index] > max_distance_km:
+      return None
+    return cls.get_city_from_db(name=names[index])
+
+  def get_quantized(self, step):
+    """This location snapped to a grid of the given step (in degrees) - so that results for nearby locations can be cached together.
+
+    Error bound: with a step of 0.01 degrees, sunrise at the snapped location is within about 2 seconds of that at the actual location up to 45 degrees latitude (about 4.5 seconds at 60 degrees). The error grows in proportion to the step.
+    """
+    return City(name="", latitude=round(round(self.latitude / step) * step, 6), longitude=round(round(self.longitude / step) * step, 6), timezone=self.timezone)
+
   def get_transliterated_name(self, script):
     if self.name_hk is not None and self.name_hk != "":
       return custom_transliteration.tr(self.name_hk, script)
@@ -87,27 +129,54 @@ class City(JsonObject):
   def __repr__(self):
     return self.name
 
-  def get_rising_time(self, julian_day_start, body):
+  def _get_rise_trans_time(self, julian_day_start, body, rsmi):
     from jyotisha.panchaanga.temporal.body import Graha
     graha = Graha.singleton(body)
-    if body == Graha.KETU:
-      return self.get_setting_time(julian_day_start=julian_day_start, body=Graha.RAHU)
     # rise_trans expects UT time
     return swe.rise_trans(
       julian_day_start, body=graha._get_swisseph_id(),
       geopos=[self.longitude, self.latitude, 0],
-      rsmi=CALC_RISE)[1][0]
+      rsmi=rsmi)[1][0]
+
+  def _get_event_time(self, julian_day_start, body, event, rsmi):
+    compute_fn = lambda: self._get_rise_trans_time(julian_day_start=julian_day_start, body=body, rsmi=rsmi)
+    store = rise_set_store.get_store()
+    if store is None:
+      return compute_fn()
+    return store.get_event_time(latitude=self.latitude, longitude=self.longitude, body=body, event=event, jd_start=julian_day_start, compute_fn=compute_fn)
+
+  def get_rising_time(self, julian_day_start, body):
+    from jyotisha.panchaanga.temporal.body import Graha
+    if body == Graha.KETU:
+      return self.get_setting_time(julian_day_start=julian_day_start, body=Graha.RAHU)
+    return self._get_event_time(julian_day_start=julian_day_start, body=body, event=rise_set_store.EVENT_RISE, rsmi=CALC_RISE)
 
   def get_setting_time(self, julian_day_start, body):
     from jyotisha.panchaanga.temporal.body import Graha
-    graha = Graha.singleton(body)
     if body == Graha.KETU:
       return self.get_rising_time(julian_day_start=julian_day_start, body=Graha.RAHU)
-    # rise_trans expects UT time
-    return swe.rise_trans(
-      julian_day_start, body=graha._get_swisseph_id(),
-      geopos=[self.longitude, self.latitude, 0],
-      rsmi=CALC_SET)[1][0]
+    return self._get_event_time(julian_day_start=julian_day_start, body=body, event=rise_set_store.EVENT_SET, rsmi=CALC_SET)
+
+  def _get_event_times(self, jd_start, jd_end, get_event_time):
+    jd = jd_start
+    event_jds = []
+    while jd < jd_end:
+      jd_event = get_event_time(jd)
+      # rise_trans returns 0 (or less) if the body does not rise or set - as beyond the polar circles.
+      if jd_event <= 0 or jd_event >= jd_end:
+        break
+      event_jds.append(jd_event)
+      # The next search is seeded just after the previous event. No body rises (or sets) twice within 30 minutes.
+      jd = jd_event + 1/48.0
+    return numpy.array(event_jds)
+
+  def get_rising_times(self, jd_start, jd_end, body):
+    """All risings of body in [jd_start, jd_end), as a sorted numpy array."""
+    return self._get_event_times(jd_start=jd_start, jd_end=jd_end, get_event_time=lambda jd: self.get_rising_time(julian_day_start=jd, body=body))
+
+  def get_setting_times(self, jd_start, jd_end, body):
+    """All settings of body in [jd_start, jd_end), as a sorted numpy array."""
+    return self._get_event_times(jd_start=jd_start, jd_end=jd_end, get_event_time=lambda jd: self.get_setting_time(julian_day_start=jd, body=body))
 
   def get_solar_eclipse_time(self, jd_start):
     return swe.sol_eclipse_when_loc(jd_start, geopos=[self.longitude, self.latitude, 0],)
@@ -123,6 +192,18 @@ class City(JsonObject):
     """
     return swe.houses_ex(jd, self.latitude, self.longitude)[1][0]
 
+  def get_lagna_floats(self, jds, ayanaamsha_id=Ayanamsha.CHITRA_AT_180):
+    """Batch approximation of get_lagna_float over jds spanning a day or so - for locating lagna changes, which are then refined with get_lagna_float.
+
+    The ascendant is computed from the sidereal time (taken to advance uniformly from jds[0]), and the obliquity and ayanaamsha (taken to be constant) - within an arcsecond or so of swe.houses_ex.
+    """
+    jds = numpy.asarray(jds, dtype=float)
+    jd_start = jds.flat[0]
+    obliquity = numpy.radians(swe.calc_ut(jd_start, swe.ECL_NUT)[0][0])
+    ramc = numpy.radians(swe.sidtime(jd_start) * 15 + self.longitude + (jds - jd_start) * 360.98564736629)
+    ascendant = numpy.degrees(numpy.arctan2(numpy.cos(ramc), -(numpy.sin(ramc) * numpy.cos(obliquity) + numpy.tan(numpy.radians(self.latitude)) * numpy.sin(obliquity))))
+    return ((ascendant - Ayanamsha.singleton(ayanaamsha_id=ayanaamsha_id).get_offset(jd=jd_start)) % 360) / 30
+
   def get_lagna_float(self, jd, offset=0, ayanaamsha_id=Ayanamsha.CHITRA_AT_180, debug=False):
     """Returns the rising rAshi at a given location.
 
@@ -160,16 +241,83 @@ class City(JsonObject):
   def get_sunsets_in_period(self, jd_start, jd_end):
     if jd_start > jd_end:
       raise ValueError((jd_start, jd_end))
-    jd = jd_start
-    sunset_jds = []
-    while jd < jd_end:
-      from jyotisha.panchaanga.temporal.body import Graha
-      jd_setting = self.get_setting_time(julian_day_start=jd, body=Graha.SUN)
-      if jd_setting < jd_end:
-        sunset_jds.append(jd_setting)
-      # Assume that night lasts atleast 30 minutes!
-      jd = jd_setting + 1/48.0
-    return sunset_jds
+    from jyotisha.panchaanga.temporal.body import Graha
+    return self.get_setting_times(jd_start=jd_start, jd_end=jd_end, body=Graha.SUN).tolist()
+
+
+class RiseSetTimes(object):
+  """Risings and settings of some bodies at a city over a period, computed in one sweep per body.
+
+  Daily panchaangas look up the first event after a given time here, rather than calling rise_trans afresh.
+  """
+
+  def __init__(self, city, jd_start, jd_end, bodies):
+    from jyotisha.panchaanga.temporal.body import Graha
+    self.jd_start = jd_start
+    self.jd_end = jd_end
+    self.rising_jds = {}
+    self.setting_jds = {}
+    for body in bodies:
+      if body == Graha.KETU and Graha.RAHU in bodies:
+        continue
+      self.rising_jds[body] = city.get_rising_times(jd_start=jd_start, jd_end=jd_end, body=body).tolist()
+      self.setting_jds[body] = city.get_setting_times(jd_start=jd_start, jd_end=jd_end, body=body).tolist()
+    if Graha.KETU in bodies and Graha.RAHU in bodies:
+      # Ketu rises when Rahu sets, and vice versa.
+      self.rising_jds[Graha.KETU] = self.setting_jds[Graha.RAHU]
+      self.setting_jds[Graha.KETU] = self.rising_jds[Graha.RAHU]
+
+  def _get_next_event_time(self, event_jds, jd):
+    if event_jds is None or jd < self.jd_start:
+      return None
+    index = bisect.bisect_right(event_jds, jd)
+    if index >= len(event_jds):
+      return None
+    return event_jds[index]
+
+  def get_rising_time(self, julian_day_start, body):
+    """First rising after julian_day_start - None if not covered."""
+    return self._get_next_event_time(event_jds=self.rising_jds.get(body, None), jd=julian_day_start)
+
+  def get_setting_time(self, julian_day_start, body):
+    """First setting after julian_day_start - None if not covered."""
+    return self._get_next_event_time(event_jds=self.setting_jds.get(body, None), jd=julian_day_start)
+
+
+class SunsetTimes(object):
+  """Sunsets at a city over a period, computed in one sweep - so that sunsets within sub-periods (as in counting solar and tropical month days) are counted by bisection, rather than with a fresh rise_trans loop each time."""
+  # Process-level cache (see get_cached) blocks - each with a margin before it, for counts over a month or so before a day in the block.
+  BLOCK_DAYS = 32
+  BLOCK_MARGIN_DAYS = 40
+
+  def __init__(self, city, jd_start, jd_end):
+    from jyotisha.panchaanga.temporal.body import Graha
+    self.jd_start = jd_start
+    self.jd_end = jd_end
+    self.sunset_jds = city.get_setting_times(jd_start=jd_start, jd_end=jd_end, body=Graha.SUN).tolist()
+
+  def covers(self, jd_start, jd_end):
+    return self.jd_start <= jd_start and jd_end <= self.jd_end
+
+  def get_num_sunsets_in_period(self, jd_start, jd_end):
+    """Same as len(City.get_sunsets_in_period(...)), for periods covered."""
+    if jd_start > jd_end:
+      raise ValueError((jd_start, jd_end))
+    return bisect.bisect_left(self.sunset_jds, jd_end) - bisect.bisect_right(self.sunset_jds, jd_start)
+
+  @methodtools.lru_cache(maxsize=1024)
+  @classmethod
+  def _get_block(cls, latitude, longitude, block_index):
+    block_start = block_index * cls.BLOCK_DAYS
+    return cls(city=City(name="", latitude=latitude, longitude=longitude, timezone=None), jd_start=block_start - cls.BLOCK_MARGIN_DAYS, jd_end=block_start + cls.BLOCK_DAYS)
+
+  @classmethod
+  def get_cached(cls, city, jd_start, jd_end):
+    """Sunset times covering the period (if it is no longer than BLOCK_MARGIN_DAYS), shared by all daily panchaangas computed in this process for the city - None if the period is too long."""
+    sunset_times = cls._get_block(city.latitude, city.longitude, int(jd_end // cls.BLOCK_DAYS))
+    if not sunset_times.covers(jd_start=jd_start, jd_end=jd_end):
+      return None
+    return sunset_times
 
 
 # Essential for depickling to work.
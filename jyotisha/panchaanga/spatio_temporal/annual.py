@@ -1,11 +1,16 @@
+import glob
+import hashlib
 import logging
 import os
 import sys
 import traceback
 
-from jyotisha.panchaanga.spatio_temporal import periodical
+from jyotisha.panchaanga.spatio_temporal import periodical, columnar
+from jyotisha import util
+from jyotisha.util import default_if_none
 from jyotisha.panchaanga.spatio_temporal.periodical import Panchaanga
 from jyotisha.panchaanga.temporal import ComputationSystem, set_constants, time, era
+from jyotisha.panchaanga.temporal.festival import rules
 from jyotisha.panchaanga.temporal.festival.rules import RulesRepo
 from jyotisha.panchaanga.temporal.time import Date, Timezone
 from jyotisha.panchaanga.temporal.body import Graha
@@ -25,9 +30,107 @@ def load_panchaanga(fname, fallback_fn):
     logging.warning("Precomputed Panchanga obsolete.")
     return fallback_fn()
   else:
-    panchaanga.dump_to_file(filename=fname)
     return panchaanga
-  
+
+
+def get_festivals_hash(computation_system, compute_shraadha_tithis=False):
+  """Key for stored festival layers - those computed with the same rules and festival options are reusable."""
+  festival_options = computation_system.festival_options
+  hasher = hashlib.sha256()
+  hasher.update(rules.get_repos_hash(repos=festival_options.repos).encode("utf-8"))
+  # A copy, rather than the (possibly shared) computation system's own options, is stripped of repos - which are hashed above.
+  festival_options = util.shallow_copy(festival_options)
+  festival_options.repos = None
+  hasher.update(festival_options.to_string(format="toml").encode("utf-8"))
+  hasher.update(str(compute_shraadha_tithis).encode("utf-8"))
+  return hasher.hexdigest()[:16]
+
+
+def get_festivals_file_path(fname, festivals_hash):
+  return "%s__festivals_%s.json" % (fname[:-len(".json")], festivals_hash)
+
+
+def remove_other_festivals_files(fname, festivals_hash):
+  """Festival layers computed with other rules (or options) are not going to be used again."""
+  for file_path in glob.glob(get_festivals_file_path(fname=glob.escape(fname), festivals_hash="*")):
+    if file_path != get_festivals_file_path(fname=fname, festivals_hash=festivals_hash):
+      logging.info("Removing stale festivals file %s", file_path)
+      os.remove(file_path)
+
+
+def get_astronomy_store_path(fname):
+  return "%s__astronomy" % fname[:-len(".json")]
+
+
+def load_panchaanga_from_store(store_path):
+  """Load a panchaanga stored in columnar format - None if the store is missing or obsolete."""
+  if not os.path.isfile(os.path.join(store_path, columnar.HEADER_FILE)):
+    return None
+  try:
+    store = columnar.load(dir_path=store_path)
+  except ValueError:
+    logging.warning("Unsupported panchaanga store at %s", store_path)
+    return None
+  if store.panchaanga_map.get("version", None) != periodical.Panchaanga.LATEST_VERSION:
+    logging.warning("Precomputed Panchanga obsolete.")
+    return None
+  logging.info('Loaded pre-computed panchaanga from %s.' % store_path)
+  return store.get_panchaanga()
+
+
+def get_panchaanga_with_festivals(fname, compute_astronomy_fn, computation_system, allow_precomputed=True, recompute_festivals=True, compute_shraadha_tithis=False):
+  """Get a panchaanga, reusing its stored astronomical and festival layers where possible.
+
+  The astronomical layer is stored in columnar format (see get_astronomy_store_path), and the festival layer separately alongside - keyed by get_festivals_hash. So, a change in festival rules (the most common reason for regeneration) needs only a festival recomputation.
+
+  :param compute_astronomy_fn: Computes the panchaanga without festivals.
+  :param recompute_festivals: If False, festivals are never computed afresh - the panchaanga comes without festivals unless a festival layer for the current rules is stored.
+  """
+  computation_system = default_if_none(computation_system, ComputationSystem.DEFAULT)
+  # Panchaangas computed with only some outputs (see ComputationSystem.needed_outputs) may use stored layers, but are not stored themselves - lest full runs load them.
+  is_projected = computation_system.needed_outputs is not None
+  store_path = get_astronomy_store_path(fname=fname)
+  panchaanga = None
+  if allow_precomputed:
+    panchaanga = load_panchaanga_from_store(store_path=store_path)
+  if panchaanga is None:
+    logging.info('No precomputed data available or allowed. Computing panchaanga...\n')
+    panchaanga = compute_astronomy_fn()
+    if not is_projected:
+      logging.info('Writing computed panchaanga to %s...\n' % store_path)
+      try:
+        with panchaanga.festivals_removed():
+          columnar.dump(panchaanga=panchaanga, dir_path=store_path)
+      except EnvironmentError:
+        logging.warning("Not able to save.")
+        logging.error(traceback.format_exc())
+  else:
+    # Fest repos to be used might have changed in this call.
+    panchaanga.computation_system = computation_system
+    panchaanga._refill_daily_panchaangas()
+
+  if not computation_system.needs_festivals():
+    return panchaanga
+  festivals_hash = get_festivals_hash(computation_system=computation_system, compute_shraadha_tithis=compute_shraadha_tithis)
+  festivals_fname = get_festivals_file_path(fname=fname, festivals_hash=festivals_hash)
+  if allow_precomputed and os.path.isfile(festivals_fname):
+    logging.info('Loaded pre-computed festivals from %s.' % festivals_fname)
+    panchaanga.set_festivals(festivals=periodical.PanchaangaFestivals.read_from_file(filename=festivals_fname))
+  elif recompute_festivals:
+    # With the same numerics as a fresh computation.
+    with panchaanga.approximations_in_use():
+      panchaanga.update_festival_details(compute_shraadha_tithis=compute_shraadha_tithis)
+    if is_projected:
+      return panchaanga
+    try:
+      panchaanga.get_festivals(rules_hash=festivals_hash).dump_to_file(filename=festivals_fname)
+      remove_other_festivals_files(fname=fname, festivals_hash=festivals_hash)
+    except EnvironmentError:
+      logging.warning("Not able to save festivals.")
+      logging.error(traceback.format_exc())
+  return panchaanga
+
+
 def get_kali_year_jds(year):
   """
   Returns the start and end Julian days for the given Kali year.
@@ -41,83 +144,46 @@ def get_kali_year_jds(year):
 def get_panchaanga_for_kali_year(city, year, precomputed_json_dir="~/Documents/jyotisha", computation_system: ComputationSystem = None, allow_precomputed=True, recompute_festivals=True, include_next_year_first_day=False):
   year = int(year)
   fname = os.path.expanduser('%s/%s__kali_%s__%s.json' % (precomputed_json_dir, city.name, year, computation_system))
-  if os.path.isfile(fname) and allow_precomputed:
-    fn = lambda: get_panchaanga_for_kali_year(city=city, year=year, precomputed_json_dir=precomputed_json_dir,
-                                               computation_system=computation_system, allow_precomputed=False)
-    panchaanga = load_panchaanga(fname=fname, fallback_fn=fn)
-    # Fest repos to be used might have changed in this call.
-    panchaanga.computation_system = computation_system
-    if recompute_festivals:
-      panchaanga.update_festival_details(compute_shraadha_tithis=True)
-    return panchaanga
-  else:
-    logging.info('No precomputed data available or allowed. Computing panchaanga...\n')
+
+  def compute_astronomy():
     mesha_start, mina_end = get_kali_year_jds(year=year)
     jd_next_sunset_start_mesha = city.get_setting_time(julian_day_start=mesha_start, body=Graha.SUN)
     jd_preceding_sunset_end_mina = city.get_setting_time(julian_day_start=mina_end - 1, body=Graha.SUN)
     tz = Timezone(city.timezone)
     panchaanga = periodical.Panchaanga(city=city, start_date=tz.julian_day_to_local_time(julian_day=jd_next_sunset_start_mesha), end_date=tz.julian_day_to_local_time(julian_day=jd_preceding_sunset_end_mina + include_next_year_first_day), year_type = era.ERA_KALI, computation_system=computation_system, recompute_festivals=False)
-    panchaanga.update_festival_details(compute_shraadha_tithis=True)
     panchaanga.year = year
-    # Festival data may be updated more frequently and a precomputed panchaanga may go out of sync. Hence we keep this method separate.
-    logging.info('Writing computed panchaanga to %s...\n' % fname)
-
-    try:
-      panchaanga.dump_to_file(filename=fname)
-    except EnvironmentError:
-      logging.warning("Not able to save.")
-      logging.error(traceback.format_exc())
     return panchaanga
 
+  return get_panchaanga_with_festivals(fname=fname, compute_astronomy_fn=compute_astronomy, computation_system=computation_system, allow_precomputed=allow_precomputed, recompute_festivals=recompute_festivals, compute_shraadha_tithis=True)
+
 
 def get_panchaanga_for_shaka_year(city, year, precomputed_json_dir="~/Documents/jyotisha", computation_system: ComputationSystem = None, allow_precomputed=True):
   fname = os.path.expanduser('%s/%s__shaka_%s__%s.json' % (precomputed_json_dir, city.name, year, computation_system))
-  if os.path.isfile(fname) and allow_precomputed:
-    fn = lambda: get_panchaanga_for_shaka_year(city=city, year=year, precomputed_json_dir=precomputed_json_dir,
-                                               computation_system=computation_system, allow_precomputed=False)
-    panchaanga = load_panchaanga(fname=fname, fallback_fn=fn)
-    # Fest repos to be used might have changed in this call.
-    panchaanga.computation_system = computation_system
-    panchaanga.update_festival_details(compute_shraadha_tithis=True)
-    return panchaanga
-  else:
-    logging.info('No precomputed data available. Computing panchaanga...\n')
-    SHAKA_CIVIL_ERA_DIFF = 78
+
+  def compute_astronomy():
     start_year_civil = year + era.get_year_0_offset(era_id=era.ERA_SHAKA)
     anga_span_finder = AngaSpanFinder.get_cached(ayanaamsha_id=Ayanamsha.ASHVINI_STARTING_0, anga_type=AngaType.GRAHA_RASHI[Graha.SUN])
     start_equinox = anga_span_finder.find(jd1=time.utc_gregorian_to_jd(Date(year=start_year_civil, month=3, day=1)), jd2=time.utc_gregorian_to_jd(Date(year=start_year_civil, month=5, day=1)), target_anga_id=1)
     end_equinox = anga_span_finder.find(jd1=time.utc_gregorian_to_jd(Date(year=start_year_civil  + 1, month=3, day=1)), jd2=time.utc_gregorian_to_jd(Date(year=start_year_civil + 1, month=5, day=1)), target_anga_id=1)
     tz = Timezone(city.timezone)
-    panchaanga = periodical.Panchaanga(city=city, start_date=tz.julian_day_to_local_time(julian_day=start_equinox.jd_start), end_date=tz.julian_day_to_local_time(julian_day=end_equinox.jd_start), year_type = era.ERA_SHAKA, computation_system=computation_system)
+    panchaanga = periodical.Panchaanga(city=city, start_date=tz.julian_day_to_local_time(julian_day=start_equinox.jd_start), end_date=tz.julian_day_to_local_time(julian_day=end_equinox.jd_start), year_type = era.ERA_SHAKA, computation_system=computation_system, recompute_festivals=False)
     panchaanga.year = year
-    # Festival data may be updated more frequently and a precomputed panchaanga may go out of sync. Hence we keep this method separate.
-    logging.info('Writing computed panchaanga to %s...\n' % fname)
-
-    try:
-      panchaanga.dump_to_file(filename=fname)
-    except EnvironmentError:
-      logging.warning("Not able to save.")
-      logging.error(traceback.format_exc())
     return panchaanga
 
+  return get_panchaanga_with_festivals(fname=fname, compute_astronomy_fn=compute_astronomy, computation_system=computation_system, allow_precomputed=allow_precomputed, compute_shraadha_tithis=True)
+
 
 def get_panchaanga_for_civil_year(city, year, precomputed_json_dir="~/Documents/jyotisha",
                                   computation_system: ComputationSystem = None, allow_precomputed=True):
   fname = os.path.expanduser('%s/%s__gregorian_%s__%s.json' % (precomputed_json_dir, city.name, year, computation_system))
-  if os.path.isfile(fname) and allow_precomputed:
-    fn = lambda: get_panchaanga_for_civil_year(city=city, year=year, precomputed_json_dir=precomputed_json_dir,
-                                            computation_system=computation_system, allow_precomputed=False)
-    panchaanga = load_panchaanga(fname=fname, fallback_fn=fn)
-    return panchaanga
-  else:
-    logging.info('No precomputed data available or allowed. Computing panchaanga...\n')
-    panchaanga = periodical.Panchaanga(city=city, start_date='%d-01-01' % year, end_date='%d-12-31' % year, year_type = era.ERA_GREGORIAN, computation_system=computation_system)
-    panchaanga.year = year
-    logging.info('Writing computed panchaanga to %s...\n' % fname)
 
-    panchaanga.dump_to_file(filename=fname)
+  def compute_astronomy():
+    panchaanga = periodical.Panchaanga(city=city, start_date='%d-01-01' % year, end_date='%d-12-31' % year, year_type = era.ERA_GREGORIAN, computation_system=computation_system, recompute_festivals=False)
+    panchaanga.year = year
     return panchaanga
 
+  return get_panchaanga_with_festivals(fname=fname, compute_astronomy_fn=compute_astronomy, computation_system=computation_system, allow_precomputed=allow_precomputed)
+
 
 def get_panchaanga_for_year(city, year, year_type, computation_system, allow_precomputed=True):
   if year_type == era.ERA_GREGORIAN:
@@ -0,0 +1,353 @@
+"""
+Columnar storage of periodical panchaangas - a compact and fast alternative to JSON (dump_to_file/ read_from_file).
+
+A store is a directory holding:
+
+- header.json - the panchaanga sans daily panchaangas, the column paths and interned strings.
+- scalars.npy - a (day, column) matrix of the leaf values in daily panchaanga json maps (NaN where absent). A column is a (path, type) pair; strings are stored as indices into the interned string list.
+- anga_spans.npy - one row (day, path, position, anga type, anga index, jd_start, jd_end) per AngaSpan in daily panchaangas.
+- festivals.npy - one row (day, festival id, name, ordinal, interval) per festival instance.
+
+Arrays are memory mapped while loading, so opening a store takes milliseconds; daily panchaangas are materialized only when asked for. JSON remains available as an export format (see PanchaangaStore.dump_json).
+"""
+import json
+import logging
+import os
+import shutil
+
+import numpy
+from sanskrit_data import collection_helper
+from sanskrit_data.schema import common
+from timebudget import timebudget
+
+FORMAT_VERSION = 1
+HEADER_FILE = "header.json"
+SCALARS_FILE = "scalars.npy"
+ANGA_SPANS_FILE = "anga_spans.npy"
+FESTIVALS_FILE = "festivals.npy"
+
+TYPE_FIELD = common.TYPE_FIELD
+
+# Leaf types in scalar columns.
+FLOAT = "f"
+INT = "i"
+BOOL = "b"
+STRING = "s"
+NONE = "n"
+EMPTY_DICT = "d"
+EMPTY_LIST = "l"
+
+ANGA_SPAN_DTYPE = numpy.dtype([("day", "i4"), ("path", "i4"), ("position", "i4"), ("anga_class", "i4"), ("anga_type", "i4"), ("anga_index", "i4"), ("jd_start", "f8"), ("jd_end", "f8")])
+# String indices are -1 (and floats NaN) where absent.
+FESTIVAL_DTYPE = numpy.dtype([("day", "i4"), ("festival_id", "i4"), ("name", "i4"), ("ordinal", "i4"), ("interval_name", "i4"), ("jd_start", "f8"), ("jd_end", "f8")])
+
+
+class _ListItems(dict):
+  """Items of a list under reconstruction, keyed by position."""
+
+
+def _is_float(value):
+  return isinstance(value, float) or (value is None)
+
+
+def _is_anga_span_map(value):
+  if not isinstance(value, dict) or value.get(TYPE_FIELD, None) != "AngaSpan" or not set(value.keys()) <= {TYPE_FIELD, "anga", "jd_start", "jd_end"}:
+    return False
+  anga = value.get("anga", None)
+  return isinstance(anga, dict) and set(anga.keys()) == {TYPE_FIELD, "anga_type_id", "index"} and isinstance(anga["index"], int) and isinstance(anga["anga_type_id"], str) and _is_float(value.get("jd_start", None)) and _is_float(value.get("jd_end", None))
+
+
+def _is_festival_instance_map(value):
+  if not isinstance(value, dict) or value.get(TYPE_FIELD, None) != "FestivalInstance" or not set(value.keys()) <= {TYPE_FIELD, "name", "interval", "ordinal"}:
+    return False
+  ordinal = value.get("ordinal", 0)
+  if not isinstance(value.get("name", ""), str) or not isinstance(ordinal, int) or isinstance(ordinal, bool) or ordinal < 0:
+    return False
+  interval = value.get("interval", None)
+  if interval is None:
+    return True
+  return isinstance(interval, dict) and interval.get(TYPE_FIELD, None) == "Interval" and set(interval.keys()) <= {TYPE_FIELD, "name", "jd_start", "jd_end"} and isinstance(interval.get("name", ""), str) and _is_float(interval.get("jd_start", None)) and _is_float(interval.get("jd_end", None))
+
+
+def _none_to_nan(value):
+  return numpy.nan if value is None else value
+
+
+class _Shredder(object):
+  """Splits daily panchaanga json maps into columns and tables."""
+
+  def __init__(self):
+    self.strings = []
+    self._string_to_id = {}
+    self.columns = []
+    self._column_to_id = {}
+    self.anga_span_paths = []
+    self._anga_span_path_to_id = {}
+    self.day_to_leaves = []
+    self.anga_span_rows = []
+    self.festival_rows = []
+
+  def intern(self, string):
+    if string is None:
+      return -1
+    if string not in self._string_to_id:
+      self._string_to_id[string] = len(self.strings)
+      self.strings.append(string)
+    return self._string_to_id[string]
+
+  def _get_column_id(self, path, leaf_type):
+    column = (path, leaf_type)
+    if column not in self._column_to_id:
+      self._column_to_id[column] = len(self.columns)
+      self.columns.append(column)
+    return self._column_to_id[column]
+
+  def _get_anga_span_path_id(self, path):
+    if path not in self._anga_span_path_to_id:
+      self._anga_span_path_to_id[path] = len(self.anga_span_paths)
+      self.anga_span_paths.append(path)
+    return self._anga_span_path_to_id[path]
+
+  def add_day(self, json_map):
+    day = len(self.day_to_leaves)
+    leaves = {}
+    self.day_to_leaves.append(leaves)
+    festival_instances = json_map.get("festival_id_to_instance", None)
+    if isinstance(festival_instances, dict) and len(festival_instances) > 0 and all(_is_festival_instance_map(instance) for instance in festival_instances.values()):
+      json_map = dict(json_map)
+      del json_map["festival_id_to_instance"]
+      for festival_id, instance in festival_instances.items():
+        interval = instance.get("interval", None) or {}
+        self.festival_rows.append((day, self.intern(festival_id), self.intern(instance.get("name", None)), instance.get("ordinal", -1), self.intern(interval.get("name", None)) if "interval" in instance else -2, _none_to_nan(interval.get("jd_start", None)), _none_to_nan(interval.get("jd_end", None))))
+    self._add_value(day=day, leaves=leaves, path=(), value=json_map)
+
+  def _add_value(self, day, leaves, path, value):
+    if isinstance(value, dict):
+      if len(value) == 0:
+        leaves[self._get_column_id(path, EMPTY_DICT)] = 0
+      for key, item in value.items():
+        self._add_value(day=day, leaves=leaves, path=path + (key,), value=item)
+    elif isinstance(value, list):
+      if len(value) == 0:
+        leaves[self._get_column_id(path, EMPTY_LIST)] = 0
+      elif all(_is_anga_span_map(item) for item in value):
+        path_id = self._get_anga_span_path_id(path)
+        for position, span in enumerate(value):
+          anga = span["anga"]
+          self.anga_span_rows.append((day, path_id, position, self.intern(anga[TYPE_FIELD]), self.intern(anga["anga_type_id"]), anga["index"], _none_to_nan(span.get("jd_start", None)), _none_to_nan(span.get("jd_end", None))))
+      else:
+        for position, item in enumerate(value):
+          self._add_value(day=day, leaves=leaves, path=path + (position,), value=item)
+    elif value is None:
+      leaves[self._get_column_id(path, NONE)] = 0
+    elif isinstance(value, bool):
+      leaves[self._get_column_id(path, BOOL)] = int(value)
+    elif isinstance(value, int):
+      leaves[self._get_column_id(path, INT)] = value
+    elif isinstance(value, float):
+      leaves[self._get_column_id(path, FLOAT)] = value
+    elif isinstance(value, str):
+      leaves[self._get_column_id(path, STRING)] = self.intern(value)
+    else:
+      raise TypeError("Cannot store %s at %s" % (type(value), path))
+
+  def get_scalars(self):
+    scalars = numpy.full((len(self.day_to_leaves), len(self.columns)), numpy.nan)
+    for day, leaves in enumerate(self.day_to_leaves):
+      scalars[day, list(leaves.keys())] = list(leaves.values())
+    return scalars
+
+
+def _set_at_path(root, path, value):
+  node = root
+  for index, key in enumerate(path[:-1]):
+    if key not in node:
+      node[key] = _ListItems() if isinstance(path[index + 1], int) else {}
+    node = node[key]
+  node[path[-1]] = value
+
+
+def _finalize(node):
+  if isinstance(node, _ListItems):
+    return [_finalize(node[position]) for position in sorted(node.keys())]
+  elif isinstance(node, dict):
+    return {key: _finalize(value) for key, value in node.items()}
+  return node
+
+
+def _make_objects(value):
+  """A much faster equivalent of JsonObject.make_from_dict, for json maps with plain (string keyed) dicts."""
+  if isinstance(value, _ListItems):
+    return [_make_objects(value[position]) for position in sorted(value.keys())]
+  elif isinstance(value, dict):
+    if TYPE_FIELD in value:
+      json_class = common.json_class_index[value[TYPE_FIELD]]
+      obj = json_class.__new__(json_class)
+      obj.__dict__.update({key: _make_objects(item) for key, item in value.items() if key != TYPE_FIELD})
+      return obj
+    return {key: _make_objects(item) for key, item in value.items()}
+  elif isinstance(value, list):
+    return [_make_objects(item) for item in value]
+  return value
+
+
+@timebudget
+def dump(panchaanga, dir_path):
+  """Store a periodical panchaanga in dir_path (which is created if necessary, and replaced if present).
+
+  The store is written to a sibling directory, which then takes the place of dir_path - so that a crash mid-dump never leaves a header describing partial arrays, and readers which memory mapped the old arrays keep them intact.
+  """
+  from jyotisha.panchaanga.spatio_temporal import periodical
+  shredder = _Shredder()
+  date_strs = sorted(panchaanga.date_str_to_panchaanga.keys())
+  daily_panchaangas = panchaanga.date_str_to_panchaanga
+  panchaanga._force_non_redundancy_in_daily_panchaangas()
+  try:
+    for date_str in date_strs:
+      shredder.add_day(json_map=daily_panchaangas[date_str].to_json_map())
+    panchaanga.date_str_to_panchaanga = {}
+    panchaanga.festival_id_to_days = collection_helper.sets_to_lists(panchaanga.festival_id_to_days)
+    panchaanga_map = panchaanga.to_json_map()
+  finally:
+    panchaanga.date_str_to_panchaanga = daily_panchaangas
+    panchaanga.festival_id_to_days = collection_helper.lists_to_sets(panchaanga.festival_id_to_days)
+    if isinstance(panchaanga, periodical.Panchaanga):
+      panchaanga._refill_daily_panchaangas()
+
+  header = {"format_version": FORMAT_VERSION, "panchaanga": panchaanga_map, "date_strs": date_strs, "columns": [[list(path), leaf_type] for (path, leaf_type) in shredder.columns], "anga_span_paths": [list(path) for path in shredder.anga_span_paths], "strings": shredder.strings}
+  dir_path = os.path.abspath(dir_path)
+  tmp_dir_path = "%s.%d.tmp" % (dir_path, os.getpid())
+  shutil.rmtree(tmp_dir_path, ignore_errors=True)
+  os.makedirs(tmp_dir_path)
+  try:
+    numpy.save(os.path.join(tmp_dir_path, SCALARS_FILE), shredder.get_scalars())
+    numpy.save(os.path.join(tmp_dir_path, ANGA_SPANS_FILE), numpy.array(shredder.anga_span_rows, dtype=ANGA_SPAN_DTYPE))
+    numpy.save(os.path.join(tmp_dir_path, FESTIVALS_FILE), numpy.array(shredder.festival_rows, dtype=FESTIVAL_DTYPE))
+    # The header is written last, so that its presence marks a complete store.
+    with open(os.path.join(tmp_dir_path, HEADER_FILE), "w") as header_file:
+      json.dump(header, header_file, ensure_ascii=False)
+    # Directories cannot be replaced in one rename - the old one is moved aside first. Readers seeing no header in between just find no store.
+    old_dir_path = "%s.%d.old" % (dir_path, os.getpid())
+    if os.path.exists(dir_path):
+      os.replace(dir_path, old_dir_path)
+    os.replace(tmp_dir_path, dir_path)
+    shutil.rmtree(old_dir_path, ignore_errors=True)
+  except Exception:
+    shutil.rmtree(tmp_dir_path, ignore_errors=True)
+    raise
+
+
+class PanchaangaStore(object):
+  """A periodical panchaanga stored by dump, with arrays memory mapped."""
+
+  def __init__(self, dir_path):
+    self.dir_path = dir_path
+    with open(os.path.join(dir_path, HEADER_FILE)) as header_file:
+      header = json.load(header_file)
+    if header["format_version"] != FORMAT_VERSION:
+      raise ValueError("Unsupported columnar format version %s in %s" % (header["format_version"], dir_path))
+    self.panchaanga_map = header["panchaanga"]
+    self.date_strs = header["date_strs"]
+    self.date_str_to_day = {date_str: day for day, date_str in enumerate(self.date_strs)}
+    self.columns = [(tuple(path), leaf_type) for (path, leaf_type) in header["columns"]]
+    self.anga_span_paths = [tuple(path) for path in header["anga_span_paths"]]
+    self.strings = header["strings"]
+    self.scalars = numpy.load(os.path.join(dir_path, SCALARS_FILE), mmap_mode="r")
+    self.anga_spans = numpy.load(os.path.join(dir_path, ANGA_SPANS_FILE), mmap_mode="r")
+    self.festivals = numpy.load(os.path.join(dir_path, FESTIVALS_FILE), mmap_mode="r")
+
+  def get_column(self, path, leaf_type=FLOAT):
+    """Values at the given path (a tuple of keys) across days - NaN where absent. Eg. ("jd_sunrise",)."""
+    return self.scalars[:, self.columns.index((tuple(path), leaf_type))]
+
+  def _get_string(self, string_id):
+    return self.strings[string_id]
+
+  def _get_rows(self, table, day):
+    days = table["day"]
+    return table[numpy.searchsorted(days, day, side="left"):numpy.searchsorted(days, day, side="right")]
+
+  def _get_daily_tree(self, date_str):
+    """The daily json map, with lists still as _ListItems."""
+    day = self.date_str_to_day[date_str]
+    json_map = {}
+    row = numpy.asarray(self.scalars[day])
+    column_ids = numpy.flatnonzero(~numpy.isnan(row))
+    for column_id, value in zip(column_ids.tolist(), row[column_ids].tolist()):
+      (path, leaf_type) = self.columns[column_id]
+      if leaf_type == INT:
+        value = int(value)
+      elif leaf_type == BOOL:
+        value = bool(value)
+      elif leaf_type == STRING:
+        value = self._get_string(int(value))
+      elif leaf_type == NONE:
+        value = None
+      elif leaf_type == EMPTY_DICT:
+        value = {}
+      elif leaf_type == EMPTY_LIST:
+        value = []
+      if len(path) == 0:
+        # An empty daily json map.
+        continue
+      _set_at_path(root=json_map, path=path, value=value)
+
+    for span_row in self._get_rows(table=self.anga_spans, day=day).tolist():
+      (_, path_id, position, anga_class, anga_type, anga_index, jd_start, jd_end) = span_row
+      span = {TYPE_FIELD: "AngaSpan", "anga": {TYPE_FIELD: self._get_string(anga_class), "anga_type_id": self._get_string(anga_type), "index": anga_index}}
+      if not numpy.isnan(jd_start):
+        span["jd_start"] = jd_start
+      if not numpy.isnan(jd_end):
+        span["jd_end"] = jd_end
+      _set_at_path(root=json_map, path=self.anga_span_paths[path_id] + (position,), value=span)
+
+    festival_rows = self._get_rows(table=self.festivals, day=day).tolist()
+    if len(festival_rows) > 0:
+      json_map["festival_id_to_instance"] = {}
+    for (_, festival_id, name, ordinal, interval_name, jd_start, jd_end) in festival_rows:
+      instance = {TYPE_FIELD: "FestivalInstance"}
+      if name != -1:
+        instance["name"] = self._get_string(name)
+      if ordinal != -1:
+        instance["ordinal"] = ordinal
+      if interval_name != -2:
+        instance["interval"] = {TYPE_FIELD: "Interval"}
+        if interval_name != -1:
+          instance["interval"]["name"] = self._get_string(interval_name)
+        if not numpy.isnan(jd_start):
+          instance["interval"]["jd_start"] = jd_start
+        if not numpy.isnan(jd_end):
+          instance["interval"]["jd_end"] = jd_end
+      json_map["festival_id_to_instance"][self._get_string(festival_id)] = instance
+    return json_map
+
+  def get_daily_json_map(self, date_str):
+    return _finalize(self._get_daily_tree(date_str=date_str))
+
+  def get_daily_panchaanga(self, date_str):
+    """Materialize a single day - without city and computation_system (see Panchaanga._refill_daily_panchaangas)."""
+    return _make_objects(self._get_daily_tree(date_str=date_str))
+
+  @timebudget
+  def get_panchaanga(self):
+    # Registers the json classes needed.
+    from jyotisha.panchaanga.spatio_temporal import periodical
+    panchaanga = _make_objects(self.panchaanga_map)
+    panchaanga.date_str_to_panchaanga = {date_str: self.get_daily_panchaanga(date_str=date_str) for date_str in self.date_strs}
+    panchaanga.post_load_ops()
+    return panchaanga
+
+  def to_json_map(self):
+    json_map = dict(self.panchaanga_map)
+    json_map["date_str_to_panchaanga"] = {date_str: self.get_daily_json_map(date_str=date_str) for date_str in self.date_strs}
+    return json_map
+
+  def dump_json(self, filename):
+    """Export in the format of JsonObject.dump_to_file."""
+    with open(filename, "w") as f:
+      f.write(json.dumps(self.to_json_map(), sort_keys=True, ensure_ascii=False, indent=2))
+
+
+def load(dir_path):
+  logging.info("Loading columnar panchaanga from %s", dir_path)
+  return PanchaangaStore(dir_path=dir_path)
@@ -5,13 +5,14 @@ import sys
 from math import floor, modf
 
 import methodtools
+import numpy
 from indic_transliteration import sanscript
 from sanskrit_data.schema import common
 from scipy.optimize import brentq
 from timebudget import timebudget
 import swisseph
 
-from jyotisha.panchaanga.spatio_temporal import City
+from jyotisha.panchaanga.spatio_temporal import City, SunsetTimes
 from jyotisha.panchaanga.temporal import time, ComputationSystem, set_constants, names, era, body
 from jyotisha.panchaanga.temporal import zodiac
 from jyotisha.panchaanga.temporal.body import Graha
@@ -35,6 +36,16 @@ set_constants()
 
 
 
+# Lagnas recur after a sidereal day (in mean solar days).
+SIDEREAL_DAY = 0.9972695663
+# Spacing of the samples from which lagna changes are estimated - well below the shortest lagna (outside polar latitudes).
+LAGNA_SAMPLE_DAYS = 2 / (24 * 60)
+# Estimated lagna changes are refined within this margin, to within LAGNA_TOLERANCE_DAYS (about as precise as brentq's default).
+LAGNA_REFINEMENT_MARGIN_DAYS = 10 / (24 * 3600)
+LAGNA_SECANT_STEP_DAYS = 1 / (24 * 3600)
+LAGNA_TOLERANCE_DAYS = 1e-9
+
+
 class DayAngas(common.JsonObject):
   def __init__(self):
     super().__init__()
@@ -146,8 +157,12 @@ class DailyPanchaanga(common.JsonObject):
     return DailyPanchaanga(city=city, date=date, computation_system=computation_system)
 
   def __init__(self, city: City, date: Date, computation_system = None,
-               previous_day_panchaanga=None) -> None:
+               previous_day_panchaanga=None, anga_timelines=None, rise_set_times=None, sunset_times=None) -> None:
     """Constructor for the panchaanga.
+    
+    :param anga_timelines: Optional dict from anga type name to zodiac.AngaTimeline, covering this day. Spans are sliced from these rather than computed afresh.
+    :param rise_set_times: Optional spatio_temporal.RiseSetTimes for this city, covering this day. Rising and setting times are looked up there rather than computed afresh.
+    :param sunset_times: Optional spatio_temporal.SunsetTimes for this city, covering the month or so before this day. Solar and tropical month days are counted there. Otherwise, a process-level cache (see SunsetTimes.get_cached) is used.
     """
     super(DailyPanchaanga, self).__init__()
     self.city = city
@@ -161,6 +176,9 @@ class DailyPanchaanga(common.JsonObject):
     self.jd_previous_sunset = None
     self.jd_next_sunrise = None
     self._previous_day_panchaanga = previous_day_panchaanga
+    self._anga_timelines = default_if_none(anga_timelines, {})
+    self._rise_set_times = rise_set_times
+    self._sunset_times = sunset_times
     self.graha_rise_jd = {}
     self.graha_set_jd = {}
 
@@ -188,10 +206,12 @@ class DailyPanchaanga(common.JsonObject):
       lunar_month_assigner = LunarMonthAssigner.get_assigner(computation_system=self.computation_system)
       lunar_month_assigner.set_date(daily_panchaanga=self, previous_day_panchaanga=previous_day_panchaanga)
 
-    self.set_mauDhyas()
-    self.set_graha_raashis()
+    if self.computation_system.needs_output("mauDhyas"):
+      self.set_mauDhyas()
+    if self.computation_system.needs_output("graha_raashis_with_ends"):
+      self.set_graha_raashis()
 
-    if self.computation_system.festival_options.set_pancha_paxi_activities:
+    if self.computation_system.festival_options.set_pancha_paxi_activities and self.computation_system.needs_output("paxi_activities"):
       self.get_pancha_paxi_activities()
 
   def __repr__(self):
@@ -203,6 +223,42 @@ class DailyPanchaanga(common.JsonObject):
   def __lt__(self, other):
     return self.date.get_date_str() < self.date.get_date_str()
 
+  def _get_rising_time(self, julian_day_start, body):
+    jd_rise = None
+    if self._rise_set_times is not None:
+      jd_rise = self._rise_set_times.get_rising_time(julian_day_start=julian_day_start, body=body)
+    if jd_rise is None:
+      jd_rise = self.city.get_rising_time(julian_day_start=julian_day_start, body=body)
+    return jd_rise
+
+  def _get_setting_time(self, julian_day_start, body):
+    jd_set = None
+    if self._rise_set_times is not None:
+      jd_set = self._rise_set_times.get_setting_time(julian_day_start=julian_day_start, body=body)
+    if jd_set is None:
+      jd_set = self.city.get_setting_time(julian_day_start=julian_day_start, body=body)
+    return jd_set
+
+  def _get_num_sunsets_in_period(self, jd_start, jd_end):
+    sunset_times = self._sunset_times
+    if sunset_times is None or not sunset_times.covers(jd_start=jd_start, jd_end=jd_end):
+      sunset_times = SunsetTimes.get_cached(city=self.city, jd_start=jd_start, jd_end=jd_end)
+    if sunset_times is None:
+      return len(self.city.get_sunsets_in_period(jd_start=jd_start, jd_end=jd_end))
+    return sunset_times.get_num_sunsets_in_period(jd_start=jd_start, jd_end=jd_end)
+
+  def get_graha_rise_jd(self, body):
+    """First rising of body after sunrise (memoized in graha_rise_jd)."""
+    if body not in self.graha_rise_jd:
+      self.graha_rise_jd[body] = self._get_rising_time(julian_day_start=self.jd_sunrise, body=body)
+    return self.graha_rise_jd[body]
+
+  def get_graha_set_jd(self, body):
+    """First setting of body after sunrise (memoized in graha_set_jd)."""
+    if body not in self.graha_set_jd:
+      self.graha_set_jd[body] = self._get_setting_time(julian_day_start=self.jd_sunrise, body=body)
+    return self.graha_set_jd[body]
+
   def compute_graha_transitions(self, previous_day_panchaanga=None, force_recomputation=False):
     """
 
@@ -214,51 +270,61 @@ class DailyPanchaanga(common.JsonObject):
       if previous_day_panchaanga is not None and previous_day_panchaanga.jd_next_sunrise is not None:
         self.jd_sunrise = previous_day_panchaanga.jd_next_sunrise
       else:
-        self.jd_sunrise = self.city.get_rising_time(julian_day_start=self.julian_day_start, body=Graha.SUN)
+        self.jd_sunrise = self._get_rising_time(julian_day_start=self.julian_day_start, body=Graha.SUN)
     if force_recomputation or self.jd_sunset is None:
-      self.jd_sunset = self.city.get_setting_time(julian_day_start=self.jd_sunrise, body=Graha.SUN)
+      self.jd_sunset = self._get_setting_time(julian_day_start=self.jd_sunrise, body=Graha.SUN)
     if force_recomputation or self.jd_previous_sunset is None:
       if previous_day_panchaanga is not None and previous_day_panchaanga.jd_sunset is not None:
         self.jd_previous_sunset = previous_day_panchaanga.jd_sunset
       else:
-        self.jd_previous_sunset = self.city.get_setting_time(julian_day_start=self.jd_sunrise - 1,
-                                                             body=Graha.SUN)
+        self.jd_previous_sunset = self._get_setting_time(julian_day_start=self.jd_sunrise - 1,
+                                                         body=Graha.SUN)
     if force_recomputation or self.jd_next_sunrise is None:
-      self.jd_next_sunrise = self.city.get_rising_time(julian_day_start=self.jd_sunset, body=Graha.SUN)
+      self.jd_next_sunrise = self._get_rising_time(julian_day_start=self.jd_sunset, body=Graha.SUN)
     if self.jd_sunset == 0.0:
       logging.error('No sunset was computed!')
       raise (ValueError(
         'No sunset was computed. Perhaps the co-ordinates are beyond the polar circle (most likely a LAT-LONG swap! Please check your inputs.'))
 
+    if force_recomputation:
+      self.graha_rise_jd = {}
+      self.graha_set_jd = {}
+    # Other graha risings and settings are otherwise computed (and memoized) only when asked for - see get_graha_rise_jd.
     for body in Graha.PLANETS_REVERSE_ORDER + [Graha.MOON]:
-      if force_recomputation or body not in self.graha_rise_jd:
-        self.graha_rise_jd[body] = self.city.get_rising_time(julian_day_start=self.jd_sunrise, body=body)
-      if force_recomputation or body not in self.graha_set_jd:
-        self.graha_set_jd[body] = self.city.get_setting_time(julian_day_start=self.jd_sunrise, body=body)
+      if self.computation_system.needs_output("graha_rise_jd"):
+        self.get_graha_rise_jd(body=body)
+      if self.computation_system.needs_output("graha_set_jd"):
+        self.get_graha_set_jd(body=body)
 
     if force_recomputation or self.sunrise_day_angas is None:
       self.sunrise_day_angas = DayAngas()
       # Deliberately passing ASHVINI_STARTING_0 below since it is cheapest. Tithi is independent of ayanAmsha.
-      self.sunrise_day_angas.tithis_with_ends = AngaSpanFinder.get_cached(ayanaamsha_id=Ayanamsha.ASHVINI_STARTING_0, anga_type=zodiac.AngaType.TITHI).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
+      self.sunrise_day_angas.tithis_with_ends = self._get_all_angas_in_day(ayanaamsha_id=Ayanamsha.ASHVINI_STARTING_0, anga_type=zodiac.AngaType.TITHI)
       self.sunrise_day_angas.tithi_at_sunrise = self.sunrise_day_angas.tithis_with_ends[0].anga
       self.sunrise_day_angas.tithi_at_noon = self.sunrise_day_angas.get_anga_at_jd(jd=(self.jd_sunrise + self.jd_sunset)/2, anga_type=zodiac.AngaType.TITHI)
 
-      self.sunrise_day_angas.nakshatras_with_ends = AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.NAKSHATRA).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
+      self.sunrise_day_angas.nakshatras_with_ends = self._get_all_angas_in_day(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.NAKSHATRA)
       self.sunrise_day_angas.nakshatra_at_sunrise = self.sunrise_day_angas.nakshatras_with_ends[0].anga
 
-      self.sunrise_day_angas.yogas_with_ends = AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.YOGA).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
+      self.sunrise_day_angas.yogas_with_ends = self._get_all_angas_in_day(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.YOGA)
       self.sunrise_day_angas.yoga_at_sunrise = self.sunrise_day_angas.yogas_with_ends[0].anga
 
-      self.sunrise_day_angas.karanas_with_ends = AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.KARANA).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
+      self.sunrise_day_angas.karanas_with_ends = self._get_all_angas_in_day(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.KARANA)
 
-      self.sunrise_day_angas.raashis_with_ends = AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.RASHI).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
+      self.sunrise_day_angas.raashis_with_ends = self._get_all_angas_in_day(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.RASHI)
 
-      self.sunrise_day_angas.solar_nakshatras_with_ends = AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.SOLAR_NAKSH).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
+      self.sunrise_day_angas.solar_nakshatras_with_ends = self._get_all_angas_in_day(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.SOLAR_NAKSH)
+
+  def _get_all_angas_in_day(self, ayanaamsha_id, anga_type):
+    timeline = self._anga_timelines.get(anga_type.name, None)
+    if timeline is not None and timeline.ayanaamsha_id == ayanaamsha_id and timeline.covers(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise):
+      return timeline.get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
+    return AngaSpanFinder.get_cached(ayanaamsha_id=ayanaamsha_id, anga_type=anga_type, root_finder=self.computation_system.root_finder).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
 
   def get_interval(self, interval_id):
     interval_id = names.devanaagarii_to_python.get(interval_id, interval_id)
     if interval_id == "moonrise":
-      return Interval(name=interval_id, jd_start=self.graha_rise_jd[Graha.MOON], jd_end=self.graha_rise_jd[Graha.MOON])
+      return Interval(name=interval_id, jd_start=self.get_graha_rise_jd(body=Graha.MOON), jd_end=self.get_graha_rise_jd(body=Graha.MOON))
     elif interval_id == "sunrise":
       return Interval(jd_start=self.jd_sunrise, jd_end=self.jd_sunrise, name=interval_id)
     elif interval_id == "sunset":
@@ -298,9 +364,9 @@ class DailyPanchaanga(common.JsonObject):
     solar_sidereal_month_end_jd = None
     # Some months are really short, like Dhanurmasa ending 1970-Jan-14. So >=28 is used...
     if previous_day_panchaanga is None or previous_day_panchaanga.solar_sidereal_date_sunset.day >= 28 :
-      anga_finder = zodiac.AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=AngaType.GRAHA_RASHI[Graha.SUN])
+      anga_finder = zodiac.AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=AngaType.GRAHA_RASHI[Graha.SUN], root_finder=self.computation_system.root_finder)
       solar_month_sunset_span = anga_finder.find(jd1=self.jd_sunset - 32, jd2=self.jd_sunset + 5, target_anga_id=solar_month_sunset)
-      solar_sidereal_month_day_sunset = len(self.city.get_sunsets_in_period(jd_start=solar_month_sunset_span.jd_start, jd_end=self.jd_sunset + 1/48.0))
+      solar_sidereal_month_day_sunset = self._get_num_sunsets_in_period(jd_start=solar_month_sunset_span.jd_start, jd_end=self.jd_sunset + 1/48.0)
       if solar_sidereal_month_day_sunset == 1 and solar_month_sunset_span.jd_start > self.jd_sunrise:
         solar_sidereal_month_end_jd = solar_month_sunset_span.jd_start
       elif solar_sidereal_month_day_sunset >= 29 and solar_month_sunset_span.jd_end < self.jd_next_sunrise:
@@ -321,13 +387,13 @@ class DailyPanchaanga(common.JsonObject):
       fractional_month = nd.get_fractional_division_for_body(body=Graha.singleton(Graha.SUN), anga_type=AngaType.RASHI)
       (month_fraction, _) = modf(fractional_month)
       approx_day = month_fraction*30
-      month_transitions = Graha.singleton(Graha.SUN).get_transits(jd_start=self.jd_sunset-approx_day-5, jd_end=self.jd_sunset + 4, anga_type=AngaType.RASHI, ayanaamsha_id=Ayanamsha.ASHVINI_STARTING_0)
+      month_transitions = Graha.singleton(Graha.SUN).get_transits(jd_start=self.jd_sunset-approx_day-5, jd_end=self.jd_sunset + 4, anga_type=AngaType.RASHI, ayanaamsha_id=Ayanamsha.ASHVINI_STARTING_0, root_finder=self.computation_system.root_finder)
       if month_transitions[-1].jd > self.jd_previous_sunset and month_transitions[-1].jd <= self.jd_sunset:
         tropical_date_sunset_day = 1
         tropical_date_sunset_month = month_transitions[-1].value_2  % 12 + 1
         month_transition_jd = month_transitions[-1].jd
       else:
-        tropical_date_sunset_day = len(self.city.get_sunsets_in_period(jd_start=month_transitions[0].jd, jd_end=self.jd_sunset + 1/48.0))
+        tropical_date_sunset_day = self._get_num_sunsets_in_period(jd_start=month_transitions[0].jd, jd_end=self.jd_sunset + 1/48.0)
         tropical_date_sunset_month = month_transitions[0].value_2 % 12 + 1
     self.tropical_date_sunset = time.BasicDateWithTransitions(month=tropical_date_sunset_month, day=tropical_date_sunset_day, month_transition=month_transition_jd)
 
@@ -393,13 +459,13 @@ class DailyPanchaanga(common.JsonObject):
 
 
   def get_jd_next_day_noon(self):
-    jd_next_day_sunset = self.city.get_rising_time(julian_day_start=self.jd_next_sunrise, body=Graha.SUN)
+    jd_next_day_sunset = self._get_rising_time(julian_day_start=self.jd_next_sunrise, body=Graha.SUN)
     return (self.jd_next_sunrise + jd_next_day_sunset)/2
 
   def get_jd_prev_day_noon(self):
     if self._previous_day_panchaanga is not None:
       return self._previous_day_panchaanga.get_jd_noon()
-    jd_prev_day_sunrise = self.city.get_rising_time(julian_day_start=self.jd_next_sunrise - 1.2, body=Graha.SUN)
+    jd_prev_day_sunrise = self._get_rising_time(julian_day_start=self.jd_next_sunrise - 1.2, body=Graha.SUN)
     return (self.jd_previous_sunset + jd_prev_day_sunrise)/2
 
   def get_jd_noon(self):
@@ -453,6 +519,8 @@ class DailyPanchaanga(common.JsonObject):
   def get_lagna_data(self, ayanaamsha_id=zodiac.Ayanamsha.CHITRA_AT_180, debug=False):
     """Returns the lagna data
 
+        Lagna changes are located from the previous day's (which recur a sidereal day later) if available, or else from a vectorized sampling of the day (see City.get_lagna_floats) - and then refined within a few seconds. Should that fail (as at high latitudes, where some lagnas last for minutes), each lagna is bracketed in turn.
+
         Args:
           ayanaamsha_id: The ayanamsha to be used for calculations.
           debug: Boolean flag to enable debugging.
@@ -464,9 +532,82 @@ class DailyPanchaanga(common.JsonObject):
     if self.lagna_data is not None:
       return self.lagna_data
 
-    self.lagna_data = []
     if getattr(self, "jd_sunrise", None) is None or self.jd_sunrise is None:
       self.compute_graha_transitions()
+    previous_day_panchaanga = self._previous_day_panchaanga
+    if previous_day_panchaanga is not None and previous_day_panchaanga.lagna_data is not None and len(previous_day_panchaanga.lagna_data) > 0:
+      previous_lagna_data = previous_day_panchaanga.lagna_data
+      # The last estimate covers the few minutes by which a day exceeds a sidereal day.
+      lagna_end_estimates = [(lagna, jd + SIDEREAL_DAY) for (lagna, jd) in previous_lagna_data] + [(previous_lagna_data[0][0], previous_lagna_data[0][1] + 2 * SIDEREAL_DAY)]
+      self.lagna_data = self._refine_lagna_ends(lagna_end_estimates=lagna_end_estimates, ayanaamsha_id=ayanaamsha_id)
+    if self.lagna_data is None:
+      self.lagna_data = self._refine_lagna_ends(lagna_end_estimates=self._sample_lagna_ends(ayanaamsha_id=ayanaamsha_id), ayanaamsha_id=ayanaamsha_id)
+    if self.lagna_data is None:
+      logging.debug("Falling back to bracketing each lagna on %s", self.date.get_date_str())
+      self.lagna_data = self._get_lagna_data_by_bracketing(ayanaamsha_id=ayanaamsha_id, debug=debug)
+    return self.lagna_data
+
+  def _sample_lagna_ends(self, ayanaamsha_id):
+    """(lagna, estimated end time) tuples, linearly interpolated between samples LAGNA_SAMPLE_DAYS apart."""
+    jds = numpy.arange(self.jd_sunrise, self.jd_next_sunrise + LAGNA_SAMPLE_DAYS, LAGNA_SAMPLE_DAYS)
+    lagna_floats = self.city.get_lagna_floats(jds=jds, ayanaamsha_id=ayanaamsha_id)
+    lagna_indices = numpy.floor(lagna_floats)
+    lagna_end_estimates = []
+    for i in numpy.nonzero(lagna_indices[1:] != lagna_indices[:-1])[0]:
+      advance = (lagna_floats[i + 1] - lagna_floats[i]) % 12
+      lagna_end_estimates.append((int(lagna_indices[i]) + 1, jds[i] + (lagna_indices[i] + 1 - lagna_floats[i]) / advance * (jds[i + 1] - jds[i])))
+    return lagna_end_estimates
+
+  def _refine_lagna_end(self, lagna, jd_estimate, ayanaamsha_id):
+    """End time of the lagna (by the secant method), if it is within LAGNA_REFINEMENT_MARGIN_DAYS of jd_estimate."""
+    # The ayanaamsha hardly changes over the few seconds involved.
+    end_longitude = lagna * 30 + Ayanamsha.singleton(ayanaamsha_id).get_offset(jd_estimate)
+
+    def get_longitude_difference(jd):
+      return (self.city.get_zodiac_longitude_eastern_horizon(jd=jd) - end_longitude + 180) % 360 - 180
+
+    # scipy.optimize.newton has a lot of overhead for so few iterations.
+    (jd_1, jd_2) = (jd_estimate - LAGNA_SECANT_STEP_DAYS, jd_estimate + LAGNA_SECANT_STEP_DAYS)
+    (difference_1, difference_2) = (get_longitude_difference(jd_1), get_longitude_difference(jd_2))
+    for _ in range(10):
+      if difference_2 == difference_1:
+        return None
+      jd_3 = jd_2 - difference_2 * (jd_2 - jd_1) / (difference_2 - difference_1)
+      if abs(jd_3 - jd_estimate) > LAGNA_REFINEMENT_MARGIN_DAYS:
+        return None
+      if abs(jd_3 - jd_2) < LAGNA_TOLERANCE_DAYS:
+        return float(jd_3)
+      (jd_1, difference_1) = (jd_2, difference_2)
+      (jd_2, difference_2) = (jd_3, get_longitude_difference(jd_3))
+    return None
+
+  def _refine_lagna_ends(self, lagna_end_estimates, ayanaamsha_id):
+    """Lagna data from (lagna, estimated end time) tuples - or None if the estimates turn out to be off, or to miss some lagna."""
+    lagna_data = []
+    for (lagna, jd_estimate) in sorted(lagna_end_estimates, key=lambda lagna_end_estimate: lagna_end_estimate[1]):
+      if jd_estimate < self.jd_sunrise - LAGNA_REFINEMENT_MARGIN_DAYS or jd_estimate > self.jd_next_sunrise + LAGNA_REFINEMENT_MARGIN_DAYS:
+        continue
+      lagna_end_time = self._refine_lagna_end(lagna=lagna, jd_estimate=jd_estimate, ayanaamsha_id=ayanaamsha_id)
+      if lagna_end_time is None:
+        return None
+      if len(lagna_data) > 0 and lagna_end_time - lagna_data[-1][1] < LAGNA_REFINEMENT_MARGIN_DAYS:
+        # Estimated twice.
+        continue
+      if self.jd_sunrise < lagna_end_time < self.jd_next_sunrise:
+        lagna_data.append((lagna, lagna_end_time))
+
+    # The lagnas found must follow each other - from the one at sunrise to the one before that at the next sunrise.
+    lagnas = [lagna for (lagna, _) in lagna_data]
+    lagna_sunrise = 1 + floor(self.city.get_lagna_float(self.jd_sunrise, ayanaamsha_id=ayanaamsha_id))
+    lagna_next_sunrise = 1 + floor(self.city.get_lagna_float(self.jd_next_sunrise, ayanaamsha_id=ayanaamsha_id))
+    if len(lagnas) == 0 or lagnas[0] != lagna_sunrise or lagnas[-1] % 12 + 1 != lagna_next_sunrise:
+      return None
+    if any(next_lagna != lagna % 12 + 1 for (lagna, next_lagna) in zip(lagnas, lagnas[1:])):
+      return None
+    return lagna_data
+
+  def _get_lagna_data_by_bracketing(self, ayanaamsha_id, debug=False):
+    lagna_data = []
     lagna_sunrise = 1 + floor(self.city.get_lagna_float(self.jd_sunrise, ayanaamsha_id=ayanaamsha_id))
 
     lagna_list = [(x + lagna_sunrise - 1) % 12 + 1 for x in range(13)]
@@ -488,8 +629,8 @@ class DailyPanchaanga(common.JsonObject):
       lbrack = lagna_end_time + 1 / 24
       rbrack = lagna_end_time + 3 / 24
       if lagna_end_time < self.jd_next_sunrise:
-        self.lagna_data.append((lagna, lagna_end_time))
-    return self.lagna_data
+        lagna_data.append((lagna, lagna_end_time))
+    return lagna_data
 
 
   def get_pancha_paxi_activities(self):
@@ -548,7 +689,7 @@ class DailyPanchaanga(common.JsonObject):
 
   def set_graha_raashis(self):
     for graha_id in [Graha.MERCURY, Graha.VENUS, Graha.MARS, Graha.JUPITER, Graha.SATURN, Graha.RAHU, Graha.KETU, Graha.SUN]:
-      self.sunrise_day_angas.graha_raashis_with_ends[graha_id] = AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.GRAHA_RASHI[graha_id]).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
+      self.sunrise_day_angas.graha_raashis_with_ends[graha_id] = AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.GRAHA_RASHI[graha_id], root_finder=self.computation_system.root_finder).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
 
 # Essential for depickling to work.
 common.update_json_class_index(sys.modules[__name__])
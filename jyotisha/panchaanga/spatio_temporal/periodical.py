@@ -1,21 +1,27 @@
-import copy
+import concurrent.futures
+import contextlib
 import logging
+import math
+import pickle
 import sys
 from collections import defaultdict
 from typing import Dict
 
 import methodtools
+import numpy
 import regex
 from timebudget import timebudget
 
-from jyotisha.panchaanga.spatio_temporal import daily
-from jyotisha.panchaanga.temporal import time, set_constants, ComputationSystem, AngaType, era
+from jyotisha.panchaanga.spatio_temporal import daily, RiseSetTimes, SunsetTimes
+from jyotisha.panchaanga.temporal import time, set_constants, ComputationSystem, AngaType, era, chebyshev, zodiac, ayanaamsha_curve
+from jyotisha.panchaanga.temporal.body import Graha
 from jyotisha.panchaanga.temporal.festival import FestivalInstance
 from jyotisha.panchaanga.temporal.festival.applier import tithi_festival, ecliptic, solar, vaara, rule_repo_based, \
   FestivalAssigner
 from jyotisha.panchaanga.temporal.time import Date
 from jyotisha.panchaanga.temporal.tithi import ShraadhaTithiAssigner
 from jyotisha.panchaanga.temporal.zodiac.angas import Tithi
+from jyotisha import util
 from jyotisha.util import default_if_none
 from sanskrit_data import collection_helper
 from sanskrit_data.schema import common
@@ -32,9 +38,13 @@ class Panchaanga(common.JsonObject):
     Generally, which days is a given festival associated with (esp pre-sunrise events)? We follow the same conventions as the adyatithi repo.
     """
   LATEST_VERSION = "0.0.4"
+  # Tables (and curves) refitted by advance reach this many days further than needed - so that a run of advances refits them only now and then.
+  ADVANCE_HEADROOM_DAYS = 32
 
-  def __init__(self, city, start_date, end_date, year_type = None, computation_system: ComputationSystem = None, recompute_festivals=True):
+  def __init__(self, city, start_date, end_date, year_type = None, computation_system: ComputationSystem = None, recompute_festivals=True, num_processes=None):
     """Constructor for the panchaanga.
+
+    :param num_processes: Number of processes across which daily panchaangas are computed. None means serial computation.
         """
     super(Panchaanga, self).__init__()
     self.version = Panchaanga.LATEST_VERSION
@@ -60,13 +70,52 @@ class Panchaanga(common.JsonObject):
     self.weekday_start = time.get_weekday(self.jd_start)
 
     self.festival_id_to_days = defaultdict(set, {})
-    self.compute_angas(compute_lagnas=self.computation_system.festival_options.lagnas)
-    if not self.computation_system.festival_options.no_fests and recompute_festivals:
-      self.update_festival_details()
+    self._longitude_tables = None
+    self._ayanaamsha_curves = None
+    with self.approximations_in_use():
+      self.compute_angas(compute_lagnas=self.computation_system.festival_options.lagnas, num_processes=num_processes)
+      if self.computation_system.needs_festivals() and recompute_festivals:
+        self.update_festival_details()
+
+  def _get_padded_jd_range(self):
+    # A couple of days' margin for the next day's sunrise and such.
+    return (self.jd_start - self.duration_prior_padding - 2, self.jd_start + self.duration_posterior_padding + 2)
+
+  def get_longitude_tables(self, headroom_days=0):
+    """Chebyshev tables for solar and lunar longitudes over the padded period, if the computation system asks for them.
+
+    The tables are kept, and refitted only once the padded period goes beyond them - then reaching headroom_days further.
+    """
+    tolerance = self.computation_system.longitude_table_tolerance
+    if tolerance is None:
+      return []
+    (jd_start, jd_end) = self._get_padded_jd_range()
+    if self._longitude_tables is None or not all(table.covers(jd_start) and table.covers(jd_end) for table in self._longitude_tables):
+      self._longitude_tables = chebyshev.get_tables(jd_start=jd_start, jd_end=jd_end + headroom_days, tolerance=tolerance)
+    return self._longitude_tables
+
+  def get_ayanaamsha_curves(self, headroom_days=0):
+    """Ayanaamsha curves covering the padded period, if the computation system asks for them. Kept like the tables of get_longitude_tables."""
+    tolerance = self.computation_system.ayanaamsha_curve_tolerance
+    if tolerance is None:
+      return []
+    (jd_start, jd_end) = self._get_padded_jd_range()
+    if self._ayanaamsha_curves is None or not all(curve.covers(jd_start) and curve.covers(jd_end) for curve in self._ayanaamsha_curves):
+      # Lagnas are computed with CHITRA_AT_180 - see DailyPanchaanga.get_lagna_data.
+      self._ayanaamsha_curves = ayanaamsha_curve.get_curves(ayanaamsha_ids=[self.computation_system.ayanaamsha_id, zodiac.Ayanamsha.CHITRA_AT_180], jd_start=jd_start, jd_end=jd_end + headroom_days, tolerance=tolerance)
+    return self._ayanaamsha_curves
+
+  @contextlib.contextmanager
+  def approximations_in_use(self, headroom_days=0):
+    """Within this context, the longitude tables and ayanaamsha curves asked for by the computation system (if any) are in use - see get_longitude_tables."""
+    with chebyshev.tables_in_use(self.get_longitude_tables(headroom_days=headroom_days)), ayanaamsha_curve.curves_in_use(self.get_ayanaamsha_curves(headroom_days=headroom_days)):
+      yield
 
   @timebudget
-  def compute_angas(self, compute_lagnas=True):
+  def compute_angas(self, compute_lagnas=True, num_processes=None):
     """Compute the entire panchaanga
+
+    :param num_processes: If more than 1, the days are computed in parallel chunks - see compute_daily_panchaangas_in_parallel.
     """
 
     # INITIALISE VARIABLES
@@ -77,17 +126,52 @@ class Panchaanga(common.JsonObject):
     # Compute all parameters -- sun/moon latitude/longitude etc #
     #############################################################
 
-    for d in range(-self.duration_prior_padding, self.duration_posterior_padding - 1):
-      # The below block is temporary code to make the transition seamless.
-      date_d = time.jd_to_utc_gregorian(self.jd_start + d)
-      date_d.set_time_to_day_start()
-      previous_daily_panchaanga = self.date_str_to_panchaanga.get(date_d.offset_date(days=-1).get_date_str(), None)
-      daily_panchaanga = daily.DailyPanchaanga(city=self.city, date=date_d,
-                                               computation_system=self.computation_system,
-                                               previous_day_panchaanga=previous_daily_panchaanga)
-      if compute_lagnas:
-        daily_panchaanga.get_lagna_data()
-      self.date_str_to_panchaanga[date_d.get_date_str()] = daily_panchaanga
+    day_offsets = list(range(-self.duration_prior_padding, self.duration_posterior_padding - 1))
+    if num_processes is None or num_processes <= 1:
+      daily_panchaangas = compute_daily_panchaangas(city=self.city, computation_system=self.computation_system, jd_start=self.jd_start, day_offsets=day_offsets, compute_lagnas=compute_lagnas)
+    else:
+      daily_panchaangas = compute_daily_panchaangas_in_parallel(city=self.city, computation_system=self.computation_system, jd_start=self.jd_start, day_offsets=day_offsets, compute_lagnas=compute_lagnas, num_processes=num_processes)
+    for daily_panchaanga in daily_panchaangas:
+      self.date_str_to_panchaanga[daily_panchaanga.date.get_date_str()] = daily_panchaanga
+    self._anga_span_indices = {}
+    self._day_columns = None
+
+  @timebudget
+  def advance(self, num_days=1, recompute_festivals=True, compute_shraadha_tithis=False):
+    """Slide the period forward by num_days - for services which keep a rolling window (say, today and the next few days).
+
+    Only the num_days newly needed days are computed, each with the help of the previous one; the earliest num_days are dropped. Longitude tables and ayanaamsha curves are refitted only once the period goes beyond them (see ADVANCE_HEADROOM_DAYS).
+
+    Known limitation: festivals are reassigned over the whole (padded) period, rather than just the days affected by the new ones - cheap for short windows, but not for long ones.
+    """
+    if not isinstance(num_days, int) or num_days < 1:
+      raise ValueError("num_days must be a positive integer, not %s" % str(num_days))
+    daily_panchaangas = self.daily_panchaangas_sorted()
+    self.start_date = self.start_date + num_days
+    self.start_date.set_time_to_day_start()
+    self.end_date = self.end_date + num_days
+    self.end_date.set_time_to_day_start()
+    self.jd_start = self.jd_start + num_days
+    self.jd_end = self.jd_end + num_days
+    self.weekday_start = time.get_weekday(self.jd_start)
+    compute_lagnas = self.computation_system.festival_options.lagnas
+    with self.approximations_in_use(headroom_days=self.ADVANCE_HEADROOM_DAYS):
+      if num_days >= len(daily_panchaangas):
+        self.compute_angas(compute_lagnas=compute_lagnas)
+      else:
+        last_day_offset = self.duration_posterior_padding - 2
+        new_daily_panchaangas = compute_daily_panchaangas(city=self.city, computation_system=self.computation_system, jd_start=self.jd_start, day_offsets=list(range(last_day_offset - num_days + 1, last_day_offset + 1)), compute_lagnas=compute_lagnas, previous_day_panchaanga=daily_panchaangas[-1])
+        for daily_panchaanga in daily_panchaangas[:num_days]:
+          del self.date_str_to_panchaanga[daily_panchaanga.date.get_date_str()]
+        # Lest dropped days be kept alive (through a chain of previous days) for as long as the service runs.
+        daily_panchaangas[num_days]._previous_day_panchaanga = None
+        for daily_panchaanga in new_daily_panchaangas:
+          self.date_str_to_panchaanga[daily_panchaanga.date.get_date_str()] = daily_panchaanga
+        self._anga_span_indices = {}
+        self._day_columns = None
+      self.daily_panchaangas_sorted.cache_clear()
+      if self.computation_system.needs_festivals() and recompute_festivals:
+        self.update_festival_details(compute_shraadha_tithis=compute_shraadha_tithis)
 
   @methodtools.lru_cache(maxsize=10)
   def daily_panchaangas_sorted(self, skip_padding_days=False):
@@ -122,10 +206,46 @@ class Panchaanga(common.JsonObject):
     else:
       return self.daily_panchaanga_for_date(date=panchaanga.date - 1)
 
+  def get_anga_span_index(self, anga_type):
+    """A period-wide zodiac.AngaSpanIndex, built on first use - from the zodiac.AngaTimeline which the daily span lists were sliced from, if there is one; else from the daily span lists."""
+    if self._anga_span_indices is None:
+      self._anga_span_indices = {}
+    if anga_type.name not in self._anga_span_indices:
+      daily_panchaangas = self.daily_panchaangas_sorted()
+      timeline = daily_panchaangas[0]._anga_timelines.get(anga_type.name, None) if daily_panchaangas[0]._anga_timelines is not None else None
+      (jd1, jd2) = (daily_panchaangas[0].jd_sunrise, daily_panchaangas[-1].jd_next_sunrise)
+      if timeline is not None and timeline.covers(jd1=jd1, jd2=jd2) and all(dp._anga_timelines is daily_panchaangas[0]._anga_timelines for dp in daily_panchaangas):
+        self._anga_span_indices[anga_type.name] = timeline.get_span_index(jd1=jd1, jd2=jd2)
+      else:
+        span_lists = [dp.sunrise_day_angas.get_angas_with_ends(anga_type=anga_type) for dp in daily_panchaangas]
+        self._anga_span_indices[anga_type.name] = zodiac.AngaSpanIndex.from_span_lists(span_lists=span_lists)
+    return self._anga_span_indices[anga_type.name]
+
+  def get_anga_at_jd(self, jd, anga_type):
+    """Same as DayAngas.get_anga_at_jd, but without scanning daily span lists."""
+    return self.get_anga_span_index(anga_type=anga_type).get_anga_at_jd(jd=jd)
+
+  def get_day_columns(self):
+    if self._day_columns is None:
+      self._day_columns = DayColumns(panchaanga=self)
+    return self._day_columns
+
+  def find_days(self, skip_padding_days=True, **conditions):
+    """Positions (in daily_panchaangas_sorted()) of days satisfying all conditions, in date order.
+
+    Example: find_days(weekday=2, tithi_at_sunrise=[4, 19]) - see DayColumns.get_mask.
+    """
+    mask = self.get_day_columns().get_mask(**conditions)
+    if skip_padding_days:
+      mask[:self.duration_prior_padding] = False
+      mask[self.duration + self.duration_prior_padding:] = False
+    return numpy.flatnonzero(mask).tolist()
+
   def get_interval_anga_spans(self, date, interval_id, anga_type):
     dp = self.daily_panchaanga_for_date(date)
     (anga_spans, _) = dp.get_interval_anga_spans(interval_id=interval_id, anga_type=anga_type)
-    anga_spans = copy.deepcopy(anga_spans)
+    # Shallow copies suffice, since only span.anga is replaced below.
+    anga_spans = [util.shallow_copy(span) for span in anga_spans]
 
     if anga_type == AngaType.TITHI:
       for span in anga_spans:
@@ -262,6 +382,228 @@ class Panchaanga(common.JsonObject):
     self.festival_id_to_days = collection_helper.lists_to_sets(self.festival_id_to_days)
     self._refill_daily_panchaangas()
 
+  def get_festivals(self, rules_hash=None):
+    """The festival layer of this panchaanga, as a separately storable object."""
+    festivals = PanchaangaFestivals(rules_hash=rules_hash)
+    festivals.festival_id_to_days = collection_helper.sets_to_lists(self.festival_id_to_days)
+    for date_str, daily_panchaanga in self.date_str_to_panchaanga.items():
+      daily_festivals = {attribute: getattr(daily_panchaanga, attribute) for attribute in PanchaangaFestivals.DAILY_ATTRIBUTES if getattr(daily_panchaanga, attribute, None) is not None}
+      if len(daily_festivals) > 0:
+        festivals.date_str_to_daily_festivals[date_str] = daily_festivals
+    return festivals
+
+  def set_festivals(self, festivals):
+    """Inverse of get_festivals - festivals may come from a separately stored file."""
+    for daily_panchaanga in self.date_str_to_panchaanga.values():
+      for attribute in PanchaangaFestivals.DAILY_ATTRIBUTES:
+        setattr(daily_panchaanga, attribute, None)
+    self._reset_festivals()
+    self.festival_id_to_days = defaultdict(set, collection_helper.lists_to_sets(festivals.festival_id_to_days))
+    for date_str, daily_festivals in festivals.date_str_to_daily_festivals.items():
+      daily_panchaanga = self.date_str_to_panchaanga[date_str]
+      for attribute, value in daily_festivals.items():
+        setattr(daily_panchaanga, attribute, value)
+
+  @contextlib.contextmanager
+  def festivals_removed(self):
+    """Within this context, this panchaanga lacks its festival layer - useful for storing the astronomical layer alone (see get_festivals)."""
+    festivals = self.get_festivals()
+    self.set_festivals(festivals=PanchaangaFestivals())
+    try:
+      yield
+    finally:
+      self.set_festivals(festivals=festivals)
+
+
+class PanchaangaFestivals(common.JsonObject):
+  """The festival layer of a periodical panchaanga.
+
+  Festival rules change far more often than the astronomical computations - hence this layer may be stored (and recomputed) separately, keyed by a hash of the rules which produced it. See annual.
+  """
+  DAILY_ATTRIBUTES = ["festival_id_to_instance", "solar_shraaddha_tithi", "lunar_shraaddha_tithi"]
+
+  def __init__(self, rules_hash=None):
+    super(PanchaangaFestivals, self).__init__()
+    self.rules_hash = rules_hash
+    self.festival_id_to_days = {}
+    self.date_str_to_daily_festivals = {}
+
+
+class DayColumns(object):
+  """Per-day values, as numpy arrays aligned with Panchaanga.daily_panchaangas_sorted() - so that day queries are vectorized, rather than loops over daily panchaangas.
+
+  Columns are computed on first use.
+  """
+  COLUMN_GETTERS = {
+    "weekday": lambda panchaanga, dp: dp.date.get_weekday(),
+    "tithi_at_sunrise": lambda panchaanga, dp: dp.sunrise_day_angas.tithi_at_sunrise.index,
+    "tithi_at_sunset": lambda panchaanga, dp: panchaanga.get_anga_at_jd(jd=dp.jd_sunset, anga_type=AngaType.TITHI).index,
+    "nakshatra_at_sunrise": lambda panchaanga, dp: dp.sunrise_day_angas.nakshatra_at_sunrise.index,
+    "yoga_at_sunrise": lambda panchaanga, dp: dp.sunrise_day_angas.yoga_at_sunrise.index,
+    # Could be fractional, for adhika maasas.
+    "lunar_month": lambda panchaanga, dp: dp.lunar_date.month.index,
+    "lunar_day": lambda panchaanga, dp: dp.lunar_date.day,
+    "solar_sidereal_month_sunset": lambda panchaanga, dp: dp.solar_sidereal_date_sunset.month,
+    "solar_sidereal_day_sunset": lambda panchaanga, dp: dp.solar_sidereal_date_sunset.day,
+  }
+
+  def __init__(self, panchaanga):
+    self.panchaanga = panchaanga
+    self.daily_panchaangas = panchaanga.daily_panchaangas_sorted()
+    self._columns = {}
+
+  def get_column(self, name):
+    if name not in self._columns:
+      if name not in self.COLUMN_GETTERS:
+        raise ValueError("Unknown day column: %s" % name)
+      get_value = self.COLUMN_GETTERS[name]
+      self._columns[name] = numpy.array([get_value(self.panchaanga, dp) for dp in self.daily_panchaangas])
+    return self._columns[name]
+
+  def get_mask(self, **conditions):
+    """Boolean mask of days satisfying all conditions.
+
+    Each condition maps a column name to a value, a collection of acceptable values, or a function from the column array to a mask (eg. lambda tithis: tithis % 15 == 4).
+    """
+    mask = numpy.ones(len(self.daily_panchaangas), dtype=bool)
+    for name, condition in conditions.items():
+      column = self.get_column(name=name)
+      if callable(condition):
+        mask &= condition(column)
+      elif isinstance(condition, (list, tuple, set, frozenset)):
+        mask &= numpy.isin(column, list(condition))
+      else:
+        mask &= column == condition
+    return mask
+
+
+@timebudget
+def get_anga_timelines(computation_system, jd_start, jd_end):
+  """Sweep through the whole period once per anga type, so that daily panchaangas can just slice out their spans."""
+  ayanaamsha_id = computation_system.ayanaamsha_id
+  anga_types = [(AngaType.TITHI, zodiac.Ayanamsha.ASHVINI_STARTING_0), (AngaType.NAKSHATRA, ayanaamsha_id), (AngaType.YOGA, ayanaamsha_id), (AngaType.KARANA, ayanaamsha_id), (AngaType.RASHI, ayanaamsha_id), (AngaType.SOLAR_NAKSH, ayanaamsha_id)]
+  return {anga_type.name: zodiac.AngaTimeline(ayanaamsha_id=anga_ayanaamsha_id, anga_type=anga_type, jd_start=jd_start, jd_end=jd_end, root_finder=computation_system.root_finder) for anga_type, anga_ayanaamsha_id in anga_types}
+
+
+@timebudget
+def get_rise_set_times(city, computation_system, jd_start, jd_end):
+  """Sweep through the whole period once per body, so that daily panchaangas can just look up risings and settings."""
+  if not computation_system.sweep_rise_set_times:
+    return None
+  return RiseSetTimes(city=city, jd_start=jd_start, jd_end=jd_end, bodies=[Graha.SUN, Graha.MOON] + Graha.PLANETS_REVERSE_ORDER)
+
+
+@timebudget
+def get_sunset_times(city, jd_start, jd_end):
+  """Sunsets from a month or so before the period till its end, computed once for counting solar and tropical month days - unless the period is short enough for the process-level cache (see SunsetTimes.get_cached) to be cheaper."""
+  if jd_end - jd_start <= SunsetTimes.BLOCK_DAYS:
+    return None
+  # Margins for days being counted from month starts up to 35 days before, and for timezones.
+  return SunsetTimes(city=city, jd_start=jd_start - SunsetTimes.BLOCK_MARGIN_DAYS, jd_end=jd_end + 2)
+
+
+def compute_daily_panchaangas(city, computation_system, jd_start, day_offsets, compute_lagnas=True, previous_day_panchaanga=None):
+  """Daily panchaangas for the consecutive days jd_start + day_offsets, each computed with the help of the previous one.
+
+  :param previous_day_panchaanga: The daily panchaanga for the day before the first one, if available.
+  """
+  # Margins below account for timezones, for the last day's next sunrise and for its next day's noon (needed by some festivals).
+  anga_timelines = get_anga_timelines(computation_system=computation_system, jd_start=jd_start + day_offsets[0] - 1, jd_end=jd_start + day_offsets[-1] + 4)
+  rise_set_times = get_rise_set_times(city=city, computation_system=computation_system, jd_start=jd_start + day_offsets[0] - 1, jd_end=jd_start + day_offsets[-1] + 5)
+  sunset_times = get_sunset_times(city=city, jd_start=jd_start + day_offsets[0], jd_end=jd_start + day_offsets[-1])
+  daily_panchaangas = []
+  previous_daily_panchaanga = previous_day_panchaanga
+  for d in day_offsets:
+    date_d = time.jd_to_utc_gregorian(jd_start + d)
+    date_d.set_time_to_day_start()
+    daily_panchaanga = daily.DailyPanchaanga(city=city, date=date_d,
+                                             computation_system=computation_system,
+                                             previous_day_panchaanga=previous_daily_panchaanga, anga_timelines=anga_timelines, rise_set_times=rise_set_times, sunset_times=sunset_times)
+    if compute_lagnas and computation_system.needs_output("lagna_data"):
+      daily_panchaanga.get_lagna_data()
+    daily_panchaangas.append(daily_panchaanga)
+    previous_daily_panchaanga = daily_panchaanga
+  return daily_panchaangas
+
+
+# Days computed at the start of each parallel chunk (but the first) without the help of a previous day, and then discarded.
+STITCHING_OVERLAP_DAYS = 2
+# Floats (mostly julian days) in daily panchaangas computed serially and in parallel must agree to within this - far below what is ever displayed.
+STITCHING_TOLERANCE = 1e-6
+
+
+def _compute_daily_panchaanga_chunk(pickled_arguments, jd_start, day_offsets, compute_lagnas, longitude_tables, ayanaamsha_curves):
+  (city, computation_system) = pickle.loads(pickled_arguments)
+  with chebyshev.tables_in_use(longitude_tables), ayanaamsha_curve.curves_in_use(ayanaamsha_curves):
+    daily_panchaangas = compute_daily_panchaangas(city=city, computation_system=computation_system, jd_start=jd_start, day_offsets=day_offsets, compute_lagnas=compute_lagnas)
+  for daily_panchaanga in daily_panchaangas:
+    # Links to previous days and shared objects are restored by the parent process. Pickling that chain of days would anyway be needlessly deep.
+    daily_panchaanga._previous_day_panchaanga = None
+    daily_panchaanga._anga_timelines = {}
+    daily_panchaanga._sunset_times = None
+    daily_panchaanga.city = None
+    daily_panchaanga.computation_system = None
+  return util.pickle_dumps(daily_panchaangas)
+
+
+def compute_daily_panchaangas_in_parallel(city, computation_system, jd_start, day_offsets, num_processes, compute_lagnas=True):
+  """Same as compute_daily_panchaangas, but with contiguous chunks of days computed in separate processes.
+
+  Each chunk but the first starts STITCHING_OVERLAP_DAYS early, without the help of a previous day. While stitching, days at the start of a chunk are recomputed from the (already stitched) previous day till they agree with those of the chunk - from there on, the chunk is as good as the serial computation.
+  """
+  chunk_length = int(math.ceil(len(day_offsets) / num_processes))
+  if chunk_length <= STITCHING_OVERLAP_DAYS:
+    return compute_daily_panchaangas(city=city, computation_system=computation_system, jd_start=jd_start, day_offsets=day_offsets, compute_lagnas=compute_lagnas)
+  chunks = [day_offsets[i:i + chunk_length] for i in range(0, len(day_offsets), chunk_length)]
+  # JsonObjects need a special pickler - see util.JsonObjectPickler.
+  pickled_arguments = util.pickle_dumps((city, computation_system))
+  with concurrent.futures.ProcessPoolExecutor(max_workers=num_processes) as executor:
+    futures = []
+    for index, chunk in enumerate(chunks):
+      overlap = [] if index == 0 else list(range(chunk[0] - STITCHING_OVERLAP_DAYS, chunk[0]))
+      futures.append(executor.submit(_compute_daily_panchaanga_chunk, pickled_arguments=pickled_arguments, jd_start=jd_start, day_offsets=overlap + chunk, compute_lagnas=compute_lagnas, longitude_tables=chebyshev.get_tables_in_use(), ayanaamsha_curves=ayanaamsha_curve.get_curves_in_use()))
+    chunk_results = [pickle.loads(future.result()) for future in futures]
+
+  daily_panchaangas = []
+  _append_chunk(daily_panchaangas=daily_panchaangas, chunk_daily_panchaangas=chunk_results[0], city=city, computation_system=computation_system)
+  for chunk_daily_panchaangas in chunk_results[1:]:
+    _stitch_chunk(daily_panchaangas=daily_panchaangas, chunk_daily_panchaangas=chunk_daily_panchaangas[STITCHING_OVERLAP_DAYS:], city=city, computation_system=computation_system, compute_lagnas=compute_lagnas)
+  return daily_panchaangas
+
+
+def _append_chunk(daily_panchaangas, chunk_daily_panchaangas, city, computation_system):
+  for daily_panchaanga in chunk_daily_panchaangas:
+    daily_panchaanga.city = city
+    daily_panchaanga.computation_system = computation_system
+    daily_panchaanga._previous_day_panchaanga = daily_panchaangas[-1] if len(daily_panchaangas) > 0 else None
+    daily_panchaangas.append(daily_panchaanga)
+
+
+def _stitch_chunk(daily_panchaangas, chunk_daily_panchaangas, city, computation_system, compute_lagnas):
+  for index, chunk_daily_panchaanga in enumerate(chunk_daily_panchaangas):
+    daily_panchaanga = daily.DailyPanchaanga(city=city, date=chunk_daily_panchaanga.date, computation_system=computation_system, previous_day_panchaanga=daily_panchaangas[-1])
+    if compute_lagnas and computation_system.needs_output("lagna_data"):
+      daily_panchaanga.get_lagna_data()
+    # city and computation_system are shared anyway.
+    chunk_daily_panchaanga.city = city
+    chunk_daily_panchaanga.computation_system = computation_system
+    if _json_maps_agree(daily_panchaanga.to_json_map(), chunk_daily_panchaanga.to_json_map()):
+      _append_chunk(daily_panchaangas=daily_panchaangas, chunk_daily_panchaangas=chunk_daily_panchaangas[index:], city=city, computation_system=computation_system)
+      return
+    logging.debug("Chunk day %s differs from the serial computation - using the latter.", chunk_daily_panchaanga.date.get_date_str())
+    daily_panchaangas.append(daily_panchaanga)
+
+
+def _json_maps_agree(json_map_1, json_map_2, tolerance=STITCHING_TOLERANCE):
+  if isinstance(json_map_1, dict) and isinstance(json_map_2, dict):
+    return json_map_1.keys() == json_map_2.keys() and all(_json_maps_agree(json_map_1[key], json_map_2[key], tolerance=tolerance) for key in json_map_1)
+  elif isinstance(json_map_1, list) and isinstance(json_map_2, list):
+    return len(json_map_1) == len(json_map_2) and all(_json_maps_agree(item_1, item_2, tolerance=tolerance) for item_1, item_2 in zip(json_map_1, json_map_2))
+  elif isinstance(json_map_1, float) and isinstance(json_map_2, float):
+    return abs(json_map_1 - json_map_2) <= tolerance
+  else:
+    return json_map_1 == json_map_2
+
 
 # Essential for depickling to work.
 common.update_json_class_index(sys.modules[__name__])
@@ -0,0 +1,131 @@
+"""
+A persistent store of rising and setting times - which do not depend on the computation system, and so need not be computed afresh when the same city-year is generated under several computation systems (or repeatedly).
+
+While a store is in use (see store_in_use), City.get_rising_time and City.get_setting_time look up (and fill) it. Entries are keyed by the city coordinates, body, event and the exact starting time of the search - so results are identical to fresh computation.
+"""
+import contextlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.expanduser("~/.cache/jyotisha/rise_set.sqlite")
+
+EVENT_RISE = 1
+EVENT_SET = 2
+
+_thread_local = threading.local()
+
+
+def get_store():
+  """The store in use (in this thread), if any. See store_in_use."""
+  return getattr(_thread_local, "store", None)
+
+
+def set_store(rise_set_store):
+  _thread_local.store = rise_set_store
+
+
+class RiseSetStore(object):
+  """sqlite backed. Entries of a city are read into memory on the first lookup for it (entries added later by other processes are read on a miss), and new entries are written in batches (see flush).
+
+  Whole cities are evicted, least recently used first, once there are more than max_entries entries.
+
+  A store may be shared by threads - its connection and in-memory entries are guarded by a lock.
+  """
+  FLUSH_EVERY = 2000
+
+  def __init__(self, path=DEFAULT_PATH, max_entries=5000000):
+    self.path = path
+    self.max_entries = max_entries
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Several (batch generation) processes may share the file.
+    self._connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+    self._lock = threading.RLock()
+    self._connection.execute("PRAGMA journal_mode=WAL")
+    self._connection.execute("CREATE TABLE IF NOT EXISTS events (latitude REAL, longitude REAL, body TEXT, event INTEGER, jd_start REAL, jd_event REAL, PRIMARY KEY (latitude, longitude, body, event, jd_start)) WITHOUT ROWID")
+    self._connection.execute("CREATE TABLE IF NOT EXISTS cities (latitude REAL, longitude REAL, last_used REAL, PRIMARY KEY (latitude, longitude))")
+    self._connection.commit()
+    # (latitude, longitude) -> {(body, event, jd_start): jd_event}
+    self._city_events = {}
+    self._pending_rows = []
+    # (latitude, longitude) -> last use, yet to be written to the cities table.
+    self._pending_last_used = {}
+
+  def _get_city_events(self, latitude, longitude):
+    city_key = (latitude, longitude)
+    if city_key not in self._city_events:
+      rows = self._connection.execute("SELECT body, event, jd_start, jd_event FROM events WHERE latitude = ? AND longitude = ?", city_key).fetchall()
+      self._city_events[city_key] = {(body, event, jd_start): jd_event for (body, event, jd_start, jd_event) in rows}
+    self._pending_last_used[city_key] = time.time()
+    return self._city_events[city_key]
+
+  def get_event_time(self, latitude, longitude, body, event, jd_start, compute_fn):
+    """The stored time of the event - else compute_fn(), which is then stored."""
+    with self._lock:
+      city_events = self._get_city_events(latitude=latitude, longitude=longitude)
+      jd_event = city_events.get((body, event, jd_start), None)
+      if jd_event is not None:
+        return jd_event
+      # Another process may have stored it since the city was read.
+      row = self._connection.execute("SELECT jd_event FROM events WHERE latitude = ? AND longitude = ? AND body = ? AND event = ? AND jd_start = ?", (latitude, longitude, body, event, jd_start)).fetchone()
+      if row is not None:
+        city_events[(body, event, jd_start)] = row[0]
+        return row[0]
+    # Computed outside the lock, so that other threads are not held up.
+    jd_event = compute_fn()
+    with self._lock:
+      # The city may have been evicted meanwhile.
+      self._get_city_events(latitude=latitude, longitude=longitude)[(body, event, jd_start)] = jd_event
+      self._pending_rows.append((latitude, longitude, body, event, jd_start, jd_event))
+      if len(self._pending_rows) >= self.FLUSH_EVERY:
+        self.flush()
+    return jd_event
+
+  def flush(self):
+    with self._lock:
+      if len(self._pending_rows) == 0 and len(self._pending_last_used) == 0:
+        return
+      num_rows = len(self._pending_rows)
+      self._connection.executemany("INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?)", self._pending_rows)
+      self._connection.executemany("INSERT OR REPLACE INTO cities VALUES (?, ?, ?)", [(latitude, longitude, last_used) for ((latitude, longitude), last_used) in self._pending_last_used.items()])
+      self._pending_rows = []
+      self._pending_last_used = {}
+      self._connection.commit()
+      if num_rows > 0:
+        self.evict()
+
+  def evict(self):
+    with self._lock:
+      self._evict()
+
+  def _evict(self):
+    (num_entries,) = self._connection.execute("SELECT COUNT(*) FROM events").fetchone()
+    if num_entries <= self.max_entries:
+      return
+    for (latitude, longitude) in self._connection.execute("SELECT latitude, longitude FROM cities ORDER BY last_used").fetchall():
+      if num_entries <= self.max_entries:
+        break
+      num_entries -= self._connection.execute("DELETE FROM events WHERE latitude = ? AND longitude = ?", (latitude, longitude)).rowcount
+      self._connection.execute("DELETE FROM cities WHERE latitude = ? AND longitude = ?", (latitude, longitude))
+      self._city_events.pop((latitude, longitude), None)
+      logging.info("Evicted rising and setting times for %s", str([latitude, longitude]))
+    self._connection.commit()
+
+  def close(self):
+    with self._lock:
+      self.flush()
+      self._connection.close()
+
+
+@contextlib.contextmanager
+def store_in_use(rise_set_store):
+  """Within this context (and thread), rising and setting times are looked up in (and added to) the given store."""
+  previous_store = get_store()
+  set_store(rise_set_store)
+  try:
+    yield rise_set_store
+  finally:
+    rise_set_store.flush()
+    set_store(previous_store)
@@ -53,7 +53,7 @@ def get_2_day_interval_boundary_angas(kaala, anga_type, p0, p1):
 
 
 class FestivalOptions(JsonObject):
-  def __init__(self, set_lagnas=None, no_fests=None, fest_repos=None, fest_ids_included_unimplemented=None, fest_id_patterns_excluded=None, fest_repos_excluded_patterns=[], aparaahna_as_second_half=False, prefer_eight_fold_day_division=False, set_pancha_paxi_activities=None, julian_handling=RulesCollection.JULIAN_TO_GREGORIAN, tropical_month_start="mAdhava_at_equinox"):
+  def __init__(self, set_lagnas=None, no_fests=None, fest_repos=None, fest_ids_included_unimplemented=None, fest_id_patterns_excluded=None, fest_repos_excluded_patterns=[], aparaahna_as_second_half=False, prefer_eight_fold_day_division=False, set_pancha_paxi_activities=None, julian_handling=RulesCollection.JULIAN_TO_GREGORIAN, tropical_month_start="mAdhava_at_equinox", set_maudhya_events=None, set_graha_yuddhas=None):
     """
     
     :param set_lagnas: 
@@ -65,10 +65,14 @@ class FestivalOptions(JsonObject):
     :param prefer_eight_fold_day_division: 
     :param set_pancha_paxi_activities: 
     :param julian_handling: 
+    :param set_maudhya_events: Whether to add the setting and rising (mauDhya start and end) of the tArA-grahas as festival instances.
+    :param set_graha_yuddhas: Whether to add graha-yuddhas (tArA-grahas within a degree of each other) as festival instances.
     """
     super().__init__()
     self.set_lagnas = set_lagnas
     self.set_pancha_paxi_activities = set_pancha_paxi_activities
+    self.set_maudhya_events = set_maudhya_events
+    self.set_graha_yuddhas = set_graha_yuddhas
     self.aparaahna_as_second_half = aparaahna_as_second_half
     self.no_fests = no_fests
     self.tropical_month_start = tropical_month_start
@@ -150,12 +154,27 @@ class ComputationSystem(JsonObject):
   SOLSTICE_POST_DARK_10_ADHIKA__RP = None
   MIN_SOLARCOMPUTATION__CHITRA_180 = None
   DEFAULT = None
+  # Valid entries of needed_outputs.
+  OPTIONAL_OUTPUTS = ["graha_rise_jd", "graha_set_jd", "lagna_data", "paxi_activities", "mauDhyas", "graha_raashis_with_ends", "festival_id_to_instance"]
 
-  def __init__(self, lunar_month_assigner_type, ayanaamsha_id, short_id=None, festival_options=FestivalOptions()):
+  def __init__(self, lunar_month_assigner_type, ayanaamsha_id, short_id=None, festival_options=FestivalOptions(), longitude_table_tolerance=None, root_finder=None, sweep_rise_set_times=None, needed_outputs=None, ayanaamsha_curve_tolerance=None):
+    """
+    
+    :param longitude_table_tolerance: If set (in degrees), solar and lunar longitudes over a panchaanga period are evaluated from Chebyshev fits accurate to within this tolerance, rather than from swisseph. See chebyshev.LongitudeTable.
+    :param ayanaamsha_curve_tolerance: If set (in degrees), ayanaamsha offsets over a panchaanga period are interpolated from curves accurate to within this tolerance, rather than computed afresh for every longitude. See ayanaamsha_curve.AyanaamshaCurve.
+    :param root_finder: Method used to locate anga boundaries and transits - one of those in root_finding. None means brentq.
+    :param sweep_rise_set_times: If True, risings and settings over a panchaanga period are computed in one sweep per body (see spatio_temporal.RiseSetTimes), rather than day by day. rise_trans results depend (very slightly) on the starting time of the search, and it misses events within seconds of it - so results may differ from the day by day computation.
+    :param needed_outputs: Optional list of the optional DailyPanchaanga outputs (attribute names - see OPTIONAL_OUTPUTS) which are to be computed upfront - for runs whose writers consume only a few of them. None means all of them. Those left out are computed when first asked for (if possible) - except for festivals, mauDhyas and graha raashis, which are then skipped altogether.
+    """
     super().__init__()
     self.lunar_month_assigner_type = lunar_month_assigner_type
     self.ayanaamsha_id = ayanaamsha_id
     self.festival_options = festival_options
+    self.longitude_table_tolerance = longitude_table_tolerance
+    self.root_finder = root_finder
+    self.sweep_rise_set_times = sweep_rise_set_times
+    self.needed_outputs = needed_outputs
+    self.ayanaamsha_curve_tolerance = ayanaamsha_curve_tolerance
     self.graha_lopa_measures = GrahaLopaMeasures()
     self.post_load_ops()
     self.short_id = short_id
@@ -171,6 +190,12 @@ class ComputationSystem(JsonObject):
       if not hasattr(self.festival_options, "repos") or self.festival_options.repos is None:
         self.festival_options.init_repos()
 
+  def needs_output(self, output_name):
+    return self.needed_outputs is None or output_name in self.needed_outputs
+
+  def needs_festivals(self):
+    return not self.festival_options.no_fests and self.needs_output("festival_id_to_instance")
+
   def __repr__(self):
     return "%s__%s" % (self.lunar_month_assigner_type, self.ayanaamsha_id)
 
@@ -0,0 +1,129 @@
+import contextlib
+import logging
+import math
+
+import methodtools
+import numpy
+
+from jyotisha.panchaanga.temporal import zodiac
+from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
+
+
+class AyanaamshaCurve(object):
+  """Ayanaamsha offsets over [jd_start, jd_end], interpolated linearly between samples.
+
+  While in use (see curves_in_use), Ayanamsha.get_offset (and hence sidereal longitudes and lagnas) reads offsets off this curve instead of computing them afresh - via swe.fixstar_ut for CHITRA_AT_180. The offset drifts by under a minute of arc a year, wobbling by some 20 seconds of arc (aberration) over the year, so daily samples suffice for errors of a few millionths of a degree.
+  """
+  DEFAULT_STEP_DAYS = 1.0
+  MIN_STEP_DAYS = 1 / 64.0
+  # Curves are built (and cached) for aligned blocks of these many days - so that all panchaangas computed in a process for nearby periods share them.
+  BLOCK_DAYS = 1024
+
+  def __init__(self, ayanaamsha_id, jd_start, jd_end, step_days=None):
+    self.ayanaamsha_id = ayanaamsha_id
+    self.step_days = step_days or self.DEFAULT_STEP_DAYS
+    num_steps = max(1, int(numpy.ceil((jd_end - jd_start) / self.step_days)))
+    self.jd_start = jd_start
+    self.jd_end = jd_start + num_steps * self.step_days
+    self.jds = jd_start + self.step_days * numpy.arange(num_steps + 1)
+    self.offsets = Ayanamsha.singleton(ayanaamsha_id)._get_exact_offsets(self.jds)
+    # Plain floats are quicker to index for single lookups.
+    self._offset_list = self.offsets.tolist()
+
+  def covers(self, jd):
+    return self.jd_start <= jd <= self.jd_end
+
+  def get_offset(self, jd):
+    position = (jd - self.jd_start) / self.step_days
+    index = min(int(position), len(self._offset_list) - 2)
+    (offset_1, offset_2) = (self._offset_list[index], self._offset_list[index + 1])
+    return offset_1 + (position - index) * (offset_2 - offset_1)
+
+  def get_offsets(self, jds):
+    return numpy.interp(numpy.asarray(jds, dtype=float), self.jds, self.offsets)
+
+  def get_max_error(self):
+    """Maximum deviation (in degrees) from the exact offsets, measured midway between samples (where linear interpolation is worst)."""
+    jds = self.jds[:-1] + self.step_days / 2
+    return numpy.max(numpy.abs(self.get_offsets(jds) - Ayanamsha.singleton(self.ayanaamsha_id)._get_exact_offsets(jds)))
+
+  @classmethod
+  def fit(cls, ayanaamsha_id, jd_start, jd_end, tolerance):
+    """Build a curve, shortening the steps till the error (in degrees) is within tolerance."""
+    step_days = cls.DEFAULT_STEP_DAYS
+    while True:
+      curve = cls(ayanaamsha_id=ayanaamsha_id, jd_start=jd_start, jd_end=jd_end, step_days=step_days)
+      max_error = curve.get_max_error()
+      if max_error <= tolerance:
+        return curve
+      step_days = step_days / 2
+      if step_days < cls.MIN_STEP_DAYS:
+        raise ValueError("Could not fit %s offsets within %g degrees (error %g)" % (ayanaamsha_id, tolerance, max_error))
+      logging.debug("Refitting %s offsets with %g day steps (error %g)", ayanaamsha_id, step_days, max_error)
+
+  @methodtools.lru_cache(maxsize=64)
+  @classmethod
+  def get_cached(cls, ayanaamsha_id, block_start, tolerance):
+    return cls.fit(ayanaamsha_id=ayanaamsha_id, jd_start=block_start, jd_end=block_start + cls.BLOCK_DAYS, tolerance=tolerance)
+
+
+class BlockedAyanaamshaCurve(object):
+  """Consecutive AyanaamshaCurve blocks, used as one curve - for ranges straddling block boundaries."""
+
+  def __init__(self, blocks):
+    self.blocks = blocks
+    self.ayanaamsha_id = blocks[0].ayanaamsha_id
+    self.jd_start = blocks[0].jd_start
+    self.jd_end = blocks[-1].jd_end
+
+  def covers(self, jd):
+    return self.jd_start <= jd <= self.jd_end
+
+  def _get_block_index(self, jd):
+    return min(int((jd - self.jd_start) // AyanaamshaCurve.BLOCK_DAYS), len(self.blocks) - 1)
+
+  def get_offset(self, jd):
+    return self.blocks[self._get_block_index(jd)].get_offset(jd)
+
+  def get_offsets(self, jds):
+    jds = numpy.asarray(jds, dtype=float)
+    block_indices = numpy.minimum(((jds - self.jd_start) // AyanaamshaCurve.BLOCK_DAYS).astype(int), len(self.blocks) - 1)
+    offsets = numpy.zeros(jds.shape)
+    for block_index in numpy.unique(block_indices):
+      mask = block_indices == block_index
+      offsets[mask] = self.blocks[block_index].get_offsets(jds[mask])
+    return offsets
+
+
+def get_curve(ayanaamsha_id, jd_start, jd_end, tolerance):
+  """A curve covering [jd_start, jd_end], made of blocks of AyanaamshaCurve.BLOCK_DAYS - each built once per process (while among the recently used ones)."""
+  first_block_index = math.floor(jd_start / AyanaamshaCurve.BLOCK_DAYS)
+  last_block_index = max(first_block_index, math.ceil(jd_end / AyanaamshaCurve.BLOCK_DAYS) - 1)
+  blocks = [AyanaamshaCurve.get_cached(ayanaamsha_id, block_index * AyanaamshaCurve.BLOCK_DAYS, tolerance) for block_index in range(first_block_index, last_block_index + 1)]
+  if len(blocks) == 1:
+    return blocks[0]
+  return BlockedAyanaamshaCurve(blocks=blocks)
+
+
+def get_curves(ayanaamsha_ids, jd_start, jd_end, tolerance):
+  """Curves covering [jd_start, jd_end] - see get_curve.
+
+  Ayanaamshas with constant (zero) offsets need no curve, and are skipped.
+  """
+  ayanaamsha_ids = sorted(set(ayanaamsha_ids) - {Ayanamsha.VERNAL_EQUINOX_AT_0, Ayanamsha.ASHVINI_STARTING_0})
+  return [get_curve(ayanaamsha_id=ayanaamsha_id, jd_start=jd_start, jd_end=jd_end, tolerance=tolerance) for ayanaamsha_id in ayanaamsha_ids]
+
+
+def get_curves_in_use():
+  return list(zodiac.get_ayanaamsha_curves().values())
+
+
+@contextlib.contextmanager
+def curves_in_use(curves):
+  """Within this context (and thread), the given curves stand in for fresh ayanaamsha computation (within their ranges)."""
+  previous_curves = zodiac.get_ayanaamsha_curves()
+  zodiac.set_ayanaamsha_curves({**previous_curves, **{curve.ayanaamsha_id: curve for curve in curves}})
+  try:
+    yield
+  finally:
+    zodiac.set_ayanaamsha_curves(previous_curves)
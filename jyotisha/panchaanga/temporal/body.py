@@ -1,15 +1,29 @@
 import logging
 import math
 import sys
+import threading
 
 import methodtools
+import numpy
 import swisseph as swe
-from scipy.optimize import brentq
-
+from jyotisha.panchaanga.temporal import root_finding
 from sanskrit_data.schema import common
 from sanskrit_data.schema.common import JsonObject
 
 
+# Per thread - lest concurrent computations (as in the API server) use each other's tables.
+_thread_local = threading.local()
+
+
+def get_longitude_tables():
+  """body_name -> chebyshev.LongitudeTable, used in place of swisseph within the table range. See chebyshev.tables_in_use."""
+  return getattr(_thread_local, "longitude_tables", {})
+
+
+def set_longitude_tables(longitude_tables):
+  _thread_local.longitude_tables = longitude_tables
+
+
 class Transit(JsonObject):
   def __init__(self, body, jd, anga_type, value_1, value_2):
     super().__init__()
@@ -63,7 +77,6 @@ class Graha(JsonObject):
       body_id = swe.TRUE_NODE
     return body_id
 
-  @methodtools.lru_cache(maxsize=10)
   def get_longitude(self, jd, ayanaamsha_id=None):
     """
     
@@ -72,21 +85,82 @@ class Graha(JsonObject):
     Default value of ayanaamsha_id here is deliberately None.
     :return: 
     """
+    ayanaamsha_curve = None
+    if ayanaamsha_id is not None:
+      from jyotisha.panchaanga.temporal import zodiac
+      ayanaamsha_curve = zodiac.get_ayanaamsha_curves().get(ayanaamsha_id, None)
+    return self._get_longitude(jd=jd, ayanaamsha_id=ayanaamsha_id, table=get_longitude_tables().get(self.body_name, None), ayanaamsha_curve=ayanaamsha_curve)
+
+  @methodtools.lru_cache(maxsize=10)
+  def _get_longitude(self, jd, ayanaamsha_id, table, ayanaamsha_curve):
+    # The table and ayanaamsha curve in use are part of the cache key, so that computations with different ones do not share results.
     if ayanaamsha_id is not None:
       from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
       return (self.get_longitude(jd=jd) - Ayanamsha.singleton(ayanaamsha_id).get_offset(jd)) % 360
     else:
-      
+      if table is not None and table.covers(jd):
+        return table.get_longitude(jd)
       if self.body_name == Graha.KETU:
         return (swe.degnorm(swe.calc_ut(jd, swe.TRUE_NODE)[0][0]) + 180) % 360
       return swe.degnorm(swe.calc_ut(jd, self._get_swisseph_id())[0][0])
 
-  def get_transits(self, jd_start: float, jd_end: float, ayanaamsha_id: str, anga_type: object) -> [Transit]:
+  def get_longitude_and_speed(self, jd, ayanaamsha_id=None):
+    """
+    
+    :return: (longitude, speed in degrees per day). The speed ignores the (tiny) drift of the ayanaamsha. 
+    """
+    table = get_longitude_tables().get(self.body_name, None)
+    if table is not None and table.covers(jd):
+      (longitude, speed) = table.get_longitude_and_speed(jd)
+    else:
+      swisseph_id = swe.TRUE_NODE if self.body_name == Graha.KETU else self._get_swisseph_id()
+      ((longitude, _, _, speed, _, _), _) = swe.calc_ut(jd, swisseph_id, swe.FLG_SWIEPH | swe.FLG_SPEED)
+      longitude = swe.degnorm(longitude)
+      if self.body_name == Graha.KETU:
+        longitude = (longitude + 180) % 360
+    if ayanaamsha_id is not None:
+      from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
+      longitude = (longitude - Ayanamsha.singleton(ayanaamsha_id).get_offset(jd)) % 360
+    return (longitude, speed)
+
+  def _get_swisseph_longitudes(self, jds):
+    jds = numpy.asarray(jds, dtype=float)
+    if self.body_name == Graha.KETU:
+      swisseph_id = swe.TRUE_NODE
+    else:
+      swisseph_id = self._get_swisseph_id()
+    calc_ut = swe.calc_ut
+    longitudes = numpy.fromiter((calc_ut(jd, swisseph_id)[0][0] for jd in jds.flat), dtype=float, count=jds.size).reshape(jds.shape) % 360
+    if self.body_name == Graha.KETU:
+      longitudes = (longitudes + 180) % 360
+    return longitudes
+
+  def get_longitudes(self, jds, ayanaamsha_id=None):
+    """Batch counterpart of get_longitude - avoids the per-call overhead (caching, object lookups) around swisseph.
+    
+    :param jds: A sequence or numpy array of julian days.
+    :param ayanaamsha_id: 
+    Default value of ayanaamsha_id here is deliberately None.
+    :return: A numpy array of longitudes, of the same shape as jds.
+    """
+    jds = numpy.asarray(jds, dtype=float)
+    table = get_longitude_tables().get(self.body_name, None)
+    if table is not None and jds.size > 0 and table.covers(jds.min()) and table.covers(jds.max()):
+      longitudes = table.get_longitudes(jds)
+    else:
+      longitudes = self._get_swisseph_longitudes(jds)
+    if ayanaamsha_id is not None:
+      from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
+      longitudes = (longitudes - Ayanamsha.singleton(ayanaamsha_id).get_offsets(jds)) % 360
+    return longitudes
+
+  def get_transits(self, jd_start: float, jd_end: float, ayanaamsha_id: str, anga_type: object, root_finder: str = None) -> [Transit]:
     """Returns the next transit of the given planet e.g. jupiter
 
       Args:
         float jd_start, jd_end: The Julian Days between which transits must be computed
         int planet  - e.g. sun, jupiter, ...
+        str root_finder: One of the methods in root_finding. Default is brentq.
     
       Returns:
         List of tuples [(float jd_transit, int old_rashi, int new_rashi)]
@@ -99,39 +173,42 @@ class Graha(JsonObject):
     MIN_JUMP = min(1.0, jd_end - jd_start)
     # TODO: Could be tweaked based on planet using a dict?
 
-    curr_L_bracket = jd_start
-    curr_R_bracket = jd_start + MIN_JUMP
+    # Sample the divisions on the whole grid in one go, and then refine only the brackets where the division changes.
+    grid_jds = jd_start + MIN_JUMP * numpy.arange(1 + math.floor((jd_end - jd_start) / MIN_JUMP))
+    divisions = numpy.floor(self.get_longitudes(jds=grid_jds, ayanaamsha_id=ayanaamsha_id) / arc_length).astype(int) + 1
 
-    while curr_R_bracket <= jd_end:
-      L_division = math.floor(self.get_longitude(curr_L_bracket,
-                                                     ayanaamsha_id=ayanaamsha_id) / arc_length) + 1
-      R_division = math.floor(self.get_longitude(curr_R_bracket,
-                                                     ayanaamsha_id=ayanaamsha_id) / arc_length) + 1
-
-      if L_division == R_division:
-        curr_R_bracket += MIN_JUMP
+    jd_transit = None
+    for index in numpy.flatnonzero(divisions[1:] != divisions[:-1]):
+      curr_L_bracket = grid_jds[index]
+      curr_R_bracket = grid_jds[index + 1]
+      if jd_transit is not None and curr_L_bracket < jd_transit + MIN_JUMP:
+        # Ignore jitter within a day of the previous transit.
+        continue
+      L_division = int(divisions[index])
+      R_division = int(divisions[index + 1])
+      # We have bracketed a transit!
+      if L_division < R_division:
+        target = R_division
       else:
-        # We have bracketed a transit!
-        if L_division < R_division:
-          target = R_division
-        else:
-          # retrograde transit
-          target = L_division
-        try:
-          def get_longitude_offset(jd):
-            return self.get_longitude(jd=jd, ayanaamsha_id=ayanaamsha_id) + (-target + 1) * arc_length
-
-          # noinspection PyTypeChecker
-          jd_transit = \
-            brentq(get_longitude_offset,
-                   curr_L_bracket, curr_R_bracket)
-          transits += [Transit(body=self.body_name, jd=jd_transit, anga_type=anga_type.name, value_1=L_division, value_2=R_division)]
-          curr_R_bracket += MIN_JUMP
-          curr_L_bracket = jd_transit + MIN_JUMP
-        except ValueError:
-          logging.error('Unable to compute transit of planet;\
-                                   possibly could not bracket correctly!\n')
-          return None
+        # retrograde transit
+        target = L_division
+      try:
+        def get_longitude_offset(jd):
+          return self.get_longitude(jd=jd, ayanaamsha_id=ayanaamsha_id) + (-target + 1) * arc_length
+
+        def get_longitude_offset_and_speed(jd):
+          (longitude, speed) = self.get_longitude_and_speed(jd=jd, ayanaamsha_id=ayanaamsha_id)
+          return (longitude + (-target + 1) * arc_length, speed)
+
+        # noinspection PyTypeChecker
+        jd_transit = \
+          root_finding.find_root(get_longitude_offset,
+                 curr_L_bracket, curr_R_bracket, f_and_derivative=get_longitude_offset_and_speed, method=root_finder)
+        transits += [Transit(body=self.body_name, jd=jd_transit, anga_type=anga_type.name, value_1=L_division, value_2=R_division)]
+      except ValueError:
+        logging.error('Unable to compute transit of planet;\
+                                 possibly could not bracket correctly!\n')
+        return None
 
     if len(transits) == 0:
       from jyotisha.panchaanga.temporal.time import ist_timezone
@@ -169,6 +246,36 @@ def longitude_difference(jd, body1, body2):
   if diff < -180:
     return 360 + diff
 
+def get_longitudes(body_names, jds, ayanaamsha_ids=(None,)):
+  """Longitudes of several bodies, per several ayanaamshas, at several times.
+
+  Each body is computed once (tropically), and each ayanaamsha offset once, irrespective of the number of combinations.
+  
+  :param body_names: Example: [Graha.SUN, Graha.MOON]
+  :param jds: A sequence or numpy array of julian days.
+  :param ayanaamsha_ids: None stands for tropical longitudes. 
+  :return: A numpy array of shape (len(body_names), len(ayanaamsha_ids), len(jds)).
+  """
+  from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
+  jds = numpy.asarray(jds, dtype=float)
+  offsets = numpy.array([numpy.zeros(jds.shape) if ayanaamsha_id is None else Ayanamsha.singleton(ayanaamsha_id).get_offsets(jds) for ayanaamsha_id in ayanaamsha_ids])
+  tropical_longitudes = numpy.array([Graha.singleton(body_name).get_longitudes(jds=jds) for body_name in body_names])
+  return (tropical_longitudes[:, numpy.newaxis, :] - offsets[numpy.newaxis, :, :]) % 360
+
+
+_ephe_path_set = False
+
+
+def _set_ephe_path():
+  """Point swisseph to sefstars.txt (and the ephemeris files alongside) - once per process, rather than on every star lookup."""
+  global _ephe_path_set
+  if not _ephe_path_set:
+    from jyotisha.panchaanga.temporal import data
+    import os
+    swe.set_ephe_path(os.path.dirname(data.__file__))
+    _ephe_path_set = True
+
+
 def get_star_longitude(star, jd):
   """ Calculate star longitude based on sefstars.txt.
   
@@ -176,11 +283,22 @@ def get_star_longitude(star, jd):
   :param jd: 
   :return: 
   """
-  from jyotisha.panchaanga.temporal import data
-  import os
-  swe.set_ephe_path(os.path.dirname(data.__file__))
+  _set_ephe_path()
   (long, lat, _, _, _, _) = swe.fixstar_ut(star, jd)[0]
   return long
 
+
+def get_star_longitudes(star, jds):
+  """Batch counterpart of get_star_longitude.
+  
+  :param star: Example: Spica. 
+  :param jds: A sequence or numpy array of julian days.
+  :return: A numpy array of the same shape as jds.
+  """
+  _set_ephe_path()
+  jds = numpy.asarray(jds, dtype=float)
+  fixstar_ut = swe.fixstar_ut
+  return numpy.fromiter((fixstar_ut(star, jd)[0][0] for jd in jds.flat), dtype=float, count=jds.size).reshape(jds.shape)
+
 # Essential for depickling to work.
 common.update_json_class_index(sys.modules[__name__])
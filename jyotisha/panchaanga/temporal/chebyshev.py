@@ -0,0 +1,117 @@
+import contextlib
+import logging
+
+import numpy
+from numpy.polynomial import chebyshev
+
+from jyotisha.panchaanga.temporal import body
+from jyotisha.panchaanga.temporal.body import Graha
+
+
+class LongitudeTable(object):
+  """Piecewise Chebyshev fit to the tropical longitude of a graha over [jd_start, jd_end].
+
+  While in use (see tables_in_use), Graha.get_longitude and Graha.get_longitudes evaluate these polynomials instead of calling swisseph. Longitudes are unwrapped within each segment before fitting, so that the 360 -> 0 jump does not spoil the fit.
+  """
+  DEFAULT_SEGMENT_DAYS = {Graha.SUN: 16.0, Graha.MOON: 4.0}
+  DEFAULT_DEGREE = {Graha.SUN: 10, Graha.MOON: 14}
+  MIN_SEGMENT_DAYS = 0.25
+
+  def __init__(self, body_name, jd_start, jd_end, segment_days=None, degree=None):
+    self.body_name = body_name
+    self.segment_days = segment_days or self.DEFAULT_SEGMENT_DAYS.get(body_name, 4.0)
+    self.degree = degree or self.DEFAULT_DEGREE.get(body_name, 14)
+    num_segments = max(1, int(numpy.ceil((jd_end - jd_start) / self.segment_days)))
+    self.jd_start = jd_start
+    self.jd_end = jd_start + num_segments * self.segment_days
+
+    nodes = chebyshev.chebpts1(self.degree + 1)
+    segment_starts = jd_start + self.segment_days * numpy.arange(num_segments)
+    node_jds = segment_starts[:, numpy.newaxis] + (nodes[numpy.newaxis, :] + 1) / 2 * self.segment_days
+    node_longitudes = numpy.unwrap(Graha.singleton(body_name)._get_swisseph_longitudes(node_jds), period=360, axis=1)
+    # Row i holds the coefficients for segment i.
+    self.coefficients = numpy.array([chebyshev.chebfit(nodes, longitudes, self.degree) for longitudes in node_longitudes])
+    self._coefficient_lists = [self._to_clenshaw_order(coefficients) for coefficients in self.coefficients]
+    # Derivatives (in degrees per day) - for root finders which use speeds.
+    self._derivative_coefficient_lists = [self._to_clenshaw_order(chebyshev.chebder(coefficients) * 2 / self.segment_days) for coefficients in self.coefficients]
+
+  @classmethod
+  def _to_clenshaw_order(cls, coefficients):
+    coefficients = list(coefficients)
+    return list(reversed(coefficients[1:])) + [coefficients[0]]
+
+  @classmethod
+  def _clenshaw(cls, coefficients, x):
+    b_0 = b_1 = 0.0
+    x2 = 2 * x
+    for coefficient in coefficients[:-1]:
+      b_0, b_1 = coefficient + x2 * b_0 - b_1, b_0
+    return coefficients[-1] + x * b_0 - b_1
+
+  def covers(self, jd):
+    return self.jd_start <= jd <= self.jd_end
+
+  def _get_segment_and_x(self, jd):
+    segment = min(int((jd - self.jd_start) / self.segment_days), len(self.coefficients) - 1)
+    x = 2 * (jd - self.jd_start - segment * self.segment_days) / self.segment_days - 1
+    return segment, x
+
+  def get_longitude(self, jd):
+    segment, x = self._get_segment_and_x(jd)
+    # Clenshaw recurrence - cheaper than chebval for a single point.
+    return self._clenshaw(self._coefficient_lists[segment], x) % 360
+
+  def get_longitude_and_speed(self, jd):
+    segment, x = self._get_segment_and_x(jd)
+    return (self._clenshaw(self._coefficient_lists[segment], x) % 360, self._clenshaw(self._derivative_coefficient_lists[segment], x))
+
+  def get_longitudes(self, jds):
+    jds = numpy.asarray(jds, dtype=float)
+    segments = numpy.minimum(((jds - self.jd_start) / self.segment_days).astype(int), len(self.coefficients) - 1)
+    x = 2 * (jds - self.jd_start - segments * self.segment_days) / self.segment_days - 1
+    coefficients = self.coefficients[segments]
+    b_0 = numpy.zeros(jds.shape)
+    b_1 = numpy.zeros(jds.shape)
+    for k in range(self.degree, 0, -1):
+      b_0, b_1 = coefficients[..., k] + 2 * x * b_0 - b_1, b_0
+    return (coefficients[..., 0] + x * b_0 - b_1) % 360
+
+  def get_max_error(self, samples_per_segment=16):
+    """Maximum deviation (in degrees) from swisseph, measured at points which are not fitting nodes."""
+    num_samples = samples_per_segment * len(self.coefficients)
+    jds = self.jd_start + (numpy.arange(num_samples) + 0.5) * (self.jd_end - self.jd_start) / num_samples
+    differences = self.get_longitudes(jds) - Graha.singleton(self.body_name)._get_swisseph_longitudes(jds)
+    return numpy.max(numpy.abs((differences + 180) % 360 - 180))
+
+  @classmethod
+  def fit(cls, body_name, jd_start, jd_end, tolerance):
+    """Fit a table, shortening the segments till the error (in degrees) is within tolerance."""
+    segment_days = cls.DEFAULT_SEGMENT_DAYS.get(body_name, 4.0)
+    while True:
+      table = cls(body_name=body_name, jd_start=jd_start, jd_end=jd_end, segment_days=segment_days)
+      max_error = table.get_max_error()
+      if max_error <= tolerance:
+        return table
+      segment_days = segment_days / 2
+      if segment_days < cls.MIN_SEGMENT_DAYS:
+        raise ValueError("Could not fit %s longitudes within %g degrees (error %g)" % (body_name, tolerance, max_error))
+      logging.debug("Refitting %s longitudes with %g day segments (error %g)", body_name, segment_days, max_error)
+
+
+def get_tables(jd_start, jd_end, tolerance, body_names=(Graha.SUN, Graha.MOON)):
+  return [LongitudeTable.fit(body_name=body_name, jd_start=jd_start, jd_end=jd_end, tolerance=tolerance) for body_name in body_names]
+
+
+def get_tables_in_use():
+  return list(body.get_longitude_tables().values())
+
+
+@contextlib.contextmanager
+def tables_in_use(tables):
+  """Within this context (and thread), the given tables stand in for swisseph (within their ranges)."""
+  previous_tables = body.get_longitude_tables()
+  body.set_longitude_tables({**previous_tables, **{table.body_name: table for table in tables}})
+  try:
+    yield
+  finally:
+    body.set_longitude_tables(previous_tables)
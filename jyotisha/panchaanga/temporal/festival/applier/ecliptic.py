@@ -3,11 +3,13 @@ import sys
 from math import floor
 import logging
 
+import methodtools
+import numpy
 import swisseph as swe
 
 from jyotisha.panchaanga.temporal import names
 from jyotisha.panchaanga.temporal import interval
-from jyotisha.panchaanga.temporal.body import Graha
+from jyotisha.panchaanga.temporal.body import Graha, longitude_difference
 from jyotisha.panchaanga.temporal.festival import FestivalInstance, TransitionFestivalInstance
 from jyotisha.panchaanga.temporal.festival.applier import FestivalAssigner
 from jyotisha.panchaanga.temporal.interval import Interval
@@ -16,7 +18,18 @@ from scipy.optimize import brentq
 from sanskrit_data.schema import common
 from indic_transliteration import sanscript
 
+TARA_GRAHAS = (Graha.MERCURY, Graha.VENUS, Graha.MARS, Graha.JUPITER, Graha.SATURN)
+
+
 class EclipticFestivalAssigner(FestivalAssigner):
+  MAUDHYA_LIMITS = {
+      Graha.MERCURY: {'prograde': 14.0, 'retrograde': 12.0},
+      Graha.VENUS: {'prograde': 10.0, 'retrograde': 8.0},
+      Graha.MARS: {'prograde': 17.0, 'retrograde': 17.0},
+      Graha.JUPITER: {'prograde': 11.0, 'retrograde': 11.0},
+      Graha.SATURN: {'prograde': 15.0, 'retrograde': 15.0},
+  }
+
   def assign_all(self):
     self.set_jupiter_transits()
     self.compute_solar_eclipses()
@@ -24,9 +37,10 @@ class EclipticFestivalAssigner(FestivalAssigner):
     self.assign_tropical_sankranti_punyakaala()
     self.assign_tropical_sankranti()
     self.set_other_graha_transits()
-    # for graha in (Graha.MERCURY, Graha.VENUS, Graha.MARS, Graha.JUPITER, Graha.SATURN):
-    #   self.add_maudhya_events(graha)
-    # self.add_graha_yuddhas()
+    if self.computation_system.festival_options.set_maudhya_events:
+      self.add_maudhya_events()
+    if self.computation_system.festival_options.set_graha_yuddhas:
+      self.add_graha_yuddhas()
     
   def assign_tropical_sankranti_punyakaala(self):
     if 'viSu-puNyakAlaH' not in self.rules_collection.name_to_rule:
@@ -200,63 +214,60 @@ class EclipticFestivalAssigner(FestivalAssigner):
       - setting direction at the start (t_start)
       - rising direction at the end (t_end)
     """
-    MAUDHYA_LIMITS = {
-        Graha.MERCURY: {'prograde': 14.0, 'retrograde': 12.0},
-        Graha.VENUS: {'prograde': 10.0, 'retrograde': 8.0},
-        Graha.MARS: {'prograde': 17.0, 'retrograde': 17.0},
-        Graha.JUPITER: {'prograde': 11.0, 'retrograde': 11.0},
-        Graha.SATURN: {'prograde': 15.0, 'retrograde': 15.0},
-    }
-
-    is_retro = self.is_retrograde(graha, jd_start)
-    delta = MAUDHYA_LIMITS[graha]["retrograde" if is_retro else "prograde"]
-
-    conjunction_intervals = self.compute_conjunction_intervals(
-        graha1=graha,
-        graha2=Graha.SUN,
-        jd_start=jd_start,
-        jd_end=jd_end,
-        delta=delta,
-        step=step
-    )
-    
-    intervals = []
-    
-    for t_start, t_zero, t_end in conjunction_intervals:
-        try:
-            dir_set = self.get_setting_direction(graha, t_start)
-            dir_rise = self.get_rising_direction(graha, t_end)
-            intervals.append((t_start, t_end, dir_rise, dir_set))
-        except Exception as e:
-            logging.warning(f"Could not determine directions for maudhya interval ({t_start}, {t_end}): {e}")
-    return intervals
-
+    return self.compute_maudhya_intervals_for_grahas(grahas=[graha], jd_start=jd_start, jd_end=jd_end, step=step)[graha]
 
-  def add_maudhya_events(self, graha: int):
+  def compute_maudhya_intervals_for_grahas(self, grahas, jd_start: float, jd_end: float, step: float = 0.5) -> dict:
+    """
+    Batch counterpart of compute_maudhya_intervals - the conjunctions of all grahas with the sun are located in one go.
+    Returns a dict mapping each graha to its intervals.
+    """
+    pair_to_delta = {}
+    for graha in grahas:
+      is_retro = self.is_retrograde(graha, jd_start)
+      pair_to_delta[(graha, Graha.SUN)] = self.MAUDHYA_LIMITS[graha]["retrograde" if is_retro else "prograde"]
+
+    pair_to_conjunction_intervals = self.compute_conjunction_intervals_for_pairs(pair_to_delta=pair_to_delta, jd_start=jd_start, jd_end=jd_end, step=step)
+
+    graha_to_intervals = {}
+    for (graha, _), conjunction_intervals in pair_to_conjunction_intervals.items():
+      intervals = []
+      for t_start, t_zero, t_end in conjunction_intervals:
+          try:
+              dir_set = self.get_setting_direction(graha, t_start)
+              dir_rise = self.get_rising_direction(graha, t_end)
+              intervals.append((t_start, t_end, dir_rise, dir_set))
+          except Exception as e:
+              logging.warning(f"Could not determine directions for maudhya interval ({t_start}, {t_end}): {e}")
+      graha_to_intervals[graha] = intervals
+    return graha_to_intervals
+
+
+  def add_maudhya_events(self, grahas=TARA_GRAHAS):
     GRAHA_NAMES = {Graha.VENUS: 'zukraH', Graha.MERCURY: 'budhaH', Graha.MARS: 'aGgArakaH', 
         Graha.SATURN: 'zaniH', Graha.JUPITER: 'guruH'}
-    maudhya_intervals = self.compute_maudhya_intervals(graha, self.panchaanga.jd_start, self.panchaanga.jd_end)
-    for t_start, t_end, dir_rise, dir_set in maudhya_intervals:
-        try:
-            fday = int(t_start - self.daily_panchaangas[0].julian_day_start)
-            if t_start < self.daily_panchaangas[fday].jd_sunrise:
-                fday -= 1
+    graha_to_intervals = self.compute_maudhya_intervals_for_grahas(grahas, self.panchaanga.jd_start, self.panchaanga.jd_end)
+    for graha, maudhya_intervals in graha_to_intervals.items():
+      for t_start, t_end, dir_rise, dir_set in maudhya_intervals:
+          try:
+              fday = int(t_start - self.daily_panchaangas[0].julian_day_start)
+              if t_start < self.daily_panchaangas[fday].jd_sunrise:
+                  fday -= 1
+              self.panchaanga.add_festival_instance(FestivalInstance(
+                  name=f"{GRAHA_NAMES[graha]}–astamayaH ({dir_set})",
+                  interval=Interval(jd_start=t_start, jd_end=None)
+              ), date=self.daily_panchaangas[fday].date)
+          except ValueError:
+              logging.warning("Could not assign festival day for maudhya start event.")
+          try:
+            fday = int(t_end - self.daily_panchaangas[0].julian_day_start)
+            if t_end < self.daily_panchaangas[fday].jd_sunrise:
+              fday -= 1
             self.panchaanga.add_festival_instance(FestivalInstance(
-                name=f"{GRAHA_NAMES[graha]}–astamayaH ({dir_set})",
-                interval=Interval(jd_start=t_start, jd_end=None)
+                name=f"{GRAHA_NAMES[graha]}–udayaH ({dir_rise})",
+                interval=Interval(jd_start=None, jd_end=t_end)
             ), date=self.daily_panchaangas[fday].date)
-        except ValueError:
-            logging.warning("Could not assign festival day for maudhya start event.")
-        try:
-          fday = int(t_end - self.daily_panchaangas[0].julian_day_start)
-          if t_end < self.daily_panchaangas[fday].jd_sunrise:
-            fday -= 1
-          self.panchaanga.add_festival_instance(FestivalInstance(
-              name=f"{GRAHA_NAMES[graha]}–udayaH ({dir_rise})",
-              interval=Interval(jd_start=None, jd_end=t_end)
-          ), date=self.daily_panchaangas[fday].date)
-        except ValueError:
-          logging.warning("Could not assign festival day for maudhya end event.")
+          except ValueError:
+            logging.warning("Could not assign festival day for maudhya end event.")
 
   def compute_conjunction_intervals(
     self,
@@ -272,51 +283,11 @@ class EclipticFestivalAssigner(FestivalAssigner):
     Compute intervals where the longitude difference between two grahas is less than `delta`.
     Returns a list of (t_start, t_zero, t_end) tuples.
     """
-    g1 = Graha.singleton(graha1)
-    g2 = Graha.singleton(graha2)
-    intervals = []
-
-    inside = False
-    t_start = None
-    jd = jd_start
-
-    while jd <= jd_end:
-        lon_diff = abs(g1.get_longitude(jd, ayanaamsha_id=self.ayanaamsha_id) - g2.get_longitude(jd, ayanaamsha_id=self.ayanaamsha_id))
-        lon_diff = min(lon_diff, 360 - lon_diff)  # shortest arc
-
-        if not inside and lon_diff < delta:
-            try:
-                t_start = brentq(
-                    lambda x: abs(g1.get_longitude(x, ayanaamsha_id=self.ayanaamsha_id) - g2.get_longitude(x, ayanaamsha_id=self.ayanaamsha_id)) - delta,
-                    jd - step,
-                    jd
-                )
-                inside = True
-            except ValueError:
-                logging.warning(f"Could not bracket start of proximity at {jd}")
-        elif inside and lon_diff > delta:
-            try:
-                t_end = brentq(
-                    lambda x: abs(g1.get_longitude(x, ayanaamsha_id=self.ayanaamsha_id) - g2.get_longitude(x, ayanaamsha_id=self.ayanaamsha_id)) - delta,
-                    jd - step,
-                    jd
-                )
-                # Now compute t_zero (exact conjunction)
-                try:
-                    t_zero = brentq(
-                        lambda x: g1.get_longitude(x, ayanaamsha_id=self.ayanaamsha_id) - g2.get_longitude(x, ayanaamsha_id=self.ayanaamsha_id),
-                        t_start,
-                        t_end
-                    )
-                    intervals.append((t_start, t_zero, t_end))
-                except ValueError:
-                    logging.warning(f"Could not find t_zero between {t_start} and {t_end}")
-                inside = False
-            except ValueError:
-                logging.warning(f"Could not bracket end of proximity at {jd}")
-        jd += step
+    intervals = self.compute_conjunction_intervals_for_pairs(pair_to_delta={(graha1, graha2): delta}, jd_start=jd_start, jd_end=jd_end, step=step)[(graha1, graha2)]
 
     if debug:
+      g1 = Graha.singleton(graha1)
+      g2 = Graha.singleton(graha2)
       # Show the longitudes of each graha at the start and end of the interval
       logging.debug(f"Intervals for {graha1} and {graha2}:")
       for t_start, t_zero, t_end in intervals:
@@ -326,27 +297,80 @@ class EclipticFestivalAssigner(FestivalAssigner):
           logging.debug(f"  End: t_end, {g1.get_longitude(t_end, ayanaamsha_id=self.ayanaamsha_id)}, {g2.get_longitude(t_end, ayanaamsha_id=self.ayanaamsha_id)}")
 
     return intervals
+
+  @methodtools.lru_cache(maxsize=None)
+  def _get_sampled_longitudes(self, graha, jd_start, jd_end, step):
+    """Tropical longitudes of graha every step days - shared by the maudhya and graha-yuddha computations.
+
+    Starts a step early, so that a proximity starting just at jd_start is caught.
+    """
+    jds = jd_start + step * numpy.arange(-1, 1 + floor((jd_end - jd_start) / step))
+    return (jds, Graha.singleton(graha).get_longitudes(jds))
+
+  def compute_conjunction_intervals_for_pairs(self, pair_to_delta: dict, jd_start: float, jd_end: float, step: float = 0.5) -> dict:
+    """
+    Batch counterpart of compute_conjunction_intervals, for several (graha1, graha2) pairs - each with its own delta.
+
+    The longitudes of all grahas involved are sampled on one grid (tropically - the ayanaamsha cancels out of the differences), proximity entries and exits of all pairs are located with array operations, and only those crossings are refined.
+    Returns a dict mapping each pair to a list of (t_start, t_zero, t_end) tuples.
+    """
+    pairs = list(pair_to_delta.keys())
+    grahas = set(graha for pair in pairs for graha in pair)
+    graha_to_longitudes = {graha: self._get_sampled_longitudes(graha, jd_start, jd_end, step)[1] for graha in grahas}
+    jds = self._get_sampled_longitudes(pairs[0][0], jd_start, jd_end, step)[0]
+    # Along the shortest arc - in [-180, 180).
+    lon_diffs = numpy.array([(graha_to_longitudes[graha1] - graha_to_longitudes[graha2] + 180) % 360 - 180 for (graha1, graha2) in pairs])
+    deltas = numpy.array([pair_to_delta[pair] for pair in pairs])
+    inside = numpy.abs(lon_diffs) < deltas[:, numpy.newaxis]
+    # Row-major - so crossings of each pair come in order of time.
+    (pair_indices, sample_indices) = numpy.nonzero(inside[:, 1:] != inside[:, :-1])
+
+    pair_to_intervals = {pair: [] for pair in pairs}
+    pair_to_t_start = {}
+    for pair_index, sample_index in zip(pair_indices.tolist(), sample_indices.tolist()):
+      pair = pairs[pair_index]
+      (g1, g2) = (Graha.singleton(pair[0]), Graha.singleton(pair[1]))
+      (jd_1, jd_2) = (jds[sample_index], jds[sample_index + 1])
+      is_entry = inside[pair_index, sample_index + 1]
+      if not is_entry and pair not in pair_to_t_start:
+        # Proximity from before jd_start.
+        continue
+      try:
+        t_crossing = brentq(lambda x: abs(longitude_difference(x, g1, g2)) - deltas[pair_index], jd_1, jd_2)
+      except ValueError:
+        logging.warning(f"Could not bracket {'start' if is_entry else 'end'} of proximity at {jd_2}")
+        pair_to_t_start.pop(pair, None)
+        continue
+      if is_entry:
+        pair_to_t_start[pair] = t_crossing
+        continue
+      (t_start, t_end) = (pair_to_t_start.pop(pair), t_crossing)
+      # Now compute t_zero (exact conjunction)
+      try:
+        t_zero = brentq(lambda x: longitude_difference(x, g1, g2), t_start, t_end)
+        pair_to_intervals[pair].append((t_start, t_zero, t_end))
+      except ValueError:
+        logging.warning(f"Could not find t_zero between {t_start} and {t_end}")
+    return pair_to_intervals
   
   def add_graha_yuddhas(self):
-    TARA_GRAHAS = (Graha.MERCURY, Graha.VENUS, Graha.MARS, Graha.JUPITER, Graha.SATURN)
     GRAHA_NAMES = {Graha.VENUS: 'zukraH', Graha.MERCURY: 'budhaH', Graha.MARS: 'aGgArakaH', 
         Graha.SATURN: 'zaniH', Graha.JUPITER: 'guruH'}
 
-    for graha1 in TARA_GRAHAS:
-      for graha2 in TARA_GRAHAS:
-        if graha1 < graha2:
-          intervals = self.compute_conjunction_intervals(graha1, graha2, self.panchaanga.jd_start, self.panchaanga.jd_end, delta=1.0, debug=False)
-          for t_start, t_zero, t_end in intervals:
-            # Check for Maudhya!
-            if t_start is not None and self.panchaanga.jd_start < t_start < self.panchaanga.jd_end:
-              fday = int(t_start - self.daily_panchaangas[0].julian_day_start)
-              if t_start < self.daily_panchaangas[fday].jd_sunrise:
-                fday -= 1
-              fest = FestivalInstance(
-                  name=f'graha-yuddhaH ({GRAHA_NAMES[graha1]}–{GRAHA_NAMES[graha2]})',
-                  interval=Interval(jd_start=t_start, jd_end=t_end)
-              )
-              self.panchaanga.add_festival_instance(fest, date=self.daily_panchaangas[fday].date)
+    pairs = [(graha1, graha2) for graha1 in TARA_GRAHAS for graha2 in TARA_GRAHAS if graha1 < graha2]
+    pair_to_intervals = self.compute_conjunction_intervals_for_pairs({pair: 1.0 for pair in pairs}, self.panchaanga.jd_start, self.panchaanga.jd_end)
+    for (graha1, graha2) in pairs:
+      for t_start, t_zero, t_end in pair_to_intervals[(graha1, graha2)]:
+        # Check for Maudhya!
+        if t_start is not None and self.panchaanga.jd_start < t_start < self.panchaanga.jd_end:
+          fday = int(t_start - self.daily_panchaangas[0].julian_day_start)
+          if t_start < self.daily_panchaangas[fday].jd_sunrise:
+            fday -= 1
+          fest = FestivalInstance(
+              name=f'graha-yuddhaH ({GRAHA_NAMES[graha1]}–{GRAHA_NAMES[graha2]})',
+              interval=Interval(jd_start=t_start, jd_end=t_end)
+          )
+          self.panchaanga.add_festival_instance(fest, date=self.daily_panchaangas[fday].date)
 
   def compute_solar_eclipses(self):
     if 'sUrya-grahaNam' not in self.rules_collection.name_to_rule:
@@ -460,7 +484,7 @@ class EclipticFestivalAssigner(FestivalAssigner):
     # Let's check for transitions in a relatively large window
     # to finalise what is the FINAL transition post retrograde movements
     transits = Graha.singleton(Graha.JUPITER).get_transits(self.panchaanga.jd_start - 13, jd_end + check_window, anga_type=AngaType.RASHI,
-                                                           ayanaamsha_id=self.ayanaamsha_id)
+                                                           ayanaamsha_id=self.ayanaamsha_id, root_finder=self.computation_system.root_finder)
     if len(transits) > 0:
       for i, transit in enumerate(transits):
         (jd_transit, rashi1, rashi2) = (transit.jd, transit.value_1, transit.value_2)
@@ -500,7 +524,7 @@ class EclipticFestivalAssigner(FestivalAssigner):
     
     for graha in Graha.MERCURY, Graha.VENUS, Graha.MARS, Graha.SATURN, Graha.RAHU:
       transits = Graha.singleton(graha).get_transits(self.panchaanga.jd_start, jd_end, anga_type=AngaType.RASHI,
-                                                           ayanaamsha_id=self.ayanaamsha_id)
+                                                           ayanaamsha_id=self.ayanaamsha_id, root_finder=self.computation_system.root_finder)
       if len(transits) > 0:
         for i, transit in enumerate(transits):
           (jd_transit, rashi1, rashi2) = (transit.jd, transit.value_1, transit.value_2)
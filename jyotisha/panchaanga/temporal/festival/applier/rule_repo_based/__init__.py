@@ -83,7 +83,8 @@ class RuleLookupAssigner(FestivalAssigner):
     :return: 
     """
     from jyotisha.panchaanga.temporal.festival import rules
-    rule_set = rules.RulesCollection.get_cached(repos_tuple=tuple(self.computation_system.festival_options.repos), julian_handling=self.computation_system.festival_options.julian_handling)
+    # Not RulesCollection.get_cached - hashing the repos for its lookup costs more than the festival lookups themselves.
+    rule_set = self.rules_collection
 
     date = day_panchaanga.get_date(month_type=month_type)
     days = [date.day]
@@ -113,8 +114,7 @@ class RuleLookupAssigner(FestivalAssigner):
     :param panchaangas: Array of panchaangas for 2 successive days 
     :return: 
     """
-    from jyotisha.panchaanga.temporal.festival import rules
-    rule_set = rules.RulesCollection.get_cached(repos_tuple=tuple(self.computation_system.festival_options.repos), julian_handling=self.computation_system.festival_options.julian_handling)
+    rule_set = self.rules_collection
     anga_type_id = anga_type.name.lower()
     
 
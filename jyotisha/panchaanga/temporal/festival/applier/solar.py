@@ -553,7 +553,7 @@ class SolarFestivalAssigner(FestivalAssigner):
     for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
       day_panchaanga = self.daily_panchaangas[d]
       tithi_sunrise = day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index
-      tithi_sunset = day_panchaanga.sunrise_day_angas.get_anga_at_jd(jd=day_panchaanga.jd_sunset, anga_type=zodiac.AngaType.TITHI).index
+      tithi_sunset = self.panchaanga.get_anga_at_jd(jd=day_panchaanga.jd_sunset, anga_type=zodiac.AngaType.TITHI).index
       # VARUNI TRAYODASHI
       if day_panchaanga.lunar_date.month.index == 12 and (tithi_sunrise == 28 or tithi_sunset == 28):
         if day_panchaanga.date.get_weekday() == 6:
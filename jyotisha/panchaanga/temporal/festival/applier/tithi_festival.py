@@ -106,38 +106,37 @@ class TithiFestivalAssigner(FestivalAssigner):
   def assign_chaturthi_vratam(self):
     if "vikaTa-mahAgaNapati-saGkaTahara-caturthI-vratam" not in self.rules_collection.name_to_rule:
       return
-    for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
+    for d in self.panchaanga.find_days(tithi_at_sunrise=[18, 19]):
       # SANKATAHARA chaturthi
-      if self.daily_panchaangas[d].sunrise_day_angas.tithi_at_sunrise.index == 18 or self.daily_panchaangas[d].sunrise_day_angas.tithi_at_sunrise.index == 19:
-        day_panchaanga = self.daily_panchaangas[d]
-        tithi_moonrise_yest = self.daily_panchaangas[d - 1].sunrise_day_angas.get_anga_at_jd(jd=self.daily_panchaangas[d - 1].graha_rise_jd[Graha.MOON], anga_type=AngaType.TITHI).index
-        tithi_moonrise = day_panchaanga.sunrise_day_angas.get_anga_at_jd(jd=day_panchaanga.graha_rise_jd[Graha.MOON], anga_type=AngaType.TITHI).index
-        tithi_moonrise_tmrw = self.daily_panchaangas[d + 1].sunrise_day_angas.get_anga_at_jd(jd=self.daily_panchaangas[d + 1].graha_rise_jd[Graha.MOON], anga_type=AngaType.TITHI).index
-
-        _m = day_panchaanga.lunar_date.month.index
-        if floor(_m) != _m:
-          _m = 13  # Adhika masa
-        chaturthi_name = names.NAMES['SANKATAHARA_CHATURTHI_NAMES']['sa'][sanscript.roman.HK_DRAVIDIAN][_m] + '-mahAgaNapati-'
-        def _add_chaturthi_fest(p, chaturthi_name):
-          chaturthi_vaara = p.date.get_weekday()
-          chaturthi_vaara_tag = 'aGgArakI~' if chaturthi_vaara == 2 else 'ravivAra-' if chaturthi_vaara == 0 else ''
-          chaturthi_final_name = chaturthi_vaara_tag + chaturthi_name + ('mahA' if p.lunar_date.month.index == 5  else '') + 'saGkaTahara-caturthI-vratam'
-          fest = FestivalInstance(name=chaturthi_final_name, interval=p.get_interval(interval_id="full_day"))
-          self.panchaanga.add_festival_instance(festival_instance=fest, date=p.date)
-          if p.lunar_date.month.index == 7:
-            self.panchaanga.add_festival_instance(festival_instance=FestivalInstance(name='karaka-caturthI', interval=p.get_interval(interval_id="full_day")), date=p.date)
-
-        if tithi_moonrise == 19:
-          # otherwise yesterday would have already been assigned
-          if tithi_moonrise_yest != 19:
-            _add_chaturthi_fest(self.daily_panchaangas[d], chaturthi_name)
-        elif tithi_moonrise_tmrw == 19:
-          _add_chaturthi_fest(self.daily_panchaangas[d + 1], chaturthi_name)
-        else:
-          if tithi_moonrise_yest != 19:
-            if tithi_moonrise == 18 and tithi_moonrise_tmrw == 20:
-              # No vyApti on either day -- pick parA, i.e. next day.
-              _add_chaturthi_fest(self.daily_panchaangas[d + 1], chaturthi_name)
+      day_panchaanga = self.daily_panchaangas[d]
+      tithi_moonrise_yest = self.daily_panchaangas[d - 1].sunrise_day_angas.get_anga_at_jd(jd=self.daily_panchaangas[d - 1].get_graha_rise_jd(body=Graha.MOON), anga_type=AngaType.TITHI).index
+      tithi_moonrise = day_panchaanga.sunrise_day_angas.get_anga_at_jd(jd=day_panchaanga.get_graha_rise_jd(body=Graha.MOON), anga_type=AngaType.TITHI).index
+      tithi_moonrise_tmrw = self.daily_panchaangas[d + 1].sunrise_day_angas.get_anga_at_jd(jd=self.daily_panchaangas[d + 1].get_graha_rise_jd(body=Graha.MOON), anga_type=AngaType.TITHI).index
+
+      _m = day_panchaanga.lunar_date.month.index
+      if floor(_m) != _m:
+        _m = 13  # Adhika masa
+      chaturthi_name = names.NAMES['SANKATAHARA_CHATURTHI_NAMES']['sa'][sanscript.roman.HK_DRAVIDIAN][_m] + '-mahAgaNapati-'
+      def _add_chaturthi_fest(p, chaturthi_name):
+        chaturthi_vaara = p.date.get_weekday()
+        chaturthi_vaara_tag = 'aGgArakI~' if chaturthi_vaara == 2 else 'ravivAra-' if chaturthi_vaara == 0 else ''
+        chaturthi_final_name = chaturthi_vaara_tag + chaturthi_name + ('mahA' if p.lunar_date.month.index == 5  else '') + 'saGkaTahara-caturthI-vratam'
+        fest = FestivalInstance(name=chaturthi_final_name, interval=p.get_interval(interval_id="full_day"))
+        self.panchaanga.add_festival_instance(festival_instance=fest, date=p.date)
+        if p.lunar_date.month.index == 7:
+          self.panchaanga.add_festival_instance(festival_instance=FestivalInstance(name='karaka-caturthI', interval=p.get_interval(interval_id="full_day")), date=p.date)
+
+      if tithi_moonrise == 19:
+        # otherwise yesterday would have already been assigned
+        if tithi_moonrise_yest != 19:
+          _add_chaturthi_fest(self.daily_panchaangas[d], chaturthi_name)
+      elif tithi_moonrise_tmrw == 19:
+        _add_chaturthi_fest(self.daily_panchaangas[d + 1], chaturthi_name)
+      else:
+        if tithi_moonrise_yest != 19:
+          if tithi_moonrise == 18 and tithi_moonrise_tmrw == 20:
+            # No vyApti on either day -- pick parA, i.e. next day.
+            _add_chaturthi_fest(self.daily_panchaangas[d + 1], chaturthi_name)
 
   def assign_shasthi_vratam(self):
     if 'SaSThI-vratam' not in self.rules_collection.name_to_rule:
@@ -189,17 +188,16 @@ class TithiFestivalAssigner(FestivalAssigner):
 
   def assign_vishesha_saptami(self):
     if 'bhAnusaptamI' in self.rules_collection.name_to_rule:
-      for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
+      for d in self.panchaanga.find_days(weekday=0, tithi_at_sunrise=[7, 22]):
         day_panchaanga = self.daily_panchaangas[d]
         # SPECIAL SAPTAMIs
-        if day_panchaanga.date.get_weekday() == 0 and (day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index % 15 == 7):
-          festival_name = 'bhAnusaptamI'
-          if day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index == 7:
-            festival_name = 'vijayA' + '~' + festival_name
-          if day_panchaanga.sunrise_day_angas.nakshatra_at_sunrise.index == 27:
-            # Even more auspicious!
-            festival_name += '★'
-          self.panchaanga.add_festival(fest_id=festival_name, date=day_panchaanga.date)
+        festival_name = 'bhAnusaptamI'
+        if day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index == 7:
+          festival_name = 'vijayA' + '~' + festival_name
+        if day_panchaanga.sunrise_day_angas.nakshatra_at_sunrise.index == 27:
+          # Even more auspicious!
+          festival_name += '★'
+        self.panchaanga.add_festival(fest_id=festival_name, date=day_panchaanga.date)
 
     if 'bhadrA~saptamI' in self.rules_collection.name_to_rule:
       for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
@@ -406,17 +404,17 @@ class TithiFestivalAssigner(FestivalAssigner):
       # compute offset from UTC in hours
       # PRADOSHA Vratam
       pref = ''
-      tithi_sunset = day_panchaanga.sunrise_day_angas.get_anga_at_jd(jd=day_panchaanga.jd_sunset, anga_type=AngaType.TITHI) 
+      tithi_sunset = self.panchaanga.get_anga_at_jd(jd=day_panchaanga.jd_sunset, anga_type=AngaType.TITHI) 
       is_shukla_paksha = True if tithi_sunset.index <= 15 else False
       tithi_sunset = tithi_sunset % 15
-      tithi_sunset_tmrw = self.daily_panchaangas[d+1].sunrise_day_angas.get_anga_at_jd(jd=self.daily_panchaangas[d+1].jd_sunset, anga_type=AngaType.TITHI) % 15
+      tithi_sunset_tmrw = self.panchaanga.get_anga_at_jd(jd=self.daily_panchaangas[d+1].jd_sunset, anga_type=AngaType.TITHI) % 15
       fday = None
       if tithi_sunset_tmrw == 13:
         # Let's worry about assigning this tomorrow!
         continue
       elif tithi_sunset in [12, 13] and tithi_sunset_tmrw in [14, 0]:
         jd_pradosha_end_today = day_panchaanga.day_length_based_periods.fifteen_fold_division.pradosha.jd_end
-        if day_panchaanga.sunrise_day_angas.get_anga_at_jd(jd=jd_pradosha_end_today, anga_type=AngaType.TITHI) % 15 == 12:
+        if self.panchaanga.get_anga_at_jd(jd=jd_pradosha_end_today, anga_type=AngaType.TITHI) % 15 == 12:
           fday = d + 1
         else:
           fday = d
@@ -526,11 +524,10 @@ class TithiFestivalAssigner(FestivalAssigner):
   def assign_amaavaasyaa_soma(self):
     if 'sOmavatI_amAvAsyA' not in self.rules_collection.name_to_rule:
       return
-    for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
+    for d in self.panchaanga.find_days(tithi_at_sunrise=30, weekday=1):
       day_panchaanga = self.daily_panchaangas[d]
       # SOMAMAVASYA
-      if day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index == 30 and day_panchaanga.date.get_weekday() == 1:
-        self.panchaanga.add_festival(fest_id='sOmavatI amAvAsyA', date=day_panchaanga.date)
+      self.panchaanga.add_festival(fest_id='sOmavatI amAvAsyA', date=day_panchaanga.date)
 
   def assign_vishesha_akshaya_tritiya(self):
     if 'akSaya-tRtIyA' not in self.rules_collection.name_to_rule:
@@ -539,8 +536,8 @@ class TithiFestivalAssigner(FestivalAssigner):
     for day in akshaya_tritiya_days:
       d = int(day - self.daily_panchaangas[0].date)
       day_panchaanga = self.daily_panchaangas[d]
-      nakshatra_sunrise = day_panchaanga.sunrise_day_angas.get_anga_at_jd(jd=day_panchaanga.jd_sunrise, anga_type=AngaType.NAKSHATRA).index
-      nakshatra_sunset = day_panchaanga.sunrise_day_angas.get_anga_at_jd(jd=day_panchaanga.jd_sunset, anga_type=AngaType.NAKSHATRA).index
+      nakshatra_sunrise = self.panchaanga.get_anga_at_jd(jd=day_panchaanga.jd_sunrise, anga_type=AngaType.NAKSHATRA).index
+      nakshatra_sunset = self.panchaanga.get_anga_at_jd(jd=day_panchaanga.jd_sunset, anga_type=AngaType.NAKSHATRA).index
       if day_panchaanga.date.get_weekday() == 3 and 4 in [nakshatra_sunrise, nakshatra_sunset]: # Wednesday - Rohini
         self.panchaanga.delete_festival_date(fest_id='akSaya-tRtIyA', date=day_panchaanga.date)
         self.panchaanga.add_festival(fest_id='akSaya-tRtIyA~(alabhyam–budha-rOhiNI)', date=day_panchaanga.date)
@@ -607,13 +604,12 @@ class TithiFestivalAssigner(FestivalAssigner):
   def assign_vajapeyaphala_snana_yoga(self):
     if 'vAjapEyaphala-snAna-yOgaH' not in self.rules_collection.name_to_rule:
       return
-    for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
+    for d in self.panchaanga.find_days(lunar_month=1, tithi_at_sunrise=8, weekday=3, nakshatra_at_sunrise=7):
       day_panchaanga = self.daily_panchaangas[d]
       # पुनर्वसुबुधोपेता चैत्रे मासि सिताष्टमी।
       # प्रातस्तु विधिवत्स्नात्वा वाजपेयफलं लभेत्॥
-      if day_panchaanga.lunar_date.month.index == 1 and day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index == 8 and day_panchaanga.date.get_weekday() == 3 and day_panchaanga.sunrise_day_angas.nakshatra_at_sunrise.index == 7:
-        festival_name = 'vAjapEyaphala-snAna-yOgaH'
-        self.panchaanga.add_festival(fest_id=festival_name, date=day_panchaanga.date)
+      festival_name = 'vAjapEyaphala-snAna-yOgaH'
+      self.panchaanga.add_festival(fest_id=festival_name, date=day_panchaanga.date)
 
   def assign_chandra_darshanam(self, force_computation=False):
     if 'candra-darzanam' not in self.rules_collection.name_to_rule and not force_computation:
@@ -626,24 +622,24 @@ class TithiFestivalAssigner(FestivalAssigner):
         # Compute the tithi at the correct instant, for checking chandra-darshanam
         # Multiple schools of thought: sunset (30), moonset, 31, 29
         # 
-        tithi_check = temporal.tithi.get_tithi(day_panchaanga.graha_set_jd[Graha.MOON]).index
-        tithi_check_tmrw = temporal.tithi.get_tithi(self.daily_panchaangas[d + 1].graha_set_jd[Graha.MOON]).index
+        tithi_check = temporal.tithi.get_tithi(day_panchaanga.get_graha_set_jd(body=Graha.MOON)).index
+        tithi_check_tmrw = temporal.tithi.get_tithi(self.daily_panchaangas[d + 1].get_graha_set_jd(body=Graha.MOON)).index
         fest_name = 'candra-darzanam'
         if day_panchaanga.lunar_date.month.index == 6:
           fest_name = 'bhAdrapada-' + fest_name
         if tithi_check <= 2:
           if tithi_check == 1:
             # TODO: Fix based on mauDhya logic for chandra
-            fest = FestivalInstance(name=fest_name, interval=Interval(jd_start=self.daily_panchaangas[d+1].jd_sunset, jd_end=self.daily_panchaangas[d+1].graha_set_jd[Graha.MOON]))
+            fest = FestivalInstance(name=fest_name, interval=Interval(jd_start=self.daily_panchaangas[d+1].jd_sunset, jd_end=self.daily_panchaangas[d+1].get_graha_set_jd(body=Graha.MOON)))
             self.panchaanga.add_festival_instance(festival_instance=fest, date=self.daily_panchaangas[d+1].date)
             
             d += 25
           else:
-            fest = FestivalInstance(name=fest_name, interval=Interval(jd_start=self.daily_panchaangas[d].jd_sunset, jd_end=self.daily_panchaangas[d].graha_set_jd[Graha.MOON]))
+            fest = FestivalInstance(name=fest_name, interval=Interval(jd_start=self.daily_panchaangas[d].jd_sunset, jd_end=self.daily_panchaangas[d].get_graha_set_jd(body=Graha.MOON)))
             self.panchaanga.add_festival_instance(festival_instance=fest, date=self.daily_panchaangas[d].date)
             d += 25
         elif tithi_check_tmrw == 2:
-          fest = FestivalInstance(name=fest_name, interval=Interval(jd_start=self.daily_panchaangas[d+1].jd_sunset, jd_end=self.daily_panchaangas[d+1].graha_set_jd[Graha.MOON]))
+          fest = FestivalInstance(name=fest_name, interval=Interval(jd_start=self.daily_panchaangas[d+1].jd_sunset, jd_end=self.daily_panchaangas[d+1].get_graha_set_jd(body=Graha.MOON)))
           self.panchaanga.add_festival_instance(festival_instance=fest, date=self.daily_panchaangas[d+1].date)
           d += 25
       d += 1
@@ -27,88 +27,83 @@ class VaraFestivalAssigner(FestivalAssigner):
     festival_name = 'bhRguvAra-subrahmaNya-vratam'
     if festival_name not in self.rules_collection.name_to_rule:
       return 
-    for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
-      # BHRGUVARA SUBRAHMANYA VRATAM
+    # BHRGUVARA SUBRAHMANYA VRATAM
+    for d in self.panchaanga.find_days(solar_sidereal_month_sunset=7, weekday=5):
       day_panchaanga = self.daily_panchaangas[d]
-      if day_panchaanga.solar_sidereal_date_sunset.month == 7 and day_panchaanga.date.get_weekday() == 5:
-        if festival_name not in self.panchaanga.festival_id_to_days:
-          # only the first bhRguvAra of tulA mAsa is considered (skAnda purANam)
-          # https://youtu.be/rgXwyo0L3i8?t=222
-          if day_panchaanga.solar_sidereal_date_sunset.day == 1:
-            madhyaahna_start = day_panchaanga.day_length_based_periods.fifteen_fold_division.madhyaahna.jd_start
-            sankranti_time = day_panchaanga.solar_sidereal_date_sunset.month_transition
-            if sankranti_time is None or sankranti_time < madhyaahna_start:
-              self.panchaanga.add_festival(fest_id=festival_name, date=day_panchaanga.date)
-            else:
-              self.panchaanga.add_festival(fest_id=festival_name, date=day_panchaanga.date + 7)
-          else:
+      if festival_name not in self.panchaanga.festival_id_to_days:
+        # only the first bhRguvAra of tulA mAsa is considered (skAnda purANam)
+        # https://youtu.be/rgXwyo0L3i8?t=222
+        if day_panchaanga.solar_sidereal_date_sunset.day == 1:
+          madhyaahna_start = day_panchaanga.day_length_based_periods.fifteen_fold_division.madhyaahna.jd_start
+          sankranti_time = day_panchaanga.solar_sidereal_date_sunset.month_transition
+          if sankranti_time is None or sankranti_time < madhyaahna_start:
             self.panchaanga.add_festival(fest_id=festival_name, date=day_panchaanga.date)
+          else:
+            self.panchaanga.add_festival(fest_id=festival_name, date=day_panchaanga.date + 7)
+        else:
+          self.panchaanga.add_festival(fest_id=festival_name, date=day_panchaanga.date)
 
 
   def assign_masa_vara_yoga_kaarttika(self):
     festival_name = 'kArttika~sOmavAsaraH'
     if festival_name not in self.rules_collection.name_to_rule:
       return
-    for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
-
-      # KRTTIKA SOMAVASARA
-      if self.daily_panchaangas[d].lunar_date.month.index == 8 and self.daily_panchaangas[d].date.get_weekday() == 1:
-        self.panchaanga.add_festival(fest_id='kArttika~sOmavAsaraH', date=self.daily_panchaangas[d].date)
+    # KRTTIKA SOMAVASARA
+    for d in self.panchaanga.find_days(lunar_month=8, weekday=1):
+      self.panchaanga.add_festival(fest_id='kArttika~sOmavAsaraH', date=self.daily_panchaangas[d].date)
 
   def assign_masa_vara_yoga_fests_tn(self):
     festival_name = 'AvaNi~JAyir2r2ukkizhamai'
     if festival_name not in self.rules_collection.name_to_rule:
       return
-    for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
-      # SOLAR MONTH-WEEKDAY FESTIVALS
-      for (mwd_fest_m, mwd_fest_wd, mwd_fest_name) in ((5, 0, 'AvaNi~JAyir2r2ukkizhamai'),
-                                                       (6, 6, 'puraTTAci~can2ikkizhamai'),
-                                                       (8, 0, 'kArttigai~JAyir2r2ukkizhamai'),
-                                                       (4, 5, 'ADi~veLLikkizhamai'),
-                                                       (10, 5, 'tai~veLLikkizhamai'),
-                                                       (11, 2, 'mAci~cevvAy')):
-        if self.daily_panchaangas[d].solar_sidereal_date_sunset.month == mwd_fest_m and self.daily_panchaangas[d].date.get_weekday() == mwd_fest_wd:
-          self.panchaanga.add_festival(fest_id=mwd_fest_name, date=self.daily_panchaangas[d].date)
+    # SOLAR MONTH-WEEKDAY FESTIVALS
+    for (mwd_fest_m, mwd_fest_wd, mwd_fest_name) in ((5, 0, 'AvaNi~JAyir2r2ukkizhamai'),
+                                                     (6, 6, 'puraTTAci~can2ikkizhamai'),
+                                                     (8, 0, 'kArttigai~JAyir2r2ukkizhamai'),
+                                                     (4, 5, 'ADi~veLLikkizhamai'),
+                                                     (10, 5, 'tai~veLLikkizhamai'),
+                                                     (11, 2, 'mAci~cevvAy')):
+      for d in self.panchaanga.find_days(solar_sidereal_month_sunset=mwd_fest_m, weekday=mwd_fest_wd):
+        self.panchaanga.add_festival(fest_id=mwd_fest_name, date=self.daily_panchaangas[d].date)
 
   def assign_tithi_vara_yoga_mangala_angaaraka(self):
     if 'aGgArakI~caturthI' not in self.rules_collection.name_to_rule:
       return
-    for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
-      # MANGALA-CHATURTHI
-      tithi_sunset = self.daily_panchaangas[d].sunrise_day_angas.get_anga_at_jd(jd=self.daily_panchaangas[d].jd_sunset, anga_type=AngaType.TITHI) % 15
-      if self.daily_panchaangas[d].date.get_weekday() == 2 and (self.daily_panchaangas[d].sunrise_day_angas.tithi_at_sunrise.index % 15 == 4 or tithi_sunset == 4):
-        festival_name = 'aGgArakI~caturthI'
-        if self.daily_panchaangas[d].sunrise_day_angas.tithi_at_sunrise.index == 4 or tithi_sunset == 4:
-          festival_name = 'sukhA' + '~' + festival_name
-        self.panchaanga.add_festival(fest_id=festival_name, date=self.daily_panchaangas[d].date)
+    # MANGALA-CHATURTHI
+    is_caturthii = lambda tithis: tithis % 15 == 4
+    days = set(self.panchaanga.find_days(weekday=2, tithi_at_sunrise=is_caturthii)) | set(self.panchaanga.find_days(weekday=2, tithi_at_sunset=is_caturthii))
+    for d in sorted(days):
+      tithi_sunset = self.panchaanga.get_day_columns().get_column("tithi_at_sunset")[d] % 15
+      festival_name = 'aGgArakI~caturthI'
+      if self.daily_panchaangas[d].sunrise_day_angas.tithi_at_sunrise.index == 4 or tithi_sunset == 4:
+        festival_name = 'sukhA' + '~' + festival_name
+      self.panchaanga.add_festival(fest_id=festival_name, date=self.daily_panchaangas[d].date)
 
   def assign_tithi_vara_yoga_kRSNAGgAraka(self):
     if 'kRSNAGgAraka-caturdazI-puNyakAlaH_or_yamatarpaNam' not in self.rules_collection.name_to_rule:
       return
-    for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
-      # KRISHNA ANGARAKA CHATURDASHI
-      if self.daily_panchaangas[d].date.get_weekday() == 2 and self.daily_panchaangas[d].sunrise_day_angas.tithi_at_sunrise.index == 29:
-        # Double-check rule. When should the vyApti be?
-        self.panchaanga.add_festival(fest_id='kRSNAGgAraka-caturdazI-puNyakAlaH or yamatarpaNam', date=self.daily_panchaangas[d].date)
-        if self.daily_panchaangas[d].lunar_date.month.index == 1:
-          self.panchaanga.add_festival(fest_id='pizAcamOcanam', date=self.daily_panchaangas[d].date)
+    # KRISHNA ANGARAKA CHATURDASHI
+    for d in self.panchaanga.find_days(weekday=2, tithi_at_sunrise=29):
+      # Double-check rule. When should the vyApti be?
+      self.panchaanga.add_festival(fest_id='kRSNAGgAraka-caturdazI-puNyakAlaH or yamatarpaNam', date=self.daily_panchaangas[d].date)
+      if self.daily_panchaangas[d].lunar_date.month.index == 1:
+        self.panchaanga.add_festival(fest_id='pizAcamOcanam', date=self.daily_panchaangas[d].date)
 
   def assign_tithi_vara_yoga_budhaaShTamii(self):
     if 'budhASTamI' not in self.rules_collection.name_to_rule:
       return 
-    for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
-      # BUDHASHTAMI
-      if self.daily_panchaangas[d].date.get_weekday() == 3 and self.daily_panchaangas[d].sunrise_day_angas.tithi_at_sunrise.index == 8:
-        if self.daily_panchaangas[d].lunar_date.month.index == 10:
-          # Pausha Shukla Ashtami + Budha vasara
-          self.panchaanga.add_festival(fest_id='mahAbhadrA~budhASTamI', date=self.daily_panchaangas[d].date)
-        elif ceil(self.daily_panchaangas[d].lunar_date.month.index) in [1, 5, 6, 7, 8]:
-          # ceil above takes care of adhika maasas
-          # 5, 6, 7, 8 takes care of श्रावणादिमासचतुष्टये
-          # सायाह्नकाले चैत्रमासे श्रावणादिमासचतुष्टये कृष्णपक्षे च न ग्राह्या ॥
-          pass
-        else:
-          self.panchaanga.add_festival(fest_id='budhASTamI', date=self.daily_panchaangas[d].date)
+    # BUDHASHTAMI
+    for d in self.panchaanga.find_days(weekday=3, tithi_at_sunrise=8):
+      if self.daily_panchaangas[d].lunar_date.month.index == 10:
+        # Pausha Shukla Ashtami + Budha vasara
+        self.panchaanga.add_festival(fest_id='mahAbhadrA~budhASTamI', date=self.daily_panchaangas[d].date)
+      elif ceil(self.daily_panchaangas[d].lunar_date.month.index) in [1, 5, 6, 7, 8]:
+        # ceil above takes care of adhika maasas
+        # 5, 6, 7, 8 takes care of श्रावणादिमासचतुष्टये
+        # सायाह्नकाले चैत्रमासे श्रावणादिमासचतुष्टये कृष्णपक्षे च न ग्राह्या ॥
+        pass
+      else:
+        self.panchaanga.add_festival(fest_id='budhASTamI', date=self.daily_panchaangas[d].date)
 
 
   def assign_nakshatra_vara_yoga_vratam(self):
@@ -164,11 +159,10 @@ class VaraFestivalAssigner(FestivalAssigner):
     if 'pAtArka-yOgaH' not in self.rules_collection.name_to_rule:
       return 
     PAATA_YOGA = 17 # vyatipAta
-    for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
-      if self.daily_panchaangas[d].date.get_weekday() == 0:
-        d_yogas = self.daily_panchaangas[d].day_length_based_periods.dinamaana.get_boundary_angas(anga_type=AngaType.YOGA, ayanaamsha_id=self.ayanaamsha_id)
-        if PAATA_YOGA in [d_yogas.start.index, d_yogas.end.index]:
-          self.panchaanga.add_festival_instance(festival_instance=FestivalInstance(name='pAtArka-yOgaH'), date=self.daily_panchaangas[d].date)
+    for d in self.panchaanga.find_days(weekday=0):
+      d_yogas = self.daily_panchaangas[d].day_length_based_periods.dinamaana.get_boundary_angas(anga_type=AngaType.YOGA, ayanaamsha_id=self.ayanaamsha_id)
+      if PAATA_YOGA in [d_yogas.start.index, d_yogas.end.index]:
+        self.panchaanga.add_festival_instance(festival_instance=FestivalInstance(name='pAtArka-yOgaH'), date=self.daily_panchaangas[d].date)
 
 # Essential for depickling to work.
 common.update_json_class_index(sys.modules[__name__])
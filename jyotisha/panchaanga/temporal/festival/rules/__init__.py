@@ -1,6 +1,8 @@
 import codecs
+import hashlib
 import logging
 import os
+import pickle
 import sys
 from pathlib import Path
 
@@ -13,7 +15,7 @@ from sanskrit_data import collection_helper
 from sanskrit_data.schema import common
 from timebudget import timebudget
 
-from jyotisha import custom_transliteration
+from jyotisha import custom_transliteration, util
 from jyotisha.panchaanga.temporal import names
 
 
@@ -306,6 +308,10 @@ def get_festival_rules_map(dir_path, julian_handling, repo=None):
 
 
 DATA_ROOT = os.path.join(os.path.dirname(__file__), "../data")
+# Compiled RulesCollection snapshots are stored here by default - see RulesCollection.load. This environment variable overrides it - an empty value means no snapshots (as in tests).
+SNAPSHOT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "jyotisha", "rules_snapshots")
+SNAPSHOT_DIR_ENV_VAR = "JYOTISHA_RULES_SNAPSHOT_DIR"
+SNAPSHOT_FORMAT_VERSION = 2
 _ADYATITHI_REPOS_PATH = os.path.join(DATA_ROOT, "repos.toml")
 
 
@@ -333,6 +339,38 @@ class RulesRepo(common.JsonObject):
     return self.path if self.path is not None else os.path.join(DATA_ROOT, self.name)
 
 
+def get_repos_hash(repos):
+  """Hash of the contents of the given rule repos - it changes whenever a rule is added, removed or edited."""
+  hasher = hashlib.sha256()
+  for repo in repos:
+    hasher.update(repo.name.encode("utf-8"))
+    repo_path = repo.get_path()
+    for dir_path, dir_names, file_names in os.walk(repo_path):
+      # For a deterministic walk
+      dir_names.sort()
+      for file_name in sorted(file_names):
+        file_path = os.path.join(dir_path, file_name)
+        hasher.update(os.path.relpath(file_path, repo_path).encode("utf-8"))
+        with open(file_path, "rb") as rule_file:
+          hasher.update(rule_file.read())
+  return hasher.hexdigest()
+
+
+def get_repos_fingerprint(repos):
+  """A cheaper stand-in for get_repos_hash, using file names, sizes and modification times rather than contents. Suits caches local to this machine."""
+  hasher = hashlib.sha256()
+  for repo in repos:
+    hasher.update(repo.name.encode("utf-8"))
+    repo_path = repo.get_path()
+    for dir_path, dir_names, file_names in os.walk(repo_path):
+      dir_names.sort()
+      for file_name in sorted(file_names):
+        file_path = os.path.join(dir_path, file_name)
+        file_stat = os.stat(file_path)
+        hasher.update(("%s|%d|%d" % (os.path.relpath(file_path, repo_path), file_stat.st_size, file_stat.st_mtime_ns)).encode("utf-8"))
+  return hasher.hexdigest()
+
+
 class RulesCollection(common.JsonObject):
   JULIAN_AS_GREGORIAN = "treated as Gregorian"
   JULIAN_TO_GREGORIAN = "converted to Gregorian"
@@ -343,12 +381,71 @@ class RulesCollection(common.JsonObject):
     self.repos = repos
     self.name_to_rule = {}
     self.tree = None 
+    self._month_anga_index = None
+    # (month_type, month, anga_type_id, anga, anga_month) -> festivals - see get_possibly_relevant_fests.
+    self._anga_fests_cache = {}
     self.set_rule_dicts(julian_handling=julian_handling)
 
   @methodtools.lru_cache()  # the order is important!
   @classmethod
   def get_cached(cls, repos_tuple, julian_handling=JULIAN_TO_GREGORIAN):
-    return RulesCollection(repos=repos_tuple, julian_handling=julian_handling)
+    return RulesCollection.load(repos=repos_tuple, julian_handling=julian_handling)
+
+  @classmethod
+  def get_snapshot_path(cls, repos, julian_handling, snapshot_dir=None):
+    """None if snapshots are disabled - by snapshot_dir=False or SNAPSHOT_DIR_ENV_VAR.
+
+    Snapshots of the same repos (and julian_handling) share a file name prefix - so that stale ones can be found and removed.
+    """
+    if snapshot_dir is None:
+      snapshot_dir = os.environ.get(SNAPSHOT_DIR_ENV_VAR, SNAPSHOT_DIR)
+    if not snapshot_dir:
+      return None
+    repos_key = "%s|%s|%s" % (SNAPSHOT_FORMAT_VERSION, julian_handling, "|".join("%s=%s" % (repo.name, os.path.abspath(repo.get_path())) for repo in repos))
+    key = "%s|%s" % (repos_key, get_repos_fingerprint(repos=repos))
+    return os.path.join(snapshot_dir, "%s__%s.pickle" % (hashlib.sha256(repos_key.encode("utf-8")).hexdigest()[:16], hashlib.sha256(key.encode("utf-8")).hexdigest()))
+
+  @classmethod
+  def _store_snapshot(cls, rules_collection, snapshot_path):
+    try:
+      # Private, since snapshots are unpickled.
+      os.makedirs(os.path.dirname(snapshot_path), mode=0o700, exist_ok=True)
+      # Write and then rename, so that concurrent loaders never see a partial snapshot.
+      temp_path = "%s.%d.tmp" % (snapshot_path, os.getpid())
+      with open(temp_path, "wb") as snapshot_file:
+        snapshot_file.write(util.pickle_dumps(rules_collection))
+      os.replace(temp_path, snapshot_path)
+      # Snapshots of older versions of these rules are useless now.
+      for stale_path in Path(os.path.dirname(snapshot_path)).glob(os.path.basename(snapshot_path).split("__")[0] + "__*.pickle"):
+        if str(stale_path) != snapshot_path:
+          stale_path.unlink()
+    except EnvironmentError:
+      logging.warning("Could not store rules snapshot %s.", snapshot_path)
+
+  @classmethod
+  @timebudget
+  def load(cls, repos, julian_handling=JULIAN_TO_GREGORIAN, snapshot_dir=None):
+    """Load a compiled snapshot if one matches the current rule files - else parse the rule files, and store a snapshot for later loads (in this or other processes).
+
+    Parsing the toml files takes seconds; loading a snapshot, milliseconds. Any change to the rule files leads to a different snapshot path, and hence invalidates older snapshots - which are removed when the new one is stored.
+
+    :param snapshot_dir: None means SNAPSHOT_DIR (or SNAPSHOT_DIR_ENV_VAR, if set). False means no snapshots.
+    """
+    snapshot_path = cls.get_snapshot_path(repos=repos, julian_handling=julian_handling, snapshot_dir=snapshot_dir)
+    if snapshot_path is None:
+      return RulesCollection(repos=repos, julian_handling=julian_handling)
+    # Only our own snapshots are unpickled.
+    if os.path.isfile(snapshot_path) and (not hasattr(os, "getuid") or os.stat(snapshot_path).st_uid == os.getuid()):
+      try:
+        with open(snapshot_path, "rb") as snapshot_file:
+          rules_collection = pickle.load(snapshot_file)
+        rules_collection.repos = repos
+        return rules_collection
+      except Exception:
+        logging.warning("Could not load rules snapshot %s. Parsing rules afresh.", snapshot_path)
+    rules_collection = RulesCollection(repos=repos, julian_handling=julian_handling)
+    cls._store_snapshot(rules_collection=rules_collection, snapshot_path=snapshot_path)
+    return rules_collection
 
   def fix_content(self):
     for repo in self.repos:
@@ -393,6 +490,24 @@ class RulesCollection(common.JsonObject):
 
     from sanskrit_data import collection_helper
     self.tree = collection_helper.tree_maker(leaves=self.name_to_rule.values(), path_fn=lambda x: x.get_storage_file_name(base_dir="", undo_conversions=False).replace(".toml", ""))
+    self.set_month_anga_index()
+
+  def set_month_anga_index(self):
+    """Index festivals by (month_type, anga_type, month, anga) paths in the tree - for get_month_anga_fests."""
+    def _children(subtree):
+      return [(key, child) for key, child in subtree.items() if key != collection_helper.LEAVES_KEY]
+
+    self._month_anga_index = {}
+    # Derived from the index.
+    self._anga_fests_cache = {}
+    for month_type, month_type_tree in _children(self.tree):
+      for anga_type, anga_type_tree in _children(month_type_tree):
+        for month_str, month_tree in _children(anga_type_tree):
+          for anga_str, anga_tree in _children(month_tree):
+            fests = _children(anga_tree)
+            # Festivals must be leaves right below the anga.
+            if all(collection_helper.LEAVES_KEY in fest_tree for _, fest_tree in fests):
+              self._month_anga_index[(month_type, anga_type, month_str, anga_str)] = {fest_id: fest_tree[collection_helper.LEAVES_KEY][0] for fest_id, fest_tree in fests}
 
   def get_month_anga_fests(self, month_type, month, anga_type_id, anga):
     if int(month) != month and month != 0:
@@ -403,57 +518,60 @@ class RulesCollection(common.JsonObject):
     from jyotisha.panchaanga.temporal.zodiac import Anga
     if isinstance(anga, Anga):
       anga = anga.index
-    try:
-      subtree = self.tree[month_type.lower()][anga_type_id.lower()][month_str]["%02d" % anga]
-      tree_out = {}
-      for x, y in subtree.items():
-        if x != collection_helper.LEAVES_KEY:
-          tree_out[x] = y[collection_helper.LEAVES_KEY][0]
-      return tree_out
-    except KeyError:
-      return {}
+    # A copy, since callers filter the result.
+    return dict(self._month_anga_index.get((month_type.lower(), anga_type_id.lower(), month_str, "%02d" % anga), {}))
 
-  def get_possibly_relevant_fests(self, month_type, month, anga_type_id, angas):
-    def _get_month(anga):
-      if isinstance(anga, Tithi):
-        return anga.month.index
+  def _get_anga_fests(self, month_type, month, anga_type_id, anga, anga_month):
+    """Festivals possibly relevant for a single anga - see get_possibly_relevant_fests.
+
+    :param anga_month: The month of anga if it is a Tithi, else month.
+    """
+    if month_type == RulesRepo.LUNAR_MONTH_DIR:
+      months_list = [anga_month, 0]
+      is_adhika = int(anga_month) != anga_month
+
+      if not is_adhika:
+        # Add the adhika masa also
+        months_list.append(anga_month - 0.5)
       else:
-        return month
-      
+        # Add the nija masa also
+        months_list.append(anga_month + 0.5)
+    else:
+      months_list = [month, 0]
+
+    if int(month) != month:
+      if month - 1 in months_list:
+        # Previous "adhika" does not exist - added because we are looking at the month of the supplied angas
+        months_list.remove(month - 1)
+      if month - 0.5 in months_list:
+        # Previous maasa is also not relevant!
+        months_list.remove(month - 0.5)
+
     fest_dict = {}
-    for anga in angas:
-      from jyotisha.panchaanga.temporal.zodiac.angas import Tithi
+    for m in months_list:
+      new_fests = self.get_month_anga_fests(month_type=month_type, month=m, anga_type_id=anga_type_id, anga=anga)
       if month_type == RulesRepo.LUNAR_MONTH_DIR:
-        _m = _get_month(anga)
-        months_list = [_m, 0]
-        is_adhika = int(_m) != _m
-
-        if not is_adhika:
-          # Add the adhika masa also
-          months_list.append(_m - 0.5)
+        if m == 0:
+          _filter_by_adhikamaasa_relevance(month=month, fest_dict=new_fests)
         else:
-          # Add the nija masa also
-          months_list.append(_m + 0.5)
-      else:
-        months_list = [month, 0]
-
-      if int(month) != month:
-        if month - 1 in months_list:
-          # Previous "adhika" does not exist - added because we are looking at the month of the supplied angas
-          months_list.remove(month - 1)
-        if month - 0.5 in months_list:
-          # Previous maasa is also not relevant!
-          months_list.remove(month - 0.5)
-
-      for m in months_list:
-        new_fests = self.get_month_anga_fests(month_type=month_type, month=m, anga_type_id=anga_type_id, anga=anga)
-        if month_type == RulesRepo.LUNAR_MONTH_DIR:
-          if m == 0:
-            _filter_by_adhikamaasa_relevance(month=month, fest_dict=new_fests)
-          else:
-            m = _get_month(anga=anga)
-            _filter_by_adhikamaasa_relevance(month=m, fest_dict=new_fests)
-        fest_dict.update(new_fests)
+          _filter_by_adhikamaasa_relevance(month=anga_month, fest_dict=new_fests)
+      fest_dict.update(new_fests)
+    return fest_dict
+
+  def get_possibly_relevant_fests(self, month_type, month, anga_type_id, angas):
+    from jyotisha.panchaanga.temporal.zodiac.angas import Tithi, Anga
+    # self._anga_fests_cache is filled as needed - it lasts as long as this (usually cached) collection.
+
+    fest_dict = {}
+    for anga in angas:
+      anga_index = anga.index if isinstance(anga, Anga) else anga
+      anga_month = anga.month.index if isinstance(anga, Tithi) else month
+      key = (month_type, month, anga_type_id, anga_index, anga_month)
+      anga_fests = self._anga_fests_cache.get(key, None)
+      if anga_fests is None:
+        anga_fests = self._get_anga_fests(month_type=month_type, month=month, anga_type_id=anga_type_id, anga=anga_index, anga_month=anga_month)
+        self._anga_fests_cache[key] = anga_fests
+      fest_dict.update(anga_fests)
 
     def _check_month_tithi_match(month, angas):
       for anga in angas:
@@ -15,9 +15,10 @@ class LunarMonthAssigner(JsonObject):
   MULTI_FULL_MOON_SIDEREAL_MONTH_ADHIKA = "MULTI_FULL_MOON_SIDEREAL_MONTH_ADHIKA"
   SOLSTICE_POST_DARK_10_ADHIKA = "SOLSTICE_POST_DARK_10_ADHIKA"
   
-  def __init__(self, ayanaamsha_id):
+  def __init__(self, ayanaamsha_id, root_finder=None):
     super().__init__()
     self.ayanaamsha_id = ayanaamsha_id
+    self.root_finder = root_finder
 
   def _get_month(self, daily_panchaanga):
     pass
@@ -29,11 +30,11 @@ class LunarMonthAssigner(JsonObject):
   @classmethod
   def get_assigner(cls, computation_system):
     if computation_system.lunar_month_assigner_type == LunarMonthAssigner.MULTI_NEW_MOON_SIDEREAL_MONTH_ADHIKA_AMAANTA:
-      return MultiNewmoonSolarMonthAdhikaAssigner(ayanaamsha_id=computation_system.ayanaamsha_id, month_end_tithi=30)
+      return MultiNewmoonSolarMonthAdhikaAssigner(ayanaamsha_id=computation_system.ayanaamsha_id, month_end_tithi=30, root_finder=computation_system.root_finder)
     elif computation_system.lunar_month_assigner_type == LunarMonthAssigner.MULTI_NEW_MOON_SIDEREAL_MONTH_ADHIKA_PURNIMANTA:
-      return MultiNewmoonSolarMonthAdhikaAssigner(ayanaamsha_id=computation_system.ayanaamsha_id, month_end_tithi=15)
+      return MultiNewmoonSolarMonthAdhikaAssigner(ayanaamsha_id=computation_system.ayanaamsha_id, month_end_tithi=15, root_finder=computation_system.root_finder)
     elif computation_system.lunar_month_assigner_type == LunarMonthAssigner.MULTI_FULL_MOON_SIDEREAL_MONTH_ADHIKA:
-      return MultiFullmoonSolarMonthAdhikaAssigner(ayanaamsha_id=computation_system.ayanaamsha_id)
+      return MultiFullmoonSolarMonthAdhikaAssigner(ayanaamsha_id=computation_system.ayanaamsha_id, root_finder=computation_system.root_finder)
     elif computation_system.lunar_month_assigner_type == LunarMonthAssigner.SOLSTICE_POST_DARK_10_ADHIKA:
       return SolsticePostDark10AdhikaAssigner(ayanaamsha_id=computation_system.ayanaamsha_id)
     else:
@@ -43,8 +44,8 @@ class LunarMonthAssigner(JsonObject):
 class MultiLunarPhaseSolarMonthAdhikaAssigner(LunarMonthAssigner):
   """Let us consider a lunar month defined as ending with a particular lunar tithi. This assigner marks a month as adhika iff that month does not have a solar sankrAnti."""
 
-  def __init__(self, ayanaamsha_id, month_end_tithi, adhika_maasa_det_tithi=None):
-    super(MultiLunarPhaseSolarMonthAdhikaAssigner, self).__init__(ayanaamsha_id=ayanaamsha_id)
+  def __init__(self, ayanaamsha_id, month_end_tithi, adhika_maasa_det_tithi=None, root_finder=None):
+    super(MultiLunarPhaseSolarMonthAdhikaAssigner, self).__init__(ayanaamsha_id=ayanaamsha_id, root_finder=root_finder)
     self.month_end_tithi = month_end_tithi
     if adhika_maasa_det_tithi is None:
       self.adhika_maasa_det_tithi = month_end_tithi
@@ -63,7 +64,7 @@ class MultiLunarPhaseSolarMonthAdhikaAssigner(LunarMonthAssigner):
     :return: 
     """
     # tithi_at_sunrise gives a rough indication of the number of days since last adhika_maasa_det_tithi. We now find a more precise interval below.
-    anga_finder = zodiac.AngaSpanFinder.get_cached(ayanaamsha_id=Ayanamsha.ASHVINI_STARTING_0, anga_type=zodiac.AngaType.TITHI)
+    anga_finder = zodiac.AngaSpanFinder.get_cached(ayanaamsha_id=Ayanamsha.ASHVINI_STARTING_0, anga_type=zodiac.AngaType.TITHI, root_finder=self.root_finder)
 
     if self.adhika_maasa_det_tithi < daily_panchaanga.sunrise_day_angas.tithi_at_sunrise.index:
       approx_days_since_last_det_tithi =  daily_panchaanga.sunrise_day_angas.tithi_at_sunrise.index - self.adhika_maasa_det_tithi
@@ -133,13 +134,13 @@ class MultiLunarPhaseSolarMonthAdhikaAssigner(LunarMonthAssigner):
 
 
 class MultiNewmoonSolarMonthAdhikaAssigner(MultiLunarPhaseSolarMonthAdhikaAssigner):
-  def __init__(self, ayanaamsha_id, month_end_tithi):
-    super(MultiNewmoonSolarMonthAdhikaAssigner, self).__init__(ayanaamsha_id=ayanaamsha_id, month_end_tithi=month_end_tithi, adhika_maasa_det_tithi=30)
+  def __init__(self, ayanaamsha_id, month_end_tithi, root_finder=None):
+    super(MultiNewmoonSolarMonthAdhikaAssigner, self).__init__(ayanaamsha_id=ayanaamsha_id, month_end_tithi=month_end_tithi, adhika_maasa_det_tithi=30, root_finder=root_finder)
 
 
 class MultiFullmoonSolarMonthAdhikaAssigner(MultiLunarPhaseSolarMonthAdhikaAssigner):
-  def __init__(self, ayanaamsha_id, month_end_tithi=15):
-    super(MultiFullmoonSolarMonthAdhikaAssigner, self).__init__(ayanaamsha_id=ayanaamsha_id, month_end_tithi=month_end_tithi, adhika_maasa_det_tithi=15)
+  def __init__(self, ayanaamsha_id, month_end_tithi=15, root_finder=None):
+    super(MultiFullmoonSolarMonthAdhikaAssigner, self).__init__(ayanaamsha_id=ayanaamsha_id, month_end_tithi=month_end_tithi, adhika_maasa_det_tithi=15, root_finder=root_finder)
 
 
 class SolsticePostDark10AdhikaAssigner(LunarMonthAssigner):
@@ -0,0 +1,72 @@
+"""Root finding engines for locating anga boundaries and transits.
+
+BRENTQ uses function values alone. NEWTON additionally uses the rate of change (derived from swisseph's longitude speeds), and so typically needs far fewer ephemeris evaluations per root.
+"""
+
+from scipy.optimize import brentq
+
+BRENTQ = "brentq"
+NEWTON = "newton"
+
+
+def find_root(f, x1, x2, f_and_derivative=None, method=None):
+  """Find a root of f within the bracket [x1, x2].
+
+  :param f: Function of one variable.
+  :param f_and_derivative: Function returning the tuple (f(x), f'(x)). Required for the NEWTON method.
+  :param method: BRENTQ (the default, if None) or NEWTON.
+  :return: The root. Raises ValueError if [x1, x2] does not bracket a root.
+  """
+  if method is None or method == BRENTQ or f_and_derivative is None:
+    return brentq(f, x1, x2)
+  elif method == NEWTON:
+    return newton_with_bracket(f_and_derivative=f_and_derivative, x1=x1, x2=x2)
+  raise ValueError("Unknown root finding method: %s" % method)
+
+
+def newton_with_bracket(f_and_derivative, x1, x2, xtol=1e-9, max_iterations=100):
+  """Newton-Raphson iteration, safeguarded by a bracket (cf. rtsafe in Numerical Recipes).
+
+  Whenever a Newton step would leave the current bracket, or does not shrink it fast enough (eg. across the discontinuity of a wrapped longitude), a bisection step is taken instead.
+
+  Halley steps are not used - swisseph does not provide the second derivative, and estimating it costs an extra evaluation per step.
+
+  :param xtol: Absolute tolerance - comparable to what brentq achieves for julian days.
+  :return: The root. Raises ValueError if [x1, x2] does not bracket a root, and RuntimeError if there is no convergence.
+  """
+  (f1, _) = f_and_derivative(x1)
+  if f1 == 0:
+    return x1
+  (f2, _) = f_and_derivative(x2)
+  if f2 == 0:
+    return x2
+  if (f1 > 0) == (f2 > 0):
+    raise ValueError("f(a) and f(b) must have different signs")
+  if f1 < 0:
+    (x_low, x_high) = (x1, x2)
+  else:
+    (x_low, x_high) = (x2, x1)
+
+  # Start from the secant point rather than the middle of the bracket.
+  x = x1 - f1 * (x2 - x1) / (f2 - f1)
+  dx_old = dx = abs(x2 - x1)
+  (f, derivative) = f_and_derivative(x)
+  for _ in range(max_iterations):
+    if ((x - x_high) * derivative - f) * ((x - x_low) * derivative - f) > 0 or abs(2 * f) > abs(dx_old * derivative):
+      dx_old = dx
+      dx = 0.5 * (x_high - x_low)
+      x = x_low + dx
+    else:
+      dx_old = dx
+      dx = f / derivative
+      x = x - dx
+    if abs(dx) < xtol:
+      return x
+    (f, derivative) = f_and_derivative(x)
+    if f == 0:
+      return x
+    if f < 0:
+      x_low = x
+    else:
+      x_high = x
+  raise RuntimeError("Newton iteration failed to converge between %f and %f" % (x1, x2))
@@ -1,5 +1,7 @@
+import bisect
 import logging
 import sys
+import threading
 from math import floor
 from numbers import Number
 from typing import Optional
@@ -7,13 +9,13 @@ from typing import Optional
 import methodtools
 import numpy
 import swisseph as swe
+from jyotisha.panchaanga.temporal import root_finding
 from jyotisha.panchaanga.temporal.body import Graha
 from jyotisha.panchaanga.temporal.interval import Interval, AngaSpan
 from jyotisha.panchaanga.temporal.zodiac.angas import AngaType, Anga
 from jyotisha.util import default_if_none
 from sanskrit_data.schema import common
 from sanskrit_data.schema.common import JsonObject
-from scipy.optimize import brentq
 from timebudget import timebudget
 
 
@@ -23,6 +25,18 @@ logging.basicConfig(
   format="%(levelname)s: %(asctime)s {%(filename)s:%(lineno)d}: %(message)s "
 )
 
+# Per thread - lest concurrent computations (as in the API server) use each other's curves.
+_thread_local = threading.local()
+
+
+def get_ayanaamsha_curves():
+  """ayanaamsha_id -> ayanaamsha_curve.AyanaamshaCurve, used in place of fresh computation within the curve range. See ayanaamsha_curve.curves_in_use."""
+  return getattr(_thread_local, "ayanaamsha_curves", {})
+
+
+def set_ayanaamsha_curves(ayanaamsha_curves):
+  _thread_local.ayanaamsha_curves = ayanaamsha_curves
+
 
 class Ayanamsha(common.JsonObject):
   """
@@ -47,6 +61,12 @@ class Ayanamsha(common.JsonObject):
     self.ayanaamsha_id = ayanaamsha_id
 
   def get_offset(self, jd):
+    curve = get_ayanaamsha_curves().get(self.ayanaamsha_id, None)
+    if curve is not None and curve.covers(jd):
+      return curve.get_offset(jd)
+    return self._get_exact_offset(jd)
+
+  def _get_exact_offset(self, jd):
     if self.ayanaamsha_id == Ayanamsha.VERNAL_EQUINOX_AT_0:
       return 0
     elif self.ayanaamsha_id == Ayanamsha.CHITRA_AT_180:
@@ -60,6 +80,30 @@ class Ayanamsha(common.JsonObject):
       return swe.get_ayanamsa_ut(jd)
     raise Exception("Bad ayanamsha_id")
 
+  def get_offsets(self, jds):
+    """Batch counterpart of get_offset.
+    
+    :param jds: A sequence or numpy array of julian days.
+    :return: A numpy array of the same shape as jds.
+    """
+    jds = numpy.asarray(jds, dtype=float)
+    curve = get_ayanaamsha_curves().get(self.ayanaamsha_id, None)
+    if curve is not None and jds.size > 0 and curve.covers(jds.min()) and curve.covers(jds.max()):
+      return curve.get_offsets(jds)
+    return self._get_exact_offsets(jds)
+
+  def _get_exact_offsets(self, jds):
+    jds = numpy.asarray(jds, dtype=float)
+    if self.ayanaamsha_id in (Ayanamsha.VERNAL_EQUINOX_AT_0, Ayanamsha.ASHVINI_STARTING_0):
+      return numpy.zeros(jds.shape)
+    elif self.ayanaamsha_id == Ayanamsha.CHITRA_AT_180:
+      from jyotisha.panchaanga.temporal import body
+      return body.get_star_longitudes(star="Spica", jds=jds) - 180
+    elif self.ayanaamsha_id == Ayanamsha.RASHTRIYA_PANCHANGA_NAKSHATRA_TRACKING:
+      swe.set_sid_mode(swe.SIDM_LAHIRI)
+      return numpy.fromiter((swe.get_ayanamsa_ut(jd) for jd in jds.flat), dtype=float, count=jds.size).reshape(jds.shape)
+    raise Exception("Bad ayanamsha_id")
+
 
 class NakshatraDivision(common.JsonObject):
   """Nakshatra division at a certain time, according to a certain ayanaamsha."""
@@ -147,11 +191,10 @@ class NakshatraDivision(common.JsonObject):
 
   def get_all_angas(self):
     """Compute various properties of the time based on lunar and solar longitudes, division of a circle into a certain number of degrees (arc_len).
+
+    :return: A dict from anga type name to Anga.
     """
-    anga_objects = [AngaType.TITHI, AngaType.TITHI_PADA, AngaType.NAKSHATRA, AngaType.NAKSHATRA_PADA, AngaType.RASHI, AngaType.SOLAR_NAKSH, AngaType.YOGA, AngaType.KARANA]
-    angas = list(map(lambda anga_object: self.get_anga(anga_type=anga_object), anga_objects))
-    anga_ids = list(map(lambda anga_obj: anga_obj.index, anga_objects))
-    return dict(list(zip(anga_ids, angas)))
+    return get_all_angas_at_jds(jds=[self.jd], ayanaamsha_id=self.ayanaamsha_id)[0]
 
   def get_nakshatra(self):
     """Returns the nakshatra prevailing at a given moment
@@ -195,6 +238,56 @@ class NakshatraDivision(common.JsonObject):
     return self.get_anga(AngaType.GRAHA_RASHI[Graha.SUN])
 
 
+def get_anga_floats(jds, ayanaamsha_id, anga_type):
+  """Batch counterpart of NakshatraDivision.get_anga_float.
+  
+  :param jds: A sequence or numpy array of julian days.
+  :return: A numpy array of the same shape as jds.
+  """
+  if anga_type == AngaType.TITHI:
+    # For efficiency - avoid lookups.
+    ayanaamsha_id = Ayanamsha.VERNAL_EQUINOX_AT_0
+  jds = numpy.asarray(jds, dtype=float)
+  lcalc = numpy.zeros(jds.shape)
+  for body_name, weight in anga_type.body_weights.items():
+    lcalc += weight * Graha.singleton(body_name=body_name).get_longitudes(jds, ayanaamsha_id=ayanaamsha_id)
+  return (lcalc % 360) / anga_type.arc_length
+
+
+ALL_ANGA_TYPES = [AngaType.TITHI, AngaType.TITHI_PADA, AngaType.NAKSHATRA, AngaType.NAKSHATRA_PADA, AngaType.RASHI, AngaType.SOLAR_NAKSH, AngaType.YOGA, AngaType.KARANA]
+
+
+def get_all_angas_at_jds(jds, ayanaamsha_id, ayanaamsha_curve_tolerance=None):
+  """Batch counterpart of NakshatraDivision.get_all_angas. Solar and lunar longitudes (and the ayanaamsha offset) are computed just once per instant, for all anga types.
+
+  :param jds: A sequence or numpy array of julian days.
+  :param ayanaamsha_curve_tolerance: If set (in degrees), ayanaamsha offsets are read off a (process-wide cached) ayanaamsha_curve.AyanaamshaCurve - provided the jds span no more than a block of the curve.
+  :return: A list (one per jd) of dicts from anga type name to Anga.
+  """
+  from jyotisha.panchaanga.temporal import ayanaamsha_curve
+  jds = numpy.asarray(jds, dtype=float)
+  if ayanaamsha_curve_tolerance is None or jds.size == 0 or jds.max() - jds.min() > ayanaamsha_curve.AyanaamshaCurve.BLOCK_DAYS:
+    return _get_all_angas_at_jds(jds=jds, ayanaamsha_id=ayanaamsha_id)
+  curves = ayanaamsha_curve.get_curves(ayanaamsha_ids=[ayanaamsha_id], jd_start=jds.min(), jd_end=jds.max(), tolerance=ayanaamsha_curve_tolerance)
+  with ayanaamsha_curve.curves_in_use(curves):
+    return _get_all_angas_at_jds(jds=jds, ayanaamsha_id=ayanaamsha_id)
+
+
+def _get_all_angas_at_jds(jds, ayanaamsha_id):
+  from jyotisha.panchaanga.temporal import body
+  body_names = [Graha.SUN, Graha.MOON]
+  # Tropical and sidereal longitudes - the former for tithis (as in get_anga_float).
+  longitudes = body.get_longitudes(body_names=body_names, jds=jds, ayanaamsha_ids=(None, ayanaamsha_id))
+  anga_type_to_indices = {}
+  for anga_type in ALL_ANGA_TYPES:
+    ayanaamsha_index = 0 if anga_type == AngaType.TITHI else 1
+    lcalc = numpy.zeros(jds.shape)
+    for body_name, weight in anga_type.body_weights.items():
+      lcalc += weight * longitudes[body_names.index(body_name), ayanaamsha_index]
+    anga_type_to_indices[anga_type.name] = 1 + numpy.floor((lcalc % 360) / anga_type.arc_length).astype(int)
+  return [{anga_type_id: Anga.get_cached(index=int(indices[i]), anga_type_id=anga_type_id) for anga_type_id, indices in anga_type_to_indices.items()} for i in range(jds.size)]
+
+
 def longitude_to_right_ascension(longitude):
   return (360 - longitude) / 360 * 24
 
@@ -207,15 +300,23 @@ def ecliptic_to_equatorial(longitude, latitude):
 
 
 class AngaSpanFinder(JsonObject):
-  def __init__(self, ayanaamsha_id, anga_type):
+  # Number of half-anga steps whose angas are computed together while seeking an anga boundary.
+  SAMPLES_PER_BLOCK = 4
+
+  def __init__(self, ayanaamsha_id, anga_type, root_finder=None):
+    """
+    
+    :param root_finder: One of the methods in root_finding (default brentq).
+    """
     super(AngaSpanFinder, self).__init__()
     self.ayanaamsha_id = ayanaamsha_id
     self.anga_type = anga_type
+    self.root_finder = root_finder
 
   @methodtools.lru_cache(maxsize=None)
   @classmethod
-  def get_cached(cls, ayanaamsha_id, anga_type):
-    return AngaSpanFinder(ayanaamsha_id=ayanaamsha_id, anga_type=anga_type)
+  def get_cached(cls, ayanaamsha_id, anga_type, root_finder=None):
+    return AngaSpanFinder(ayanaamsha_id=ayanaamsha_id, anga_type=anga_type, root_finder=root_finder)
 
   def _get_anga(self, jd):
     return NakshatraDivision(jd, ayanaamsha_id=self.ayanaamsha_id).get_anga( anga_type=self.anga_type)
@@ -228,13 +329,37 @@ class AngaSpanFinder(JsonObject):
     else:
       return anga_float - (target_anga.index - 1)
 
+  def _get_anga_float_offset_and_speed(self, jd, target_anga):
+    if self.anga_type == AngaType.TITHI:
+      ayanaamsha_id = Ayanamsha.VERNAL_EQUINOX_AT_0
+    else:
+      ayanaamsha_id = self.ayanaamsha_id
+    lcalc = 0
+    speed = 0
+    for body_name, weight in self.anga_type.body_weights.items():
+      if weight == 0:
+        continue
+      (body_longitude, body_speed) = Graha.singleton(body_name=body_name).get_longitude_and_speed(jd, ayanaamsha_id=ayanaamsha_id)
+      lcalc += weight * body_longitude
+      speed += weight * body_speed
+    anga_float = (lcalc % 360) / self.anga_type.arc_length
+    if anga_float > target_anga.index:
+      anga_float = anga_float - self.anga_type.num_angas
+    else:
+      anga_float = anga_float - (target_anga.index - 1)
+    return (anga_float, speed / self.anga_type.arc_length)
+
   def _interpolate_for_start(self, jd1, jd2, target_anga):
     try:
       # noinspection PyTypeChecker
-      return brentq(lambda x: self._get_anga_float_offset(jd=x, target_anga=target_anga), jd1, jd2)
+      return root_finding.find_root(lambda x: self._get_anga_float_offset(jd=x, target_anga=target_anga), jd1, jd2, f_and_derivative=lambda x: self._get_anga_float_offset_and_speed(jd=x, target_anga=target_anga), method=self.root_finder)
     except ValueError:
       return None
 
+  def _get_angas(self, jds):
+    anga_floats = get_anga_floats(jds=jds, ayanaamsha_id=self.ayanaamsha_id, anga_type=self.anga_type)
+    return [Anga.get_cached(index=int(1 + floor(anga_float)), anga_type_id=self.anga_type.name) for anga_float in anga_floats]
+
   def find_anga_start_between(self, jd1, jd2, target_anga):
     jd_start = None
     num_angas = self.anga_type.num_angas
@@ -242,15 +367,19 @@ class AngaSpanFinder(JsonObject):
     jd_bracket_L = jd1
     jd_now = jd1
     while jd_now <= jd2 and jd_start is None:
-      anga_now = self._get_anga(jd=jd_now)
-
-      if anga_now < target_anga:
-        # So, jd_now will be lower than jd_start
-        jd_bracket_L = jd_now
-      if anga_now == target_anga:
-        # In this branch, anga_now will have overshot the jd_start of the required interval.
-        jd_start = self._interpolate_for_start(jd1=jd_bracket_L, jd2=jd_now, target_anga=target_anga)
-      if jd_now == jd2:
+      # Sample a block of steps at once, then scan it.
+      jds_now = [jd_now]
+      while len(jds_now) < self.SAMPLES_PER_BLOCK and jds_now[-1] < jd2:
+        jds_now.append(min(jds_now[-1] + min_step, jd2))
+      for jd_now, anga_now in zip(jds_now, self._get_angas(jds=jds_now)):
+        if anga_now < target_anga:
+          # So, jd_now will be lower than jd_start
+          jd_bracket_L = jd_now
+        if anga_now == target_anga:
+          # In this branch, anga_now will have overshot the jd_start of the required interval.
+          jd_start = self._interpolate_for_start(jd1=jd_bracket_L, jd2=jd_now, target_anga=target_anga)
+          break
+      if jd_start is not None or jd_now == jd2:
         # Prevent infinite loop
         break
       jd_now = min(jd_now + min_step, jd2)
@@ -323,6 +452,102 @@ class AngaSpanFinder(JsonObject):
     return spans
 
 
+class AngaSpanIndex(object):
+  """Spans of an anga type over a whole period (typically that of a periodical panchaanga), as sorted boundaries queried by bisection.
+
+  angas[i] spans (boundaries[i - 1], boundaries[i]] - the first anga has no known start, and the last, no known end (as with the span lists of AngaSpanFinder.get_all_angas_in_period).
+  """
+
+  def __init__(self, angas, boundaries):
+    self.angas = angas
+    self.boundaries = [float(boundary) for boundary in boundaries]
+    self.anga_indices = numpy.array([anga.index for anga in angas])
+    self._anga_index_to_positions = {}
+
+  @classmethod
+  def from_span_lists(cls, span_lists):
+    """Merge successive (typically daily) span lists, such as those from AngaSpanFinder.get_all_angas_in_period."""
+    angas = []
+    boundaries = []
+    last_span = None
+    for spans in span_lists:
+      for span in spans:
+        last_span = span
+        # Successive lists share their edge angas, whose span ends are then missing or duplicated.
+        if span.jd_end is None or (len(boundaries) > 0 and span.jd_end <= boundaries[-1]):
+          continue
+        angas.append(span.anga)
+        boundaries.append(span.jd_end)
+    if last_span is not None:
+      angas.append(last_span.anga)
+    return AngaSpanIndex(angas=angas, boundaries=boundaries)
+
+  def _get_positions_in_period(self, jd1, jd2):
+    """Positions of the angas in [jd1, jd2] - those with boundaries in (jd1, jd2], and the one after the last of them."""
+    return (bisect.bisect_right(self.boundaries, jd1), bisect.bisect_right(self.boundaries, jd2) + 1)
+
+  def get_all_angas_in_period(self, jd1, jd2):
+    """Same output as AngaSpanFinder.get_all_angas_in_period - the first span has no start, the last has no end."""
+    (position_1, position_2) = self._get_positions_in_period(jd1=jd1, jd2=jd2)
+    jd_starts = [None] + self.boundaries[position_1:position_2 - 1]
+    jd_ends = self.boundaries[position_1:position_2 - 1] + [None]
+    return [AngaSpan(jd_start=jd_start, jd_end=jd_end, anga=anga) for jd_start, jd_end, anga in zip(jd_starts, jd_ends, self.angas[position_1:position_2])]
+
+  def get_span_index(self, jd1, jd2):
+    """An index of the spans in [jd1, jd2] alone - the same as from_span_lists would build from consecutive slices (see get_all_angas_in_period) covering [jd1, jd2]."""
+    (position_1, position_2) = self._get_positions_in_period(jd1=jd1, jd2=jd2)
+    return AngaSpanIndex(angas=self.angas[position_1:position_2], boundaries=self.boundaries[position_1:position_2 - 1])
+
+  def _get_span(self, position):
+    jd_start = None if position == 0 else self.boundaries[position - 1]
+    jd_end = None if position == len(self.boundaries) else self.boundaries[position]
+    return AngaSpan(jd_start=jd_start, jd_end=jd_end, anga=self.angas[position])
+
+  def get_anga_at_jd(self, jd):
+    """At a boundary, the anga ending there - as with DayAngas.get_anga_at_jd."""
+    if len(self.angas) == 0:
+      return None
+    return self.angas[bisect.bisect_left(self.boundaries, jd)]
+
+  def get_spans_in_interval(self, jd_start, jd_end):
+    """Spans overlapping [jd_start, jd_end]."""
+    position_1 = bisect.bisect_left(self.boundaries, jd_start)
+    position_2 = bisect.bisect_right(self.boundaries, jd_end)
+    return [self._get_span(position=position) for position in range(position_1, min(position_2, len(self.angas) - 1) + 1)]
+
+  def get_next_span(self, anga, jd):
+    """The first span of anga starting at or after jd - None if there is no such span in the period."""
+    positions = self._anga_index_to_positions.get(anga.index, None)
+    if positions is None:
+      positions = numpy.flatnonzero(self.anga_indices == anga.index)
+      self._anga_index_to_positions[anga.index] = positions
+    # Position p starts at boundaries[p - 1].
+    first_position = bisect.bisect_left(self.boundaries, jd) + 1
+    index = numpy.searchsorted(positions, first_position)
+    if index >= len(positions):
+      return None
+    return self._get_span(position=int(positions[index]))
+
+
+class AngaTimeline(AngaSpanIndex):
+  """All spans of an anga type over a long period, found in a single ordered sweep. 
+  
+  Spans for any sub-period (eg. a day) are then slices of this timeline, rather than the result of fresh root searches.
+  """
+
+  def __init__(self, ayanaamsha_id, anga_type, jd_start, jd_end, root_finder=None):
+    self.ayanaamsha_id = ayanaamsha_id
+    self.anga_type = anga_type
+    self.jd_start = jd_start
+    self.jd_end = jd_end
+    spans = AngaSpanFinder.get_cached(ayanaamsha_id=ayanaamsha_id, anga_type=anga_type, root_finder=root_finder).get_all_angas_in_period(jd1=jd_start, jd2=jd_end)
+    super(AngaTimeline, self).__init__(angas=[span.anga for span in spans], boundaries=[span.jd_end for span in spans[:-1]])
+
+  def covers(self, jd1, jd2):
+    # The last boundary must lie beyond jd2 - else we can't be sure that the sweep did not miss boundaries in (last boundary, jd2].
+    return self.jd_start <= jd1 and len(self.boundaries) > 0 and jd2 < self.boundaries[-1]
+
+
 # Essential for depickling to work.
 common.update_json_class_index(sys.modules[__name__])
 
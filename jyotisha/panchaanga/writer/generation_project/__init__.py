@@ -22,7 +22,7 @@ from jyotisha.panchaanga.writer.table.day_details import to_table_dict
 
 output_dir = os.path.join(os.path.dirname(os.path.dirname(jyotisha.__file__)), "hugo-source", "content", "output")
 
-def dump_ics_md_pair(panchaanga, period_str):
+def dump_ics_md_pair(panchaanga, period_str, fix_indices=True):
   ics_calendar = ics.compute_calendar(panchaanga)
   (year_type, year) = period_str.split("/")
   year = int(year)
@@ -47,17 +47,22 @@ def dump_ics_md_pair(panchaanga, period_str):
   library.apply_function(fn=MdFile.split_to_bits, dir_path=monthly_dir, frontmatter_type=MdFile.TOML, source_script=None, dry_run=False, title_index_pattern=None)
   logging.info("%s exists? %s", monthly_dir, os.path.exists(monthly_dir))
 
-  library.fix_index_files(dir_path=output_dir, transliteration_target=None, dry_run=False)
+  if fix_indices:
+    library.fix_index_files(dir_path=output_dir, transliteration_target=None, dry_run=False)
 
 
-def dump_detailed(year, city, year_type, computation_system=ComputationSystem.MULTI_NEW_MOON_SIDEREAL_MONTH_ADHIKA_AMAANTA__CHITRA_180, allow_precomputed=False):
+def dump_detailed(year, city, year_type, computation_system=ComputationSystem.MULTI_NEW_MOON_SIDEREAL_MONTH_ADHIKA_AMAANTA__CHITRA_180, allow_precomputed=False, fix_indices=True):
   logging.info("Generating detailed panchaanga for %s year %d (%s), with computation system %s ", city.name, year, year_type, str(computation_system))
   panchaanga = annual.get_panchaanga_for_year(city=city, year=year, computation_system=computation_system, year_type=year_type, allow_precomputed=allow_precomputed)
-  dump_ics_md_pair(panchaanga=panchaanga, period_str="%s/%04d" % (year_type, year))
-  dump_summary(year=year, city=city, year_type=year_type, computation_system=computation_system, allow_precomputed=True)
+  dump_ics_md_pair(panchaanga=panchaanga, period_str="%s/%04d" % (year_type, year), fix_indices=fix_indices)
+  dump_summary(year=year, city=city, year_type=year_type, computation_system=computation_system, allow_precomputed=True, fix_indices=fix_indices)
 
 
-def dump_summary(year, city, script=sanscript.DEVANAGARI, year_type=era.ERA_GREGORIAN, computation_system=ComputationSystem.MULTI_NEW_MOON_SIDEREAL_MONTH_ADHIKA_AMAANTA__CHITRA_180, allow_precomputed=False, overwrite=False):
+def dump_summary(year, city, script=sanscript.DEVANAGARI, year_type=era.ERA_GREGORIAN, computation_system=ComputationSystem.MULTI_NEW_MOON_SIDEREAL_MONTH_ADHIKA_AMAANTA__CHITRA_180, allow_precomputed=False, overwrite=False, fix_indices=True):
+  """
+
+  :param fix_indices: Whether to fix index files under output_dir right away. Batch runs (see batch.py) do so just once, at the end.
+  """
   out_path = get_canonical_path(city=city.name, computation_system_str=str(computation_system), year=year, year_type=year_type)
   if os.path.exists(out_path + ".toml") and not overwrite:
     logging.info(f"{out_path}.toml extists. skipping")
@@ -68,7 +73,8 @@ def dump_summary(year, city, script=sanscript.DEVANAGARI, year_type=era.ERA_GREG
   os.makedirs(os.path.dirname(out_path), exist_ok=True)
   with codecs.open(out_path + ".toml", "w") as fp:
     toml.dump(year_table, fp)
-  arrangement.fix_index_files(dir_path=output_dir, transliteration_target=None, dry_run=False)
+  if fix_indices:
+    arrangement.fix_index_files(dir_path=output_dir, transliteration_target=None, dry_run=False)
 
   computation_params = get_computation_parameters_md(panchaanga=panchaanga, scripts=[script])
   out_path_md = out_path + "_summary.md"
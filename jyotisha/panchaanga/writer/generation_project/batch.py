@@ -0,0 +1,167 @@
+"""
+Batch generation of summaries (or detailed calendars) for many cities, years and computation systems - as needed whenever festival rules change.
+
+Jobs are listed in a toml manifest, such as:
+
+    cities = ["Delhi", "Mysore"]
+    years = [1740, 1810]  # An inclusive range. Alternatively: year_list = [1797, 1799]
+    year_type = "gregorian"
+    computation_systems = ["MULTI_NEW_MOON_SIDEREAL_MONTH_ADHIKA_PURNIMANTA__CHITRA_180", "vishvAsa_bhAskara.toml"]
+    kind = "summary"  # or "detailed"
+    overwrite = true
+
+Computation systems are named either by ComputationSystem attribute, or by toml file (absolute, or under festival/data/computation_systems).
+
+Usage: python -m jyotisha.panchaanga.writer.generation_project.batch manifest.toml --processes 4
+
+Completed jobs are appended to a state file (manifest path + ".done" by default), so that an interrupted run resumes where it left off.
+
+Rising and setting times are shared across jobs (and runs) through a rise_set_store.RiseSetStore file (--rise-set-store), since they do not depend on the computation system.
+"""
+import argparse
+import collections
+import concurrent.futures
+import logging
+import os
+import time
+import traceback
+
+import toml
+from doc_curation.md.library import arrangement
+
+from jyotisha.panchaanga.spatio_temporal import City, rise_set_store
+from jyotisha.panchaanga.temporal import ComputationSystem, era, festival
+from jyotisha.panchaanga.temporal.festival import rules
+from jyotisha.panchaanga.writer import generation_project
+
+KIND_SUMMARY = "summary"
+KIND_DETAILED = "detailed"
+
+Job = collections.namedtuple("Job", ["city_name", "year", "year_type", "computation_system_id", "kind", "overwrite"])
+
+# Per worker process caches - these last across jobs.
+_cities = {}
+_computation_systems = {}
+
+
+def get_job_key(job):
+  return "|".join([job.city_name, job.year_type, str(job.year), job.computation_system_id, job.kind])
+
+
+def get_computation_system(computation_system_id):
+  if computation_system_id not in _computation_systems:
+    computation_system = getattr(ComputationSystem, computation_system_id, None)
+    if not isinstance(computation_system, ComputationSystem):
+      file_path = computation_system_id
+      if not os.path.isabs(file_path):
+        file_path = os.path.join(os.path.dirname(festival.__file__), "data/computation_systems", file_path)
+      computation_system = ComputationSystem.read_from_file(filename=file_path)
+    _computation_systems[computation_system_id] = computation_system
+  return _computation_systems[computation_system_id]
+
+
+def get_city(city_name):
+  if city_name not in _cities:
+    _cities[city_name] = City.get_city_from_db(name=city_name)
+  return _cities[city_name]
+
+
+def get_jobs(manifest):
+  if "year_list" in manifest:
+    years = manifest["year_list"]
+  else:
+    years = range(manifest["years"][0], manifest["years"][1] + 1)
+  jobs = []
+  for computation_system_id in manifest["computation_systems"]:
+    for city_name in manifest["cities"]:
+      for year in years:
+        jobs.append(Job(city_name=city_name, year=int(year), year_type=manifest.get("year_type", era.ERA_GREGORIAN), computation_system_id=computation_system_id, kind=manifest.get("kind", KIND_SUMMARY), overwrite=manifest.get("overwrite", False)))
+  return jobs
+
+
+def read_completed_job_keys(state_path):
+  if not os.path.exists(state_path):
+    return set()
+  with open(state_path) as state_file:
+    return set(line.strip() for line in state_file if line.strip() != "")
+
+
+def _init_worker(computation_system_ids, rise_set_store_path=None):
+  """Load computation systems and their festival rules once per worker, rather than once per job."""
+  if rise_set_store_path is not None:
+    # Jobs run in the main thread of the worker.
+    rise_set_store.set_store(rise_set_store.RiseSetStore(path=rise_set_store_path))
+  for computation_system_id in computation_system_ids:
+    computation_system = get_computation_system(computation_system_id=computation_system_id)
+    if not computation_system.festival_options.no_fests:
+      rules.RulesCollection.get_cached(repos_tuple=tuple(computation_system.festival_options.repos), julian_handling=computation_system.festival_options.julian_handling)
+
+
+def run_job(job):
+  """Returns the job and the time taken (in seconds)."""
+  start_time = time.time()
+  city = get_city(city_name=job.city_name)
+  computation_system = get_computation_system(computation_system_id=job.computation_system_id)
+  if job.kind == KIND_DETAILED:
+    generation_project.dump_detailed(year=job.year, city=city, year_type=job.year_type, computation_system=computation_system, fix_indices=False)
+  elif job.kind == KIND_SUMMARY:
+    generation_project.dump_summary(year=job.year, city=city, year_type=job.year_type, computation_system=computation_system, overwrite=job.overwrite, fix_indices=False)
+  else:
+    raise ValueError("Unknown job kind: %s" % job.kind)
+  if rise_set_store.get_store() is not None:
+    # So that other workers (computing the same city under other computation systems) can use these times.
+    rise_set_store.get_store().flush()
+  return job, time.time() - start_time
+
+
+def run(manifest_path, num_processes=None, state_path=None, rise_set_store_path=None):
+  """Run all jobs in the manifest which are not already recorded as completed in state_path.
+
+  :param rise_set_store_path: Path of a rise_set_store.RiseSetStore file. None means no store.
+
+  :return: Number of jobs completed in this run.
+  """
+  manifest = toml.load(manifest_path)
+  state_path = state_path or manifest_path + ".done"
+  jobs = get_jobs(manifest=manifest)
+  completed_job_keys = read_completed_job_keys(state_path=state_path)
+  pending_jobs = [job for job in jobs if get_job_key(job) not in completed_job_keys]
+  logging.info("%d of %d jobs pending (state in %s)", len(pending_jobs), len(jobs), state_path)
+  if len(pending_jobs) == 0:
+    return 0
+
+  start_time = time.time()
+  num_completed = 0
+  num_failed = 0
+  with concurrent.futures.ProcessPoolExecutor(max_workers=num_processes, initializer=_init_worker, initargs=(manifest["computation_systems"], rise_set_store_path)) as executor, open(state_path, "a") as state_file:
+    futures = {executor.submit(run_job, job): job for job in pending_jobs}
+    for future in concurrent.futures.as_completed(futures):
+      job = futures[future]
+      try:
+        (_, job_seconds) = future.result()
+      except Exception:
+        num_failed += 1
+        logging.error("Job %s failed:\n%s", get_job_key(job), traceback.format_exc())
+        continue
+      num_completed += 1
+      state_file.write(get_job_key(job) + "\n")
+      state_file.flush()
+      elapsed_seconds = time.time() - start_time
+      jobs_per_hour = num_completed / elapsed_seconds * 3600
+      num_remaining = len(pending_jobs) - num_completed - num_failed
+      logging.info("Done %s in %.1fs. %d done, %d failed, %d remaining. %.1f jobs/hour, ETA %.1f minutes.", get_job_key(job), job_seconds, num_completed, num_failed, num_remaining, jobs_per_hour, num_remaining / jobs_per_hour * 60)
+
+  if num_completed > 0:
+    arrangement.fix_index_files(dir_path=generation_project.output_dir, transliteration_target=None, dry_run=False)
+  logging.info("Completed %d jobs (%d failed) in %.1f minutes.", num_completed, num_failed, (time.time() - start_time) / 60)
+  return num_completed
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Batch panchAnga generator.')
+  parser.add_argument('manifest', help='Path to a toml manifest listing cities, years and computation systems.')
+  parser.add_argument('--processes', type=int, default=os.cpu_count())
+  parser.add_argument('--state', default=None, help='File recording completed jobs. Defaults to the manifest path + ".done".')
+  parser.add_argument('--rise-set-store', default=rise_set_store.DEFAULT_PATH, help='File storing rising and setting times across jobs and runs. An empty string means no store.')
+  args = parser.parse_args()
+  run(manifest_path=args.manifest, num_processes=args.processes, state_path=args.state, rise_set_store_path=args.rise_set_store or None)
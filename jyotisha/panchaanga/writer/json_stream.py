@@ -0,0 +1,99 @@
+"""
+Streaming JSON serialization of periodical panchaangas, one daily panchaanga at a time - so that consumers (eg. API clients) get the first days at once, and the JSON for the whole period is never held in memory.
+
+NDJSON output consists of a header line (the periodical panchaanga minus its days) followed by a line per day.
+"""
+import json
+
+from sanskrit_data import collection_helper
+
+from jyotisha.panchaanga.spatio_temporal import periodical
+from jyotisha.panchaanga.temporal import time, ComputationSystem
+from jyotisha.panchaanga.temporal.time import Date
+from jyotisha.util import default_if_none
+
+# Days computed at a time by iter_computed_days_ndjson.
+COMPUTATION_CHUNK_DAYS = 30
+
+
+def _dumps(json_map):
+  return json.dumps(json_map, sort_keys=True, ensure_ascii=False)
+
+
+def get_daily_json_map(daily_panchaanga):
+  """Without the city and computation system - which are in the header."""
+  (city, computation_system) = (daily_panchaanga.city, daily_panchaanga.computation_system)
+  daily_panchaanga.city = None
+  daily_panchaanga.computation_system = None
+  try:
+    return daily_panchaanga.to_json_map()
+  finally:
+    daily_panchaanga.city = city
+    daily_panchaanga.computation_system = computation_system
+
+
+def get_header_json_map(panchaanga):
+  date_str_to_panchaanga = panchaanga.date_str_to_panchaanga
+  panchaanga.date_str_to_panchaanga = None
+  panchaanga.festival_id_to_days = collection_helper.sets_to_lists(panchaanga.festival_id_to_days)
+  try:
+    return panchaanga.to_json_map()
+  finally:
+    panchaanga.festival_id_to_days = collection_helper.lists_to_sets(panchaanga.festival_id_to_days)
+    panchaanga.date_str_to_panchaanga = date_str_to_panchaanga
+
+
+def _get_daily_panchaangas(panchaanga, skip_padding_days):
+  return panchaanga.daily_panchaangas_sorted(skip_padding_days=skip_padding_days)
+
+
+def get_json_map(panchaanga, skip_padding_days=False):
+  """The whole panchaanga, as dumped by Panchaanga.dump_to_file - unlike Panchaanga.to_json_map, this is JSON-serializable."""
+  json_map = get_header_json_map(panchaanga=panchaanga)
+  json_map["date_str_to_panchaanga"] = {dp.date.get_date_str(): get_daily_json_map(daily_panchaanga=dp) for dp in _get_daily_panchaangas(panchaanga, skip_padding_days)}
+  return json_map
+
+
+def iter_ndjson(panchaanga, skip_padding_days=False):
+  yield _dumps(get_header_json_map(panchaanga=panchaanga)) + "\n"
+  for dp in _get_daily_panchaangas(panchaanga, skip_padding_days):
+    yield _dumps(get_daily_json_map(daily_panchaanga=dp)) + "\n"
+
+
+def iter_ndjson_from_json_map(json_map):
+  """Same as iter_ndjson, but from the output of get_json_map - say, a cached result."""
+  header_json_map = {key: value for key, value in json_map.items() if key != "date_str_to_panchaanga"}
+  yield _dumps(header_json_map) + "\n"
+  for date_str in sorted(json_map["date_str_to_panchaanga"]):
+    yield _dumps(json_map["date_str_to_panchaanga"][date_str]) + "\n"
+
+
+def iter_json(panchaanga, skip_padding_days=False):
+  """Chunks which together make up the JSON for get_json_map (without indentation)."""
+  header_json = _dumps(get_header_json_map(panchaanga=panchaanga))
+  yield header_json[:-1] + (', ' if header_json != "{}" else '') + '"date_str_to_panchaanga": {'
+  for index, dp in enumerate(_get_daily_panchaangas(panchaanga, skip_padding_days)):
+    yield (", " if index > 0 else "") + _dumps(dp.date.get_date_str()) + ": " + _dumps(get_daily_json_map(daily_panchaanga=dp))
+  yield "}}"
+
+
+def iter_computed_days_ndjson(city, start_date, end_date, computation_system=None):
+  """NDJSON for the given (inclusive) period, with each day emitted as soon as it is computed - rather than after the whole period is computed.
+
+  Festivals are absent, since assigning them needs the whole period (and beyond).
+  """
+  computation_system = default_if_none(computation_system, ComputationSystem.DEFAULT)
+  start_date = Date(*([int(x) for x in start_date.split('-')])) if isinstance(start_date, str) else start_date
+  end_date = Date(*([int(x) for x in end_date.split('-')])) if isinstance(end_date, str) else end_date
+  jd_start = time.utc_gregorian_to_jd(start_date)
+  num_days = int(time.utc_gregorian_to_jd(end_date) - jd_start) + 1
+  yield _dumps({"city": city.to_json_map(), "computation_system": computation_system.to_json_map(), "start_date": start_date.get_date_str(), "end_date": end_date.get_date_str()}) + "\n"
+  previous_day_panchaanga = None
+  for chunk_start in range(0, num_days, COMPUTATION_CHUNK_DAYS):
+    day_offsets = list(range(chunk_start, min(chunk_start + COMPUTATION_CHUNK_DAYS, num_days)))
+    daily_panchaangas = periodical.compute_daily_panchaangas(city=city, computation_system=computation_system, jd_start=jd_start, day_offsets=day_offsets, compute_lagnas=computation_system.festival_options.lagnas, previous_day_panchaanga=previous_day_panchaanga)
+    for dp in daily_panchaangas:
+      yield _dumps(get_daily_json_map(daily_panchaanga=dp)) + "\n"
+      # Lest the chain of previous days keep all days in memory.
+      dp._previous_day_panchaanga = None
+    previous_day_panchaanga = daily_panchaangas[-1]
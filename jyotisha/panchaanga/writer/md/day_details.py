@@ -240,15 +240,15 @@ def add_sun_moon_rise_info(daily_panchaanga, output_stream, script):
   print(f'|------|-----|-----|------|', file=output_stream)
   COLUMN_WIDTH = len("⬆03:08*")
   for body in [Graha.MOON] + Graha.PLANETS_REVERSE_ORDER:
-    rise_jd = daily_panchaanga.graha_rise_jd[body]
-    set_jd = daily_panchaanga.graha_set_jd[body]
-    rise_str = "⬆" + tz.julian_day_to_local_time(daily_panchaanga.graha_rise_jd[body]).get_hour_str(reference_date=daily_panchaanga.date)
+    rise_jd = daily_panchaanga.get_graha_rise_jd(body=body)
+    set_jd = daily_panchaanga.get_graha_set_jd(body=body)
+    rise_str = "⬆" + tz.julian_day_to_local_time(rise_jd).get_hour_str(reference_date=daily_panchaanga.date)
     rise_str = rise_str.ljust(COLUMN_WIDTH, " ")
-    set_str = "⬇" + tz.julian_day_to_local_time(daily_panchaanga.graha_set_jd[body]).get_hour_str(reference_date=daily_panchaanga.date)
+    set_str = "⬇" + tz.julian_day_to_local_time(set_jd).get_hour_str(reference_date=daily_panchaanga.date)
     set_str = set_str.ljust(COLUMN_WIDTH, " ")
-    if daily_panchaanga.graha_rise_jd[body] > daily_panchaanga.jd_next_sunrise:
+    if rise_jd > daily_panchaanga.jd_next_sunrise:
       rise_str = '---'
-    if daily_panchaanga.graha_set_jd[body] > daily_panchaanga.jd_next_sunrise:
+    if set_jd > daily_panchaanga.jd_next_sunrise:
       set_str = '---'
 
     body_final = translate_or_transliterate(text=names.NAMES["GRAHA_NAMES"]["sa"][body], script=script, source_script=sanscript.DEVANAGARI)
@@ -1,14 +1,24 @@
 import logging
+import os
+import threading
+import time
 
 import flask_restplus
-from flask import Blueprint
+from flask import Blueprint, Response, stream_with_context
 from flask_restplus import Resource
+from flask_restplus import inputs
 from flask_restplus import reqparse
-from jyotisha.panchaanga.spatio_temporal import City, daily, annual
+from jyotisha import util
+from jyotisha.panchaanga.spatio_temporal import City, daily, annual, periodical
+from jyotisha.panchaanga.temporal import ComputationSystem, era
 from jyotisha.panchaanga.temporal.body import Graha
+from jyotisha.panchaanga.temporal.festival import rules
 from jyotisha.panchaanga.temporal.time import Timezone, Date
+from jyotisha.panchaanga.temporal import zodiac
 from jyotisha.panchaanga.temporal.zodiac import NakshatraDivision, Ayanamsha
 from jyotisha.panchaanga.temporal.zodiac.angas import AngaType, Anga
+from jyotisha.panchaanga.writer import json_stream
+from jyotisha.rest_api.result_cache import ResultCache
 
 logging.basicConfig(
   level=logging.DEBUG,
@@ -27,6 +37,75 @@ api = flask_restplus.Api(app=api_blueprint, version='1.0', title='jyotisha panch
                          default_label=api_blueprint.name,
                          prefix=URL_PREFIX, doc='/docs')
 
+RESULT_CACHE_DIR = os.path.expanduser("~/.cache/jyotisha/api_results")
+# A burst of requests for the same city-year is served by a single computation.
+calendar_cache = ResultCache(cache_dir=RESULT_CACHE_DIR, num_processes=os.cpu_count())
+# Rule files are checked for changes at most this often.
+FESTIVALS_HASH_TTL_SECONDS = 60
+_festivals_hash_lock = threading.Lock()
+_festivals_hash_state = {"checked_at": None, "repos_fingerprint": None, "festivals_hash": None}
+# The festivals hash which the rules cached in this (possibly worker) process correspond to.
+_rules_festivals_hash = None
+
+
+def get_festivals_hash():
+  """Part of cache keys, so that results computed with outdated festival rules are not served.
+
+  The rule files are checked for changes (cheaply - see rules.get_repos_fingerprint) at most every FESTIVALS_HASH_TTL_SECONDS, and hashed afresh only if changed.
+  """
+  with _festivals_hash_lock:
+    now = time.time()
+    if _festivals_hash_state["checked_at"] is None or now - _festivals_hash_state["checked_at"] > FESTIVALS_HASH_TTL_SECONDS:
+      repos_fingerprint = rules.get_repos_fingerprint(repos=ComputationSystem.DEFAULT.festival_options.repos)
+      if repos_fingerprint != _festivals_hash_state["repos_fingerprint"]:
+        _festivals_hash_state["festivals_hash"] = annual.get_festivals_hash(computation_system=ComputationSystem.DEFAULT)
+        _festivals_hash_state["repos_fingerprint"] = repos_fingerprint
+      _festivals_hash_state["checked_at"] = now
+    return _festivals_hash_state["festivals_hash"]
+
+
+def _refresh_rules(festivals_hash):
+  """Drop rules cached by this process if they may predate festivals_hash - lest results keyed by the new hash be computed with old rules."""
+  global _rules_festivals_hash
+  if festivals_hash != _rules_festivals_hash:
+    rules.RulesCollection.get_cached.cache_clear()
+    _rules_festivals_hash = festivals_hash
+
+
+def get_projected_computation_system(fields):
+  """ComputationSystem.DEFAULT, computing only the given optional outputs (see ComputationSystem.OPTIONAL_OUTPUTS). None means all of them."""
+  if fields is None:
+    return ComputationSystem.DEFAULT
+  computation_system = util.shallow_copy(ComputationSystem.DEFAULT)
+  computation_system.needed_outputs = fields
+  return computation_system
+
+
+def get_civil_year_panchaanga(city, year, fields=None):
+  if fields is None and city.name != "":
+    return annual.get_panchaanga_for_civil_year(city=city, year=int(year))
+  # Not stored for reuse - the store is meant for full panchaangas, and names its files by city name alone (which locations given by coordinates, quantized or not, lack).
+  panchaanga = periodical.Panchaanga(city=city, start_date='%d-01-01' % int(year), end_date='%d-12-31' % int(year), year_type=era.ERA_GREGORIAN, computation_system=get_projected_computation_system(fields=fields))
+  panchaanga.year = int(year)
+  return panchaanga
+
+
+def compute_civil_year_calendar(city_name, latitude, longitude, timezone, year, fields=None, festivals_hash=None):
+  _refresh_rules(festivals_hash=festivals_hash)
+  city = City(city_name, latitude, longitude, timezone)
+  panchaanga = get_civil_year_panchaanga(city=city, year=year, fields=fields)
+  return json_stream.get_json_map(panchaanga=panchaanga)
+
+
+def parse_fields(fields_str):
+  if fields_str is None:
+    return None
+  fields = sorted(set(field.strip() for field in fields_str.split(",") if field.strip() != ""))
+  unknown_fields = [field for field in fields if field not in ComputationSystem.OPTIONAL_OUTPUTS]
+  if len(unknown_fields) > 0:
+    flask_restplus.abort(400, "Unknown fields: %s. Valid ones: %s" % (", ".join(unknown_fields), ", ".join(ComputationSystem.OPTIONAL_OUTPUTS)))
+  return fields
+
 
 # noinspection PyUnresolvedReferences
 @api.route('/calendars/coordinates/<string:latitude>/<string:longitude>/years/<string:year>')
@@ -36,14 +115,41 @@ class DailyCalendarHandler(Resource):
   get_parser = reqparse.RequestParser()
   get_parser.add_argument('timezone', type=str, default='Asia/Calcutta', help='Example: Asia/Calcutta', location='args',
                           required=True)
+  get_parser.add_argument('quantization', type=float, default=None, location='args',
+                          help='Snap the coordinates to a grid of this step (in degrees), so that nearby requests share cached results. With 0.01, sunrise times are within about 2 seconds of those for the exact location (up to 45 degrees latitude).')
+  get_parser.add_argument('snap_to_city', type=inputs.boolean, default=False, location='args',
+                          help='Serve results for the nearest known city (in the same timezone, within max_snap_distance_km) instead.')
+  get_parser.add_argument('max_snap_distance_km', type=float, default=25, location='args')
+  get_parser.add_argument('format', type=str, default='json', choices=('json', 'ndjson'), location='args',
+                          help='ndjson streams a header line followed by a line per day.')
+  get_parser.add_argument('stream_as_computed', type=inputs.boolean, default=False, location='args',
+                          help='With ndjson: emit each day as soon as it is computed (without festivals).')
+  get_parser.add_argument('fields', type=str, default=None, location='args',
+                          help='Comma separated optional outputs to compute (besides sunrise, angas and such, which are always computed) - of %s. Others are not computed at all. Default: all of them.' % ", ".join(ComputationSystem.OPTIONAL_OUTPUTS))
 
   @api.expect(get_parser)
   def get(self, latitude, longitude, year):
     args = self.get_parser.parse_args()
     city = City("", latitude, longitude, args['timezone'])
-    panchaanga = annual.get_panchaanga_for_civil_year(city=city, year=int(year))
-
-    return panchaanga.to_json_map()
+    nearest_city = None
+    if args['snap_to_city']:
+      nearest_city = City.get_nearest_city_from_db(latitude=city.latitude, longitude=city.longitude, max_distance_km=args['max_snap_distance_km'])
+    if nearest_city is not None and nearest_city.timezone == city.timezone:
+      city = nearest_city
+    elif args['quantization'] is not None and args['quantization'] > 0:
+      city = city.get_quantized(step=args['quantization'])
+    fields = parse_fields(fields_str=args['fields'])
+    if args['format'] == 'ndjson' and args['stream_as_computed']:
+      # Computed in this thread, outside the result cache - the point being to emit days before the year is done.
+      _refresh_rules(festivals_hash=get_festivals_hash())
+      lines = json_stream.iter_computed_days_ndjson(city=city, start_date='%d-01-01' % int(year), end_date='%d-12-31' % int(year), computation_system=get_projected_computation_system(fields=fields))
+      return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+    festivals_hash = get_festivals_hash()
+    key = ("civil_year", city.name, city.latitude, city.longitude, city.timezone, int(year), "DEFAULT", fields, festivals_hash)
+    json_map = calendar_cache.get(key, compute_civil_year_calendar, city.name, city.latitude, city.longitude, city.timezone, int(year), fields, festivals_hash)
+    if args['format'] == 'ndjson':
+      return Response(stream_with_context(json_stream.iter_ndjson_from_json_map(json_map=json_map)), mimetype='application/x-ndjson')
+    return json_map
 
 
 # noinspection PyUnresolvedReferences
@@ -72,9 +178,9 @@ class KaalaHandler(Resource):
   '/timezones/<string:timezone>/times/years/<int:year>/months/<int:month>/days/<int:day>/hours/<int:hour>/minutes/<int:minute>/seconds/<int:second>/bodies/<string:body>/<string:anga_type_str>')
 class DivisionFinder(Resource):
   def get(self, body_name, anga_type_str, timezone, year, month, day, hour, minute, second):
-    jd = Timezone(timezone).local_time_to_julian_day(Date(year, month, day, hour, minute, second))
+    jd = Timezone.get_cached(timezone).local_time_to_julian_day(Date(year, month, day, hour, minute, second))
     nd = NakshatraDivision(jd=jd, ayanaamsha_id=Ayanamsha.CHITRA_AT_180)
-    body = Graha(body_name=body_name)
+    body = Graha.singleton(body_name=body_name)
     anga_type = AngaType.NAKSHATRA
     if anga_type_str == AngaType.RASHI.name:
       anga_type = AngaType.RASHI
@@ -88,7 +194,7 @@ class DivisionFinder(Resource):
   '/timezones/<string:timezone>/times/years/<int:year>/months/<int:month>/days/<int:day>/hours/<int:hour>/minutes/<int:minute>/seconds/<int:second>/raashi')
 class RaashiFinder(Resource):
   def get(self, timezone, year, month, day, hour, minute, second):
-    jd = Timezone(timezone).local_time_to_julian_day(Date(year, month, day, hour, minute, second))
+    jd = Timezone.get_cached(timezone).local_time_to_julian_day(Date(year, month, day, hour, minute, second))
     from jyotisha.panchaanga import temporal
     raashi = NakshatraDivision(jd, ayanaamsha_id=Ayanamsha.CHITRA_AT_180).get_solar_raashi()
     logging.info(raashi)
@@ -96,6 +202,41 @@ class RaashiFinder(Resource):
     # return "haha"
 
 
+# noinspection PyUnresolvedReferences
+@api.route('/angas')
+class AngasFinder(Resource):
+  # In degrees - far finer than any anga boundary needs.
+  AYANAAMSHA_CURVE_TOLERANCE = 1e-5
+  get_parser = reqparse.RequestParser()
+  get_parser.add_argument('jds', type=str, default=None, location='args',
+                          help='Comma separated julian days (UT). Example: 2458884.5,2458884.75')
+  get_parser.add_argument('times', type=str, default=None, location='args',
+                          help='Comma separated local times, alternatively. Example: 2020-02-10T06:30:00,2020-02-10T18:00:00')
+  get_parser.add_argument('timezone', type=str, default='Asia/Calcutta', location='args', help='Timezone of the times.')
+  get_parser.add_argument('ayanaamsha_id', type=str, default=Ayanamsha.CHITRA_AT_180, location='args',
+                          choices=(Ayanamsha.CHITRA_AT_180, Ayanamsha.VERNAL_EQUINOX_AT_0, Ayanamsha.ASHVINI_STARTING_0, Ayanamsha.RASHTRIYA_PANCHANGA_NAKSHATRA_TRACKING))
+
+  @api.expect(get_parser)
+  def get(self):
+    """All angas (tithi, nakshatra, yoga etc.) at each of a batch of instants."""
+    args = self.get_parser.parse_args()
+    if args['jds'] is not None:
+      try:
+        jds = [float(jd) for jd in args['jds'].split(",")]
+      except ValueError:
+        flask_restplus.abort(400, "Bad jds: %s" % args['jds'])
+    elif args['times'] is not None:
+      timezone = Timezone.get_cached(args['timezone'])
+      try:
+        jds = [timezone.local_time_to_julian_day(Date.from_string(time_str.strip(), format='%Y-%m-%dT%H:%M:%S')) for time_str in args['times'].split(",")]
+      except ValueError:
+        flask_restplus.abort(400, "Bad times: %s" % args['times'])
+    else:
+      flask_restplus.abort(400, "Either jds or times is needed.")
+    all_angas = zodiac.get_all_angas_at_jds(jds=jds, ayanaamsha_id=args['ayanaamsha_id'], ayanaamsha_curve_tolerance=self.AYANAAMSHA_CURVE_TOLERANCE)
+    return [{"jd": jd, "angas": {anga_type_id: anga.index for anga_type_id, anga in angas.items()}} for jd, angas in zip(jds, all_angas)]
+
+
 # noinspection PyUnresolvedReferences
 @api.route(
   '/timezones/<string:timezone>/times/years/<int:year>/months/<int:month>/days/<int:day>/hours/<int:hour>/minutes/<int:minute>/seconds/<int:second>/bodies/<string:body>/raashi_transition_100_days')
@@ -0,0 +1,144 @@
+"""
+Caching of (JSON-able) API results - in memory and on disk - with concurrent identical requests coalesced into a single computation.
+
+Computations may run in a process pool, so that the server's request threads stay responsive rather than contending for the GIL.
+"""
+import collections
+import concurrent.futures
+import contextlib
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+
+
+class ResultCache(object):
+  def __init__(self, cache_dir=None, max_items_in_memory=32, num_processes=None, max_items_on_disk=2000):
+    """
+
+    :param cache_dir: Where results are stored on disk. None means no disk cache.
+    :param num_processes: Size of the process pool for computations. None means computation in the requesting thread.
+    :param max_items_on_disk: Beyond this, the least recently used results are removed from the disk cache - results keyed by superseded festival rules, for example.
+    """
+    self.cache_dir = cache_dir
+    self.max_items_in_memory = max_items_in_memory
+    self.max_items_on_disk = max_items_on_disk
+    self.num_processes = num_processes
+    self._memory_cache = collections.OrderedDict()
+    # Key to a future, for computations under way.
+    self._pending = {}
+    self._lock = threading.Lock()
+    self._executor = None
+
+  def _get_executor(self):
+    # Created on first use, lest merely importing the API start processes.
+    if self._executor is None:
+      self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.num_processes)
+    return self._executor
+
+  def _get_file_path(self, key_str):
+    return os.path.join(self.cache_dir, hashlib.sha256(key_str.encode("utf-8")).hexdigest()[:32] + ".json")
+
+  def _read_from_disk(self, key_str):
+    if self.cache_dir is None:
+      return None
+    file_path = self._get_file_path(key_str=key_str)
+    if not os.path.exists(file_path):
+      return None
+    try:
+      with open(file_path) as result_file:
+        result = json.load(result_file)
+      # The modification time marks the last use - see _prune_disk.
+      os.utime(file_path)
+      return result
+    except ValueError:
+      logging.warning("Ignoring corrupt cached result %s", file_path)
+      return None
+    except OSError:
+      # Say, removed by _prune_disk in another process meanwhile.
+      return None
+
+  def _write_to_disk(self, key_str, result):
+    if self.cache_dir is None:
+      return
+    os.makedirs(self.cache_dir, exist_ok=True)
+    file_path = self._get_file_path(key_str=key_str)
+    # Write and rename, so that readers never see a partial file.
+    tmp_path = "%s.%d.%d.tmp" % (file_path, os.getpid(), threading.get_ident())
+    try:
+      with open(tmp_path, "w") as result_file:
+        json.dump(result, result_file)
+    except Exception:
+      # Say, a result which is not JSON-serializable.
+      with contextlib.suppress(FileNotFoundError):
+        os.remove(tmp_path)
+      raise
+    os.replace(tmp_path, file_path)
+    self._prune_disk()
+
+  def _prune_disk(self):
+    file_paths = glob.glob(os.path.join(self.cache_dir, "*.json"))
+    if len(file_paths) <= self.max_items_on_disk:
+      return
+    def get_mtime(file_path):
+      try:
+        return os.path.getmtime(file_path)
+      except OSError:
+        return 0
+    for file_path in sorted(file_paths, key=get_mtime)[:len(file_paths) - self.max_items_on_disk]:
+      with contextlib.suppress(FileNotFoundError):
+        os.remove(file_path)
+
+  def _compute(self, compute_fn, args):
+    if self.num_processes is None:
+      return compute_fn(*args)
+    return self._get_executor().submit(compute_fn, *args).result()
+
+  def get(self, key, compute_fn, *args):
+    """Result of compute_fn(*args), which is identified by key (a JSON-able tuple).
+
+    compute_fn must be picklable (ie. a module-level function) if a process pool is used.
+    """
+    key_str = json.dumps(key)
+    with self._lock:
+      if key_str in self._memory_cache:
+        self._memory_cache.move_to_end(key_str)
+        return self._memory_cache[key_str]
+      future = self._pending.get(key_str, None)
+      is_owner = future is None
+      if is_owner:
+        future = concurrent.futures.Future()
+        self._pending[key_str] = future
+
+    if not is_owner:
+      return future.result()
+
+    result = None
+    try:
+      result = self._read_from_disk(key_str=key_str)
+      if result is None:
+        result = self._compute(compute_fn=compute_fn, args=args)
+        try:
+          self._write_to_disk(key_str=key_str, result=result)
+        except OSError:
+          # The result is good all the same.
+          logging.exception("Could not store result for %s on disk", key_str)
+    except Exception as e:
+      with self._lock:
+        del self._pending[key_str]
+      future.set_exception(e)
+      raise
+    with self._lock:
+      self._memory_cache[key_str] = result
+      while len(self._memory_cache) > self.max_items_in_memory:
+        self._memory_cache.popitem(last=False)
+      del self._pending[key_str]
+    future.set_result(result)
+    return result
+
+  def shutdown(self):
+    if self._executor is not None:
+      self._executor.shutdown()
+      self._executor = None
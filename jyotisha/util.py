@@ -1,5 +1,46 @@
+import io
+import pickle
+
+from sanskrit_data.schema import common
+
+
 def zero_if_none(x):
   return default_if_none(x=x, default=0)
 
 def default_if_none(x, default):
   return default if x is None else x
+
+
+def _new_object(cls):
+  return cls.__new__(cls)
+
+
+def _set_object_state(obj, state):
+  obj.__dict__.update(state)
+  return obj
+
+
+def _get_object_state(obj):
+  # methodtools keeps per-instance caches in the instance dict (under "__wire|" keys). They are dropped.
+  return {key: value for key, value in obj.__dict__.items() if not key.startswith("__wire|")}
+
+
+def shallow_copy(obj):
+  """copy.copy for JsonObjects - which copy.copy cannot handle (see JsonObjectPickler), and which deepcopy handles slowly (via json)."""
+  return _set_object_state(_new_object(type(obj)), _get_object_state(obj))
+
+
+class JsonObjectPickler(pickle.Pickler):
+  """Plainly pickled JsonObjects fail to load, since JsonObject.__getattr__ offers None for __setstate__. Hence this pickler."""
+
+  def reducer_override(self, obj):
+    if isinstance(obj, common.JsonObject):
+      return (_new_object, (type(obj),), _get_object_state(obj), None, None, _set_object_state)
+    return NotImplemented
+
+
+def pickle_dumps(obj):
+  """Pickle obj (which may contain JsonObjects). Load the result with pickle.loads."""
+  stream = io.BytesIO()
+  JsonObjectPickler(stream, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+  return stream.getvalue()
@@ -0,0 +1,4 @@
+import os
+
+# Tests do not store rules snapshots in the home directory. See rules.RulesCollection.load.
+os.environ.setdefault("JYOTISHA_RULES_SNAPSHOT_DIR", "")
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from jyotisha.rest_api.result_cache import ResultCache
+
+computation_count = 0
+
+
+def slow_square(x):
+  global computation_count
+  computation_count += 1
+  time.sleep(0.2)
+  return {"square": x * x}
+
+
+def test_coalescing_and_caching(tmp_path):
+  global computation_count
+  computation_count = 0
+  cache = ResultCache(cache_dir=str(tmp_path), max_items_in_memory=1)
+  results = []
+  threads = [threading.Thread(target=lambda: results.append(cache.get(("square", 3), slow_square, 3))) for _ in range(5)]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  assert results == [{"square": 9}] * 5
+  assert computation_count == 1
+
+  # Evicts the first result from memory; it must then be read back from disk.
+  assert cache.get(("square", 4), slow_square, 4) == {"square": 16}
+  assert cache.get(("square", 3), slow_square, 3) == {"square": 9}
+  assert computation_count == 2
+  assert ResultCache(cache_dir=str(tmp_path)).get(("square", 4), slow_square, 4) == {"square": 16}
+  assert computation_count == 2
+
+
+def test_unserializable_result(tmp_path):
+  cache = ResultCache(cache_dir=str(tmp_path))
+  with pytest.raises(TypeError):
+    cache.get(("set",), set, [1, 2])
+  assert list(tmp_path.iterdir()) == []
+
+
+def test_unwritable_cache_dir(tmp_path):
+  global computation_count
+  computation_count = 0
+  not_a_dir = tmp_path / "file"
+  not_a_dir.write_text("")
+  cache = ResultCache(cache_dir=str(not_a_dir / "cache"))
+  assert cache.get(("square", 3), slow_square, 3) == {"square": 9}
+  assert cache.get(("square", 3), slow_square, 3) == {"square": 9}
+  assert computation_count == 1
+
+
+def test_max_items_on_disk(tmp_path):
+  cache = ResultCache(cache_dir=str(tmp_path), max_items_in_memory=1, max_items_on_disk=2)
+  for x in range(4):
+    cache.get(("square", x), slow_square, x)
+    # Distinct modification times.
+    time.sleep(0.01)
+  assert len(list(tmp_path.iterdir())) == 2
+  global computation_count
+  computation_count = 0
+  # The most recent results stay.
+  assert ResultCache(cache_dir=str(tmp_path)).get(("square", 3), slow_square, 3) == {"square": 9}
+  assert computation_count == 0
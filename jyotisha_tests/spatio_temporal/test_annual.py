@@ -5,7 +5,7 @@ import os
 from sanskrit_data import testing
 from timebudget import timebudget
 
-from jyotisha.panchaanga.spatio_temporal import City, annual
+from jyotisha.panchaanga.spatio_temporal import City, annual, periodical
 from jyotisha.panchaanga.temporal import ComputationSystem
 from jyotisha_tests.spatio_temporal import chennai
 
@@ -98,3 +98,40 @@ def test_orinda_ca_dst_2019():
   # We use the index 70 below as the annual panchaanga object seems to use the index d + 1.
   assert round(panchaanga.daily_panchaangas_sorted()[panchaanga.duration_prior_padding + 69].jd_sunrise,
                ndigits=4) == round(2458554.104348237, ndigits=4)  # 2019-Mar-10 07:30:15.68
+
+
+def test_festival_layer_reuse(tmp_path):
+  test_computation_system = ComputationSystem.read_from_file(filename=os.path.join(TEST_DATA_PATH, "test_computation_system.toml"))
+  expected_content_path = os.path.join(TEST_DATA_PATH, '%s-%d.json' % (chennai.name, 2019))
+  annual.get_panchaanga_for_civil_year(city=chennai, year=2019, precomputed_json_dir=str(tmp_path), computation_system=test_computation_system, allow_precomputed=False)
+  festival_file_paths = list(tmp_path.glob("*__festivals_*.json"))
+  assert len(festival_file_paths) == 1
+
+  # Both layers are loaded.
+  panchaanga = annual.get_panchaanga_for_civil_year(city=chennai, year=2019, precomputed_json_dir=str(tmp_path), computation_system=test_computation_system)
+  testing.json_compare(actual_object=panchaanga, expected_content_path=expected_content_path)
+
+  # Only festivals are recomputed - as after a rules change, which leaves a layer with another hash behind.
+  stale_file_path = festival_file_paths[0].with_name(festival_file_paths[0].name.replace("__festivals_", "__festivals_stale"))
+  festival_file_paths[0].rename(stale_file_path)
+  panchaanga = annual.get_panchaanga_for_civil_year(city=chennai, year=2019, precomputed_json_dir=str(tmp_path), computation_system=test_computation_system)
+  testing.json_compare(actual_object=panchaanga, expected_content_path=expected_content_path)
+  assert list(tmp_path.glob("*__festivals_*.json")) == festival_file_paths
+
+
+def test_projected_panchaanga_not_stored(tmp_path):
+  computation_system = ComputationSystem.read_from_file(filename=os.path.join(TEST_DATA_PATH, "test_computation_system.toml"))
+  computation_system.needed_outputs = ["festival_id_to_instance"]
+  compute_astronomy_fn = lambda: periodical.Panchaanga(city=chennai, start_date='2019-02-01', end_date='2019-02-05', computation_system=computation_system, recompute_festivals=False)
+  panchaanga = annual.get_panchaanga_with_festivals(fname=str(tmp_path / "chennai.json"), compute_astronomy_fn=compute_astronomy_fn, computation_system=computation_system)
+  assert len(panchaanga.festival_id_to_days) > 0
+  assert list(tmp_path.iterdir()) == []
+
+
+def test_get_festivals_hash():
+  repos = ComputationSystem.DEFAULT.festival_options.repos
+  festivals_hash = annual.get_festivals_hash(computation_system=ComputationSystem.DEFAULT)
+  # The (shared) computation system is left alone.
+  assert ComputationSystem.DEFAULT.festival_options.repos is repos
+  assert annual.get_festivals_hash(computation_system=ComputationSystem.DEFAULT) == festivals_hash
+  assert annual.get_festivals_hash(computation_system=ComputationSystem.DEFAULT, compute_shraadha_tithis=True) != festivals_hash
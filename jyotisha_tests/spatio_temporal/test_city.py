@@ -6,3 +6,56 @@ def test_moonrise_time():
   city = City.get_city_from_db(name="Bangalore")
   from jyotisha.panchaanga.temporal.body import Graha
   numpy.testing.assert_approx_equal(city.get_rising_time(julian_day_start=2459107.33, body=Graha.MOON), 2459107.4297038973)
+
+
+def test_rising_times():
+  city = City.get_city_from_db(name="Bangalore")
+  from jyotisha.panchaanga.temporal.body import Graha
+  moonrise_jds = city.get_rising_times(jd_start=2459107.33, jd_end=2459137.33, body=Graha.MOON)
+  numpy.testing.assert_approx_equal(moonrise_jds[0], 2459107.4297038973)
+  # The moon rises about 50 minutes later each day, and so skips a day each month.
+  assert len(moonrise_jds) == 29
+  for jd in moonrise_jds[1:]:
+    numpy.testing.assert_approx_equal(jd, city.get_rising_time(julian_day_start=jd - 0.5, body=Graha.MOON))
+
+
+def test_rise_set_times():
+  from jyotisha.panchaanga.spatio_temporal import RiseSetTimes
+  from jyotisha.panchaanga.temporal.body import Graha
+  city = City.get_city_from_db(name="Bangalore")
+  rise_set_times = RiseSetTimes(city=city, jd_start=2459107.33, jd_end=2459117.33, bodies=[Graha.SUN, Graha.RAHU, Graha.KETU])
+  for jd in [2459108.1, 2459112.7]:
+    for body in [Graha.SUN, Graha.KETU]:
+      numpy.testing.assert_approx_equal(rise_set_times.get_rising_time(julian_day_start=jd, body=body), city.get_rising_time(julian_day_start=jd, body=body))
+      numpy.testing.assert_approx_equal(rise_set_times.get_setting_time(julian_day_start=jd, body=body), city.get_setting_time(julian_day_start=jd, body=body))
+  # Beyond the covered period
+  assert rise_set_times.get_rising_time(julian_day_start=2459117.4, body=Graha.SUN) is None
+  assert rise_set_times.get_rising_time(julian_day_start=2459108.1, body=Graha.MOON) is None
+
+
+def test_sunset_times():
+  from jyotisha.panchaanga.spatio_temporal import SunsetTimes
+  city = City.get_city_from_db(name="Bangalore")
+  sunset_times = SunsetTimes(city=city, jd_start=2459070.33, jd_end=2459117.33)
+  for (jd_start, jd_end) in [(2459080.2, 2459108.1), (2459090.6, 2459090.7), (2459070.4, 2459117.3)]:
+    assert sunset_times.get_num_sunsets_in_period(jd_start=jd_start, jd_end=jd_end) == len(city.get_sunsets_in_period(jd_start=jd_start, jd_end=jd_end))
+  cached_sunset_times = SunsetTimes.get_cached(city=city, jd_start=2459080.2, jd_end=2459108.1)
+  assert cached_sunset_times.get_num_sunsets_in_period(jd_start=2459080.2, jd_end=2459108.1) == sunset_times.get_num_sunsets_in_period(jd_start=2459080.2, jd_end=2459108.1)
+  assert SunsetTimes.get_cached(city=city, jd_start=2459080.2, jd_end=2459108.1) is cached_sunset_times
+  # Longer than the cached blocks cover.
+  assert SunsetTimes.get_cached(city=city, jd_start=2459000.2, jd_end=2459108.1) is None
+
+
+def test_nearest_city():
+  city = City.get_city_from_db(name="Chennai")
+  nearest_city = City.get_nearest_city_from_db(latitude=city.latitude + 0.01, longitude=city.longitude - 0.01)
+  assert nearest_city.latitude == city.latitude and nearest_city.longitude == city.longitude
+  assert City.get_nearest_city_from_db(latitude=0, longitude=-30, max_distance_km=100) is None
+
+
+def test_quantized():
+  from jyotisha.panchaanga.temporal.body import Graha
+  city = City("", 12.9734, 77.5912, "Asia/Calcutta")
+  quantized_city = city.get_quantized(step=0.01)
+  assert (quantized_city.latitude, quantized_city.longitude) == (12.97, 77.59)
+  assert abs(quantized_city.get_rising_time(julian_day_start=2459107.33, body=Graha.SUN) - city.get_rising_time(julian_day_start=2459107.33, body=Graha.SUN)) * 86400 < 2
@@ -0,0 +1,41 @@
+import logging
+import os
+
+from jyotisha.panchaanga.spatio_temporal import periodical, columnar
+from jyotisha.panchaanga.temporal import ComputationSystem
+from jyotisha_tests.spatio_temporal import chennai
+
+logging.basicConfig(
+  level=logging.DEBUG,
+  format="%(levelname)s: %(asctime)s {%(filename)s:%(lineno)d}: %(message)s "
+)
+
+TEST_DATA_PATH = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def test_round_trip(tmp_path):
+  computation_system = ComputationSystem.read_from_file(filename=os.path.join(TEST_DATA_PATH, "test_computation_system.toml"))
+  panchaanga = periodical.Panchaanga(city=chennai, start_date='2019-02-01', end_date='2019-02-20', computation_system=computation_system)
+  panchaanga.dump_to_file(filename=str(tmp_path / "expected.json"))
+  columnar.dump(panchaanga=panchaanga, dir_path=str(tmp_path / "store"))
+  with open(str(tmp_path / "expected.json")) as expected_file:
+    expected_content = expected_file.read()
+
+  store = columnar.load(dir_path=str(tmp_path / "store"))
+  assert store.get_column(path=("jd_sunrise",)).shape == (len(panchaanga.date_str_to_panchaanga),)
+  store.dump_json(filename=str(tmp_path / "exported.json"))
+  with open(str(tmp_path / "exported.json")) as exported_file:
+    assert exported_file.read() == expected_content
+
+  # Replacing a store leaves readers of the old one unaffected.
+  columnar.dump(panchaanga=panchaanga, dir_path=str(tmp_path / "store"))
+  assert sorted(path.name for path in tmp_path.iterdir()) == ["expected.json", "exported.json", "store"]
+  store.dump_json(filename=str(tmp_path / "exported.json"))
+  with open(str(tmp_path / "exported.json")) as exported_file:
+    assert exported_file.read() == expected_content
+
+  loaded_panchaanga = columnar.load(dir_path=str(tmp_path / "store")).get_panchaanga()
+  loaded_panchaanga.dump_to_file(filename=str(tmp_path / "loaded.json"))
+  with open(str(tmp_path / "loaded.json")) as loaded_file:
+    assert loaded_file.read() == expected_content
+  assert loaded_panchaanga.date_str_to_panchaanga["2019-02-08"].city == chennai
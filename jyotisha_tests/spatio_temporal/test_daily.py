@@ -78,6 +78,19 @@ def test_sunrise_mtv():
   numpy.testing.assert_approx_equal(panchaanga.jd_sunrise, 2458434.11)
 
 
+def test_lazy_graha_rise_set():
+  from jyotisha.panchaanga.temporal import ComputationSystem
+  from jyotisha.panchaanga.temporal.body import Graha
+  city = City.get_city_from_db('Bangalore')
+  computation_system = ComputationSystem(lunar_month_assigner_type=ComputationSystem.DEFAULT.lunar_month_assigner_type, ayanaamsha_id=ComputationSystem.DEFAULT.ayanaamsha_id, needed_outputs=[])
+  panchaanga = daily.DailyPanchaanga(city=city, date=Date(year=2019, month=9, day=10), computation_system=computation_system)
+  assert Graha.SATURN not in panchaanga.graha_rise_jd
+  eager_panchaanga = daily.DailyPanchaanga(city=city, date=Date(year=2019, month=9, day=10))
+  for body in [Graha.MOON, Graha.SATURN, Graha.KETU]:
+    assert panchaanga.get_graha_rise_jd(body=body) == eager_panchaanga.graha_rise_jd[body]
+    assert panchaanga.get_graha_set_jd(body=body) == eager_panchaanga.graha_set_jd[body]
+  assert Graha.SATURN in panchaanga.graha_rise_jd
+
 def test_tb_muhuurta_blr():
   city = City.get_city_from_db('Bangalore')   
   panchaanga = daily.DailyPanchaanga(city=city, date=Date(year=2019, month=9, day=10))
@@ -162,3 +175,16 @@ def test_get_samvatsara():
   assert panchaanga.get_samvatsara(month_type=RulesRepo.SIDEREAL_SOLAR_MONTH_DIR).get_name(script=sanscript.DEVANAGARI) == "विकारी"
   panchaanga = daily.DailyPanchaanga(city=city, date=Date(year=2020, month=4, day=20))
   assert panchaanga.get_samvatsara(month_type=RulesRepo.SIDEREAL_SOLAR_MONTH_DIR).get_name(script=sanscript.DEVANAGARI) == "शार्वरी"
+
+
+def test_lagna_data():
+  from jyotisha.panchaanga.spatio_temporal import periodical
+  from jyotisha.panchaanga.temporal import ComputationSystem
+  from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
+  city = City.get_city_from_db('Chennai')
+  # Lagna changes of later days are estimated from those of the previous days.
+  daily_panchaangas = periodical.compute_daily_panchaangas(city=city, computation_system=ComputationSystem.DEFAULT, jd_start=time.utc_gregorian_to_jd(Date(2020, 3, 5)), day_offsets=list(range(4)), compute_lagnas=True)
+  for panchaanga in daily_panchaangas:
+    expected_lagna_data = panchaanga._get_lagna_data_by_bracketing(ayanaamsha_id=Ayanamsha.CHITRA_AT_180)
+    assert [lagna for (lagna, _) in panchaanga.lagna_data] == [lagna for (lagna, _) in expected_lagna_data]
+    numpy.testing.assert_allclose([jd for (_, jd) in panchaanga.lagna_data], [jd for (_, jd) in expected_lagna_data], atol=1e-8)
@@ -0,0 +1,112 @@
+import logging
+import os
+
+import pytest
+
+from jyotisha.panchaanga.spatio_temporal import periodical
+from jyotisha.panchaanga.temporal import ComputationSystem, AngaType, interval, zodiac
+from jyotisha_tests.spatio_temporal import chennai
+
+logging.basicConfig(
+  level=logging.DEBUG,
+  format="%(levelname)s: %(asctime)s {%(filename)s:%(lineno)d}: %(message)s "
+)
+
+TEST_DATA_PATH = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def test_parallel_compute_angas():
+  computation_system = ComputationSystem.read_from_file(filename=os.path.join(TEST_DATA_PATH, "test_computation_system.toml"))
+  computation_system.festival_options.no_fests = True
+  serial_panchaanga = periodical.Panchaanga(city=chennai, start_date='2019-02-01', end_date='2019-02-28', computation_system=computation_system)
+  parallel_panchaanga = periodical.Panchaanga(city=chennai, start_date='2019-02-01', end_date='2019-02-28', computation_system=computation_system, num_processes=3)
+  assert sorted(parallel_panchaanga.date_str_to_panchaanga.keys()) == sorted(serial_panchaanga.date_str_to_panchaanga.keys())
+  assert periodical._json_maps_agree(parallel_panchaanga.to_json_map(), serial_panchaanga.to_json_map())
+  daily_panchaangas = parallel_panchaanga.daily_panchaangas_sorted()
+  for previous_day_panchaanga, daily_panchaanga in zip(daily_panchaangas, daily_panchaangas[1:]):
+    assert daily_panchaanga._previous_day_panchaanga is previous_day_panchaanga
+
+
+def test_anga_span_index():
+  computation_system = ComputationSystem.read_from_file(filename=os.path.join(TEST_DATA_PATH, "test_computation_system.toml"))
+  computation_system.festival_options.no_fests = True
+  panchaanga = periodical.Panchaanga(city=chennai, start_date='2019-02-01', end_date='2019-02-10', computation_system=computation_system)
+  for anga_type in [AngaType.TITHI, AngaType.NAKSHATRA, AngaType.YOGA]:
+    span_index = panchaanga.get_anga_span_index(anga_type=anga_type)
+    for dp in panchaanga.daily_panchaangas_sorted():
+      for jd in [dp.jd_sunrise, dp.jd_sunset, (dp.jd_sunrise + dp.jd_sunset) / 2]:
+        assert panchaanga.get_anga_at_jd(jd=jd, anga_type=anga_type) == dp.sunrise_day_angas.get_anga_at_jd(jd=jd, anga_type=anga_type)
+      day_spans = dp.sunrise_day_angas.get_anga_spans_in_interval(anga_type=anga_type, interval=interval.Interval(jd_start=dp.jd_sunrise, jd_end=dp.jd_next_sunrise))
+      assert [span.anga for span in span_index.get_spans_in_interval(jd_start=dp.jd_sunrise, jd_end=dp.jd_next_sunrise)] == [span.anga for span in day_spans]
+
+    # Built from the period's timeline - the same as from the daily span lists.
+    expected_span_index = zodiac.AngaSpanIndex.from_span_lists(span_lists=[dp.sunrise_day_angas.get_angas_with_ends(anga_type=anga_type) for dp in panchaanga.daily_panchaangas_sorted()])
+    assert (span_index.angas, span_index.boundaries) == (expected_span_index.angas, expected_span_index.boundaries)
+
+  tithi_index = panchaanga.get_anga_span_index(anga_type=AngaType.TITHI)
+  dp = panchaanga.daily_panchaanga_for_date(date=panchaanga.start_date)
+  next_span = tithi_index.get_next_span(anga=dp.sunrise_day_angas.tithi_at_sunrise + 2, jd=dp.jd_sunrise)
+  assert next_span.anga == dp.sunrise_day_angas.tithi_at_sunrise + 2
+  assert dp.jd_sunrise < next_span.jd_start < next_span.jd_end < dp.jd_sunrise + 3
+
+
+def test_find_days():
+  computation_system = ComputationSystem.read_from_file(filename=os.path.join(TEST_DATA_PATH, "test_computation_system.toml"))
+  computation_system.festival_options.no_fests = True
+  panchaanga = periodical.Panchaanga(city=chennai, start_date='2019-02-01', end_date='2019-03-31', computation_system=computation_system)
+  daily_panchaangas = panchaanga.daily_panchaangas_sorted()
+  core_days = range(panchaanga.duration_prior_padding, panchaanga.duration + panchaanga.duration_prior_padding)
+  expected_days = [d for d in core_days if daily_panchaangas[d].date.get_weekday() == 2 and daily_panchaangas[d].sunrise_day_angas.tithi_at_sunrise.index % 15 < 8]
+  assert len(expected_days) > 0
+  assert panchaanga.find_days(weekday=2, tithi_at_sunrise=lambda tithis: tithis % 15 < 8) == expected_days
+  expected_days = [d for d in core_days if daily_panchaangas[d].lunar_date.month.index == 12 and daily_panchaangas[d].sunrise_day_angas.nakshatra_at_sunrise.index in [1, 2, 3]]
+  assert panchaanga.find_days(lunar_month=12, nakshatra_at_sunrise=[1, 2, 3]) == expected_days
+  assert len(panchaanga.find_days(skip_padding_days=False)) == len(daily_panchaangas)
+
+
+def test_advance():
+  computation_system = ComputationSystem.read_from_file(filename=os.path.join(TEST_DATA_PATH, "test_computation_system.toml"))
+  panchaanga = periodical.Panchaanga(city=chennai, start_date='2019-02-01', end_date='2019-02-10', computation_system=computation_system)
+  panchaanga.advance(num_days=3)
+  expected_panchaanga = periodical.Panchaanga(city=chennai, start_date='2019-02-04', end_date='2019-02-13', computation_system=computation_system)
+  assert panchaanga.start_date == expected_panchaanga.start_date
+  assert sorted(panchaanga.date_str_to_panchaanga.keys()) == sorted(expected_panchaanga.date_str_to_panchaanga.keys())
+  assert periodical._json_maps_agree(panchaanga.to_json_map(), expected_panchaanga.to_json_map())
+  for num_days in [0, -1]:
+    with pytest.raises(ValueError):
+      panchaanga.advance(num_days=num_days)
+  assert panchaanga.start_date == expected_panchaanga.start_date
+
+
+def test_advance_keeps_longitude_tables():
+  computation_system = ComputationSystem.read_from_file(filename=os.path.join(TEST_DATA_PATH, "test_computation_system.toml"))
+  computation_system.longitude_table_tolerance = 1e-6
+  computation_system.ayanaamsha_curve_tolerance = 1e-6
+  panchaanga = periodical.Panchaanga(city=chennai, start_date='2019-02-01', end_date='2019-02-10', computation_system=computation_system, recompute_festivals=False)
+  panchaanga.advance(num_days=1, recompute_festivals=False)
+  longitude_tables = panchaanga.get_longitude_tables()
+  ayanaamsha_curves = panchaanga.get_ayanaamsha_curves()
+  panchaanga.advance(num_days=1, recompute_festivals=False)
+  assert panchaanga.get_longitude_tables() is longitude_tables
+  assert panchaanga.get_ayanaamsha_curves() is ayanaamsha_curves
+  # Refitted once the period goes beyond them.
+  panchaanga.advance(num_days=periodical.Panchaanga.ADVANCE_HEADROOM_DAYS + 1, recompute_festivals=False)
+  assert panchaanga.get_longitude_tables() is not longitude_tables
+  expected_panchaanga = periodical.Panchaanga(city=chennai, start_date=panchaanga.start_date, end_date=panchaanga.end_date, computation_system=computation_system, recompute_festivals=False)
+  assert periodical._json_maps_agree(panchaanga.to_json_map(), expected_panchaanga.to_json_map())
+
+
+def test_needed_outputs():
+  computation_system = ComputationSystem.read_from_file(filename=os.path.join(TEST_DATA_PATH, "test_computation_system.toml"))
+  full_panchaanga = periodical.Panchaanga(city=chennai, start_date='2019-02-01', end_date='2019-02-10', computation_system=computation_system)
+  computation_system.needed_outputs = []
+  panchaanga = periodical.Panchaanga(city=chennai, start_date='2019-02-01', end_date='2019-02-10', computation_system=computation_system)
+  assert len(panchaanga.festival_id_to_days) == 0
+  for dp in panchaanga.daily_panchaangas_sorted():
+    full_dp = full_panchaanga.date_str_to_panchaanga[dp.date.get_date_str()]
+    assert dp.mauDhyas is None and dp.amauDhyas is None
+    assert dp.sunrise_day_angas.graha_raashis_with_ends == {}
+    assert dp.festival_id_to_instance == {}
+    assert dp.jd_sunrise == full_dp.jd_sunrise
+    assert dp.sunrise_day_angas.tithis_with_ends == full_dp.sunrise_day_angas.tithis_with_ends
+    assert dp.lunar_date == full_dp.lunar_date
@@ -0,0 +1,84 @@
+import concurrent.futures
+
+import numpy
+
+from jyotisha.panchaanga.spatio_temporal import City, rise_set_store
+from jyotisha.panchaanga.temporal.body import Graha
+
+
+def test_get_event_time(tmp_path):
+  city = City.get_city_from_db(name="Bangalore")
+  path = str(tmp_path / "rise_set.sqlite")
+  jds = [2459107.33 + offset for offset in range(5)]
+  expected = [(city.get_rising_time(julian_day_start=jd, body=Graha.SUN), city.get_setting_time(julian_day_start=jd, body=Graha.MOON)) for jd in jds]
+
+  with rise_set_store.store_in_use(rise_set_store.RiseSetStore(path=path)) as store:
+    assert [(city.get_rising_time(julian_day_start=jd, body=Graha.SUN), city.get_setting_time(julian_day_start=jd, body=Graha.MOON)) for jd in jds] == expected
+  store.close()
+  assert rise_set_store.get_store() is None
+
+  # A fresh store on the same file serves the stored times, without computing them.
+  store = rise_set_store.RiseSetStore(path=path)
+  def compute_fn():
+    raise AssertionError("Recomputed a stored time")
+  for jd, (jd_sunrise, _) in zip(jds, expected):
+    assert store.get_event_time(latitude=city.latitude, longitude=city.longitude, body=Graha.SUN, event=rise_set_store.EVENT_RISE, jd_start=jd, compute_fn=compute_fn) == jd_sunrise
+  store.close()
+
+
+def test_evict(tmp_path):
+  store = rise_set_store.RiseSetStore(path=str(tmp_path / "rise_set.sqlite"), max_entries=3)
+  for latitude in [10.0, 20.0]:
+    for jd in [2459107.33, 2459108.33]:
+      store.get_event_time(latitude=latitude, longitude=77.0, body=Graha.SUN, event=rise_set_store.EVENT_RISE, jd_start=jd, compute_fn=lambda: jd + 0.5)
+    store.flush()
+  # The least recently used city went.
+  assert store.get_event_time(latitude=20.0, longitude=77.0, body=Graha.SUN, event=rise_set_store.EVENT_RISE, jd_start=2459107.33, compute_fn=lambda: None) == 2459107.83
+  numpy.testing.assert_equal(store.get_event_time(latitude=10.0, longitude=77.0, body=Graha.SUN, event=rise_set_store.EVENT_RISE, jd_start=2459107.33, compute_fn=lambda: -1.0), -1.0)
+  store.close()
+
+
+def test_get_event_time_stored_by_another_store(tmp_path):
+  path = str(tmp_path / "rise_set.sqlite")
+  store_1 = rise_set_store.RiseSetStore(path=path)
+  store_2 = rise_set_store.RiseSetStore(path=path)
+  assert store_1.get_event_time(latitude=10.0, longitude=77.0, body=Graha.SUN, event=rise_set_store.EVENT_RISE, jd_start=2459107.33, compute_fn=lambda: 2459107.83) == 2459107.83
+  store_2.get_event_time(latitude=10.0, longitude=77.0, body=Graha.SUN, event=rise_set_store.EVENT_RISE, jd_start=2459108.33, compute_fn=lambda: 2459108.83)
+  store_2.flush()
+  def compute_fn():
+    raise AssertionError("Recomputed a stored time")
+  assert store_1.get_event_time(latitude=10.0, longitude=77.0, body=Graha.SUN, event=rise_set_store.EVENT_RISE, jd_start=2459108.33, compute_fn=compute_fn) == 2459108.83
+  store_1.close()
+  store_2.close()
+
+
+def test_evict_recently_used(tmp_path):
+  store = rise_set_store.RiseSetStore(path=str(tmp_path / "rise_set.sqlite"), max_entries=3)
+  for (latitude, jds) in [(10.0, [2459107.33, 2459108.33]), (20.0, [2459107.33])]:
+    for jd in jds:
+      store.get_event_time(latitude=latitude, longitude=77.0, body=Graha.SUN, event=rise_set_store.EVENT_RISE, jd_start=jd, compute_fn=lambda: jd + 0.5)
+    store.flush()
+  # Using the first city again keeps it over the second.
+  store.get_event_time(latitude=10.0, longitude=77.0, body=Graha.SUN, event=rise_set_store.EVENT_RISE, jd_start=2459107.33, compute_fn=lambda: None)
+  store.get_event_time(latitude=30.0, longitude=77.0, body=Graha.SUN, event=rise_set_store.EVENT_RISE, jd_start=2459107.33, compute_fn=lambda: 2459107.83)
+  store.flush()
+  assert store.get_event_time(latitude=10.0, longitude=77.0, body=Graha.SUN, event=rise_set_store.EVENT_RISE, jd_start=2459108.33, compute_fn=lambda: None) == 2459108.83
+  numpy.testing.assert_equal(store.get_event_time(latitude=20.0, longitude=77.0, body=Graha.SUN, event=rise_set_store.EVENT_RISE, jd_start=2459107.33, compute_fn=lambda: -1.0), -1.0)
+  store.close()
+
+
+def test_get_event_time_in_threads(tmp_path):
+  city = City.get_city_from_db(name="Bangalore")
+  jd = 2459107.33
+  expected = city.get_rising_time(julian_day_start=jd, body=Graha.SUN)
+  with rise_set_store.store_in_use(rise_set_store.RiseSetStore(path=str(tmp_path / "rise_set.sqlite"))) as store:
+    assert city.get_rising_time(julian_day_start=jd, body=Graha.SUN) == expected
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+      # Another thread does not use the store - unless it asks for it.
+      assert executor.submit(rise_set_store.get_store).result() is None
+      assert executor.submit(city.get_rising_time, julian_day_start=jd, body=Graha.SUN).result() == expected
+      def get_rising_times():
+        with rise_set_store.store_in_use(store):
+          return [city.get_rising_time(julian_day_start=jd + offset, body=Graha.SUN) for offset in range(3)]
+      assert executor.submit(get_rising_times).result()[0] == expected
+  store.close()
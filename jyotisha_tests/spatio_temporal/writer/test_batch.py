@@ -0,0 +1,27 @@
+from jyotisha.panchaanga.temporal import ComputationSystem
+from jyotisha.panchaanga.writer.generation_project import batch
+
+MANIFEST = """
+cities = ["Delhi", "Mysore"]
+years = [1797, 1799]
+computation_systems = ["MULTI_NEW_MOON_SIDEREAL_MONTH_ADHIKA_AMAANTA__CHITRA_180"]
+"""
+
+
+def test_get_jobs():
+  import toml
+  jobs = batch.get_jobs(manifest=toml.loads(MANIFEST))
+  assert len(jobs) == 6
+  assert jobs[0] == batch.Job(city_name="Delhi", year=1797, year_type="gregorian", computation_system_id="MULTI_NEW_MOON_SIDEREAL_MONTH_ADHIKA_AMAANTA__CHITRA_180", kind=batch.KIND_SUMMARY, overwrite=False)
+  assert batch.get_computation_system(jobs[0].computation_system_id) is ComputationSystem.MULTI_NEW_MOON_SIDEREAL_MONTH_ADHIKA_AMAANTA__CHITRA_180
+
+
+def test_resume(tmp_path):
+  import toml
+  manifest_path = str(tmp_path / "manifest.toml")
+  with open(manifest_path, "w") as manifest_file:
+    manifest_file.write(MANIFEST)
+  with open(manifest_path + ".done", "w") as state_file:
+    for job in batch.get_jobs(manifest=toml.loads(MANIFEST)):
+      state_file.write(batch.get_job_key(job) + "\n")
+  assert batch.run(manifest_path=manifest_path, num_processes=2) == 0
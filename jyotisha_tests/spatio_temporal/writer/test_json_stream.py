@@ -0,0 +1,34 @@
+import json
+import os
+
+from jyotisha.panchaanga.spatio_temporal import periodical
+from jyotisha.panchaanga.temporal import ComputationSystem
+from jyotisha.panchaanga.writer import json_stream
+from jyotisha_tests.spatio_temporal import chennai
+
+TEST_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+
+def test_streams(tmp_path):
+  computation_system = ComputationSystem.read_from_file(filename=os.path.join(TEST_DATA_PATH, "test_computation_system.toml"))
+  panchaanga = periodical.Panchaanga(city=chennai, start_date='2019-02-01', end_date='2019-02-05', computation_system=computation_system)
+  panchaanga.dump_to_file(filename=str(tmp_path / "expected.json"))
+  with open(str(tmp_path / "expected.json")) as expected_file:
+    expected_json_map = json.load(expected_file)
+
+  assert json_stream.get_json_map(panchaanga=panchaanga) == expected_json_map
+  assert json.loads("".join(json_stream.iter_json(panchaanga=panchaanga))) == expected_json_map
+  lines = list(json_stream.iter_ndjson(panchaanga=panchaanga))
+  assert len(lines) == len(panchaanga.date_str_to_panchaanga) + 1
+  header = json.loads(lines[0])
+  assert "date_str_to_panchaanga" not in header and header["city"] == expected_json_map["city"]
+  assert [json.loads(line) for line in lines[1:]] == [expected_json_map["date_str_to_panchaanga"][date_str] for date_str in sorted(expected_json_map["date_str_to_panchaanga"])]
+  assert list(json_stream.iter_ndjson_from_json_map(json_map=expected_json_map)) == lines
+
+  lines = list(json_stream.iter_computed_days_ndjson(city=chennai, start_date='2019-01-20', end_date='2019-03-01', computation_system=computation_system))
+  assert len(lines) == 41 + 1
+  daily_json_map = json.loads(lines[1 + 14])
+  expected_daily_json_map = expected_json_map["date_str_to_panchaanga"]["2019-02-03"]
+  assert daily_json_map["date"] == expected_daily_json_map["date"]
+  assert abs(daily_json_map["jd_sunrise"] - expected_daily_json_map["jd_sunrise"]) < 1e-6
+  assert daily_json_map["sunrise_day_angas"] == expected_daily_json_map["sunrise_day_angas"]
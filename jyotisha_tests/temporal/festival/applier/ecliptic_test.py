@@ -0,0 +1,39 @@
+import copy
+
+import numpy
+
+from jyotisha.panchaanga.spatio_temporal import City, periodical
+from jyotisha.panchaanga.temporal import ComputationSystem
+from jyotisha.panchaanga.temporal.body import Graha, longitude_difference
+from jyotisha.panchaanga.temporal.festival.applier import ecliptic
+from jyotisha.panchaanga.temporal.time import Date
+
+chennai = City.get_city_from_db('Chennai')
+
+
+def test_conjunction_intervals_for_pairs():
+  panchaanga = periodical.Panchaanga(city=chennai, start_date=Date(2020, 3, 20), end_date=Date(2020, 6, 10), computation_system=ComputationSystem.DEFAULT)
+  assigner = ecliptic.EclipticFestivalAssigner(panchaanga=panchaanga)
+  pair_to_delta = {(Graha.MERCURY, Graha.SUN): 14.0, (Graha.MERCURY, Graha.VENUS): 1.0, (Graha.VENUS, Graha.SUN): 10.0}
+  pair_to_intervals = assigner.compute_conjunction_intervals_for_pairs(pair_to_delta=pair_to_delta, jd_start=panchaanga.jd_start, jd_end=panchaanga.jd_end)
+  for (graha1, graha2), delta in pair_to_delta.items():
+    assert pair_to_intervals[(graha1, graha2)] == assigner.compute_conjunction_intervals(graha1, graha2, panchaanga.jd_start, panchaanga.jd_end, delta=delta)
+    (g1, g2) = (Graha.singleton(graha1), Graha.singleton(graha2))
+    for (t_start, t_zero, t_end) in pair_to_intervals[(graha1, graha2)]:
+      assert t_start < t_zero < t_end
+      numpy.testing.assert_allclose([abs(longitude_difference(t, g1, g2)) for t in (t_start, t_zero, t_end)], [delta, 0, delta], atol=1e-6)
+
+  # Mercury's combustion in April-May 2020 begins with Mercury just short of 360 degrees and the sun past 0.
+  [(t_start, t_zero, t_end)] = pair_to_intervals[(Graha.MERCURY, Graha.SUN)]
+  numpy.testing.assert_approx_equal(t_start, 2458961.1518, significant=10)
+  numpy.testing.assert_approx_equal(t_end, 2458986.6736, significant=10)
+
+
+def test_maudhya_and_graha_yuddha_events():
+  computation_system = copy.deepcopy(ComputationSystem.DEFAULT)
+  computation_system.festival_options.set_maudhya_events = True
+  computation_system.festival_options.set_graha_yuddhas = True
+  panchaanga = periodical.Panchaanga(city=chennai, start_date=Date(2020, 3, 20), end_date=Date(2020, 6, 10), computation_system=computation_system)
+  assert panchaanga.festival_id_to_days["budhaH–astamayaH_(prAk)"] == {Date(2020, 4, 21)}
+  assert panchaanga.festival_id_to_days["budhaH–udayaH_(prAk)"] == {Date(2020, 5, 17)}
+  assert panchaanga.festival_id_to_days["graha-yuddhaH_(budhaH–zukraH)"] == {Date(2020, 5, 21)}
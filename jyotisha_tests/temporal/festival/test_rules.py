@@ -1,8 +1,13 @@
+import os
+import shutil
 from pprint import pprint
 
 from sanskrit_data import collection_helper
 
+from jyotisha.panchaanga.temporal import AngaType
+from jyotisha.panchaanga.temporal.body import Graha
 from jyotisha.panchaanga.temporal.festival import rules
+from jyotisha.panchaanga.temporal.zodiac.angas import Anga, Tithi
 
 
 def test_rules_dicts():
@@ -14,3 +19,42 @@ def test_rules_dicts():
 def test_get_url():
   rule_set = rules.RulesCollection.get_cached(repos_tuple=rules.rule_repos)
   assert rule_set.tree[rules.RulesRepo.GREGORIAN_MONTH_DIR][rules.RulesRepo.DAY_DIR]["02"]["09"]["proklas-janma"][collection_helper.LEAVES_KEY][0].get_url() == "https://github.com/jyotisham/adyatithi/blob/master/mahApuruSha/general-indic-tropical/julian/day/02/08/proklas-janma.toml"
+
+
+def test_snapshot(tmp_path):
+  repo_path = str(tmp_path / "test_repo")
+  shutil.copytree(os.path.join(os.path.dirname(__file__), 'data/test_repo'), repo_path)
+  repos = (rules.RulesRepo(name="test_repo", path=repo_path),)
+  snapshot_dir = str(tmp_path / "snapshots")
+  rule_set = rules.RulesCollection.load(repos=repos, julian_handling=None, snapshot_dir=snapshot_dir)
+  snapshot_path = rules.RulesCollection.get_snapshot_path(repos=repos, julian_handling=None, snapshot_dir=snapshot_dir)
+  assert os.path.isfile(snapshot_path)
+
+  loaded_rule_set = rules.RulesCollection.load(repos=repos, julian_handling=None, snapshot_dir=snapshot_dir)
+  assert sorted(loaded_rule_set.name_to_rule.keys()) == sorted(rule_set.name_to_rule.keys())
+  assert loaded_rule_set._month_anga_index == rule_set._month_anga_index
+
+  # Editing a rule invalidates the snapshot.
+  rule_path = os.path.join(repo_path, "taittirIya-utsargaH_paurNamAsyAm.toml")
+  os.utime(rule_path, ns=(os.stat(rule_path).st_atime_ns, os.stat(rule_path).st_mtime_ns + 10**9))
+  new_snapshot_path = rules.RulesCollection.get_snapshot_path(repos=repos, julian_handling=None, snapshot_dir=snapshot_dir)
+  assert new_snapshot_path != snapshot_path
+  # And the stale snapshot goes once a new one is stored.
+  rules.RulesCollection.load(repos=repos, julian_handling=None, snapshot_dir=snapshot_dir)
+  assert os.listdir(snapshot_dir) == [os.path.basename(new_snapshot_path)]
+
+  # Snapshots may be disabled.
+  assert rules.RulesCollection.get_snapshot_path(repos=repos, julian_handling=None, snapshot_dir=False) is None
+  disabled_rule_set = rules.RulesCollection.load(repos=repos, julian_handling=None, snapshot_dir=False)
+  assert sorted(disabled_rule_set.name_to_rule.keys()) == sorted(rule_set.name_to_rule.keys())
+
+
+def test_possibly_relevant_fests():
+  rule_set = rules.RulesCollection.get_cached(repos_tuple=rules.rule_repos)
+  month = Anga.get_cached(index=1, anga_type_id=AngaType.GRAHA_RASHI[Graha.SUN].name)
+  angas = [Tithi(index=15, month=month)]
+  fests = rule_set.get_possibly_relevant_fests(month_type=rules.RulesRepo.LUNAR_MONTH_DIR, month=1, anga_type_id=rules.RulesRepo.TITHI_DIR, angas=angas)
+  assert 'pUrNimA~vratam' in fests
+  # Callers may modify the result - which should not affect later lookups.
+  fests.clear()
+  assert 'pUrNimA~vratam' in rule_set.get_possibly_relevant_fests(month_type=rules.RulesRepo.LUNAR_MONTH_DIR, month=1, anga_type_id=rules.RulesRepo.TITHI_DIR, angas=angas)
@@ -0,0 +1,56 @@
+import concurrent.futures
+import math
+
+import numpy
+
+from jyotisha.panchaanga.spatio_temporal import City
+from jyotisha.panchaanga.temporal import ayanaamsha_curve
+from jyotisha.panchaanga.temporal.ayanaamsha_curve import AyanaamshaCurve
+from jyotisha.panchaanga.temporal.body import Graha
+from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
+
+
+def test_ayanaamsha_curve():
+  curve = AyanaamshaCurve.fit(ayanaamsha_id=Ayanamsha.CHITRA_AT_180, jd_start=2458484.5, jd_end=2458544.5, tolerance=1e-6)
+  assert curve.get_max_error() <= 1e-6
+  jds = 2458484.5 + numpy.arange(0, 60, 0.37)
+  exact_offsets = Ayanamsha.singleton(Ayanamsha.CHITRA_AT_180)._get_exact_offsets(jds)
+  numpy.testing.assert_allclose(curve.get_offsets(jds), exact_offsets, atol=1e-6)
+  numpy.testing.assert_allclose([curve.get_offset(jd) for jd in jds], exact_offsets, atol=1e-6)
+
+
+def test_curves_in_use():
+  jd = 2458500.123
+  moon = Graha.singleton(Graha.MOON)
+  ayanaamsha = Ayanamsha.singleton(Ayanamsha.CHITRA_AT_180)
+  curves = ayanaamsha_curve.get_curves(ayanaamsha_ids=[Ayanamsha.CHITRA_AT_180, Ayanamsha.ASHVINI_STARTING_0], jd_start=2458484.5, jd_end=2458544.5, tolerance=1e-5)
+  assert [curve.ayanaamsha_id for curve in curves] == [Ayanamsha.CHITRA_AT_180]
+  # Built once per process.
+  assert ayanaamsha_curve.get_curves(ayanaamsha_ids=[Ayanamsha.CHITRA_AT_180], jd_start=2458490.5, jd_end=2458500.5, tolerance=1e-5)[0] is curves[0]
+  exact_longitude = moon.get_longitude(jd, ayanaamsha_id=Ayanamsha.CHITRA_AT_180)
+  city = City.get_city_from_db('Chennai')
+  exact_lagna = city.get_lagna_float(jd)
+  with ayanaamsha_curve.curves_in_use(curves):
+    assert ayanaamsha.get_offset(jd) == curves[0].get_offset(jd)
+    assert moon.get_longitude(jd, ayanaamsha_id=Ayanamsha.CHITRA_AT_180) != exact_longitude
+    numpy.testing.assert_allclose(moon.get_longitude(jd, ayanaamsha_id=Ayanamsha.CHITRA_AT_180), exact_longitude, atol=1e-5)
+    numpy.testing.assert_allclose(city.get_lagna_float(jd), exact_lagna, atol=1e-6)
+    # Other threads do not see the curves.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+      assert executor.submit(moon.get_longitude, jd, Ayanamsha.CHITRA_AT_180).result() == exact_longitude
+  assert moon.get_longitude(jd, ayanaamsha_id=Ayanamsha.CHITRA_AT_180) == exact_longitude
+
+
+def test_get_curves_across_blocks():
+  block_days = AyanaamshaCurve.BLOCK_DAYS
+  jd_boundary = math.ceil(2458484.5 / block_days) * block_days
+  [curve] = ayanaamsha_curve.get_curves(ayanaamsha_ids=[Ayanamsha.CHITRA_AT_180], jd_start=jd_boundary - 10, jd_end=jd_boundary + 10, tolerance=1e-5)
+  # Made of the blocks on either side, which other ranges share.
+  [before_curve] = ayanaamsha_curve.get_curves(ayanaamsha_ids=[Ayanamsha.CHITRA_AT_180], jd_start=jd_boundary - 20, jd_end=jd_boundary - 10, tolerance=1e-5)
+  [after_curve] = ayanaamsha_curve.get_curves(ayanaamsha_ids=[Ayanamsha.CHITRA_AT_180], jd_start=jd_boundary + 10, jd_end=jd_boundary + 20, tolerance=1e-5)
+  assert curve.blocks == [before_curve, after_curve]
+  assert curve.covers(jd_boundary - 10) and curve.covers(jd_boundary + 10)
+  jds = jd_boundary + numpy.arange(-10, 10, 0.37)
+  exact_offsets = Ayanamsha.singleton(Ayanamsha.CHITRA_AT_180)._get_exact_offsets(jds)
+  numpy.testing.assert_allclose(curve.get_offsets(jds), exact_offsets, atol=1e-5)
+  numpy.testing.assert_allclose([curve.get_offset(jd) for jd in jds], exact_offsets, atol=1e-5)
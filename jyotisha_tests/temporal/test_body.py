@@ -2,7 +2,7 @@ import logging
 
 import numpy
 
-from jyotisha.panchaanga.temporal import body
+from jyotisha.panchaanga.temporal import body, root_finding
 from jyotisha.panchaanga.temporal.body import Graha, Transit
 from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
 
@@ -29,8 +29,20 @@ def test_graha_get_next_raashi_transit():
   from sanskrit_data import collection_helper
   collection_helper.assert_approx_equals(transits, [
            Transit(body=Graha.JUPITER, jd=2458008.4510242934, anga_type=AngaType.RASHI.name, value_1=6, value_2=7)], floating_point_precision=4)
+  transits = Graha.singleton(Graha.JUPITER).get_transits(jd_start=2457755, jd_end=2458120, anga_type=AngaType.RASHI, ayanaamsha_id=Ayanamsha.CHITRA_AT_180, root_finder=root_finding.NEWTON)
+  numpy.testing.assert_almost_equal(transits[0].jd, 2458008.4510242934, decimal=6)
   assert Graha.singleton(Graha.SUN).get_transits(jd_start=2458162.545722, jd_end=2458177.545722, anga_type=AngaType.RASHI, ayanaamsha_id=Ayanamsha.CHITRA_AT_180) == []
 
 
 def test_get_star_longitude():
   numpy.testing.assert_approx_equal(body.get_star_longitude(star="Spica", jd=2458434.083333251), 204.09485939669307)
+
+
+def test_get_longitudes():
+  jds = 2458434.083333251 + numpy.arange(5) * 0.7
+  for body_name in [Graha.SUN, Graha.MOON, Graha.KETU]:
+    graha = Graha.singleton(body_name)
+    numpy.testing.assert_allclose(graha.get_longitudes(jds=jds, ayanaamsha_id=Ayanamsha.CHITRA_AT_180), [graha.get_longitude(jd=jd, ayanaamsha_id=Ayanamsha.CHITRA_AT_180) for jd in jds])
+  longitudes = body.get_longitudes(body_names=[Graha.SUN, Graha.MOON], jds=jds, ayanaamsha_ids=[None, Ayanamsha.CHITRA_AT_180])
+  assert longitudes.shape == (2, 2, 5)
+  numpy.testing.assert_allclose(longitudes[1, 0], Graha.singleton(Graha.MOON).get_longitudes(jds=jds))
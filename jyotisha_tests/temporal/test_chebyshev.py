@@ -0,0 +1,33 @@
+import concurrent.futures
+
+import numpy
+
+from jyotisha.panchaanga.temporal import chebyshev
+from jyotisha.panchaanga.temporal.body import Graha
+from jyotisha.panchaanga.temporal.chebyshev import LongitudeTable
+from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
+
+
+def test_longitude_table():
+  for body_name in [Graha.SUN, Graha.MOON]:
+    table = LongitudeTable.fit(body_name=body_name, jd_start=2458484.5, jd_end=2458544.5, tolerance=1e-6)
+    assert table.get_max_error() <= 1e-6
+    jds = 2458484.5 + numpy.arange(0, 60, 0.37)
+    swisseph_longitudes = Graha.singleton(body_name)._get_swisseph_longitudes(jds)
+    numpy.testing.assert_allclose(table.get_longitudes(jds), swisseph_longitudes, atol=1e-6)
+    numpy.testing.assert_allclose([table.get_longitude(jd) for jd in jds], swisseph_longitudes, atol=1e-6)
+
+
+def test_tables_in_use():
+  jd = 2458500.123
+  moon = Graha.singleton(Graha.MOON)
+  tables = chebyshev.get_tables(jd_start=2458484.5, jd_end=2458544.5, tolerance=1e-6)
+  with chebyshev.tables_in_use(tables):
+    assert moon.get_longitude(jd) == tables[1].get_longitude(jd)
+    numpy.testing.assert_allclose(moon.get_longitude(jd, ayanaamsha_id=Ayanamsha.CHITRA_AT_180), (tables[1].get_longitude(jd) - Ayanamsha.singleton(Ayanamsha.CHITRA_AT_180).get_offset(jd)) % 360)
+    # Outside the table range
+    numpy.testing.assert_allclose(moon.get_longitude(jd + 1000), moon._get_swisseph_longitudes([jd + 1000])[0])
+    # Other threads do not see the tables.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+      assert executor.submit(moon.get_longitude, jd).result() == moon._get_swisseph_longitudes([jd])[0]
+  assert moon.get_longitude(jd) == moon._get_swisseph_longitudes([jd])[0]
@@ -0,0 +1,24 @@
+import math
+
+import numpy
+import pytest
+
+from jyotisha.panchaanga.temporal import root_finding
+
+
+def test_newton_with_bracket():
+  numpy.testing.assert_almost_equal(root_finding.newton_with_bracket(lambda x: (math.cos(x) - x, -math.sin(x) - 1), 0, 1), 0.7390851332151607, decimal=9)
+  # Newton steps are useless for a step function - should fall back to bisection.
+  numpy.testing.assert_almost_equal(root_finding.newton_with_bracket(lambda x: (-1 if x < 0.3 else 1, 0), 0, 0.9), 0.3, decimal=8)
+  with pytest.raises(ValueError):
+    root_finding.newton_with_bracket(lambda x: (x * x + 1, 2 * x), -1, 1)
+
+
+def test_find_root():
+  def f(x):
+    return x * x - 2
+
+  def f_and_derivative(x):
+    return (x * x - 2, 2 * x)
+  for method in [None, root_finding.BRENTQ, root_finding.NEWTON]:
+    numpy.testing.assert_almost_equal(root_finding.find_root(f, 0, 2, f_and_derivative=f_and_derivative, method=method), math.sqrt(2), decimal=9)
@@ -1,5 +1,5 @@
 import numpy
-from jyotisha.panchaanga.temporal import zodiac, time, Graha
+from jyotisha.panchaanga.temporal import zodiac, time, Graha, root_finding
 from jyotisha.panchaanga.temporal.time import Date
 from jyotisha.panchaanga.temporal.zodiac import NakshatraDivision, Ayanamsha, AngaSpanFinder
 from jyotisha.panchaanga.temporal.zodiac.angas import AngaType
@@ -8,6 +8,7 @@ from jyotisha.panchaanga.temporal.zodiac.angas import AngaType
 def test_get_ayanaamsha():
   ayanaamsha = zodiac.Ayanamsha.singleton(ayanaamsha_id=zodiac.Ayanamsha.CHITRA_AT_180)
   numpy.testing.assert_approx_equal(ayanaamsha.get_offset(2458434.083333251), 24.094859396693067)
+  numpy.testing.assert_allclose(ayanaamsha.get_offsets([2458434.083333251, 2458800.5]), [24.094859396693067, ayanaamsha.get_offset(2458800.5)])
 
 
 def disabled_test_swe_ayanaamsha_api():
@@ -48,6 +49,12 @@ def test_get_anga():
   assert nd.get_anga(AngaType.KARANA).index == 55
   assert nd.get_solar_raashi().index == 9
 
+def test_get_anga_floats():
+  jds = 2444961.7125 + numpy.arange(4) * 0.3
+  for anga_type in [AngaType.TITHI, AngaType.NAKSHATRA, AngaType.YOGA]:
+    numpy.testing.assert_allclose(zodiac.get_anga_floats(jds=jds, ayanaamsha_id=Ayanamsha.CHITRA_AT_180, anga_type=anga_type), [NakshatraDivision(jd, ayanaamsha_id=Ayanamsha.CHITRA_AT_180).get_anga_float(anga_type=anga_type) for jd in jds])
+
+
 def test_get_anga_span_solar_month():
   from jyotisha.panchaanga.temporal import time
   span_finder = AngaSpanFinder.get_cached(anga_type=AngaType.GRAHA_RASHI[Graha.SUN], ayanaamsha_id=Ayanamsha.CHITRA_AT_180)
@@ -67,6 +74,9 @@ def test_get_anga_span_tithi():
 
   numpy.testing.assert_array_almost_equal(span_finder.find(jd1=2444959.54042, jd2=2444963.54076, target_anga_id=27).to_tuple(), (2444960.4924699212, 2444961.599213224))
 
+  span_finder = AngaSpanFinder.get_cached(anga_type=AngaType.TITHI, ayanaamsha_id=Ayanamsha.CHITRA_AT_180, root_finder=root_finding.NEWTON)
+  numpy.testing.assert_array_almost_equal(span_finder.find(jd1=2458102.5, jd2=2458108.5, target_anga_id=30).to_tuple(), (2458104.6663699686, 2458105.771125107))
+
 
 def test_get_tithis_in_period():
   span_finder = AngaSpanFinder.get_cached(anga_type=AngaType.TITHI, ayanaamsha_id=Ayanamsha.ASHVINI_STARTING_0)
@@ -91,6 +101,18 @@ def test_get_solarrashis_in_period():
 
 
 
+def test_anga_timeline():
+  timeline = zodiac.AngaTimeline(ayanaamsha_id=Ayanamsha.CHITRA_AT_180, anga_type=AngaType.NAKSHATRA, jd_start=2458484.5, jd_end=2458514.5)
+  span_finder = AngaSpanFinder.get_cached(anga_type=AngaType.NAKSHATRA, ayanaamsha_id=Ayanamsha.CHITRA_AT_180)
+  for jd1 in [2458485.54, 2458490.53, 2458500.1]:
+    expected_spans = span_finder.get_all_angas_in_period(jd1=jd1, jd2=jd1 + 1)
+    spans = timeline.get_all_angas_in_period(jd1=jd1, jd2=jd1 + 1)
+    assert [span.anga for span in spans] == [span.anga for span in expected_spans]
+    assert spans[0].jd_start is None and spans[-1].jd_end is None
+    numpy.testing.assert_array_almost_equal([span.jd_end for span in spans[:-1]], [span.jd_end for span in expected_spans[:-1]])
+  assert not timeline.covers(jd1=2458510.5, jd2=2458515.5)
+
+
 def test_get_karanas_in_period():
   span_finder = AngaSpanFinder.get_cached(anga_type=AngaType.KARANA, ayanaamsha_id=Ayanamsha.ASHVINI_STARTING_0)
   spans = span_finder.get_spans_in_period(jd_start=time.ist_timezone.local_time_to_julian_day(Date(year=2020, month=1, day=1)), jd_end=time.ist_timezone.local_time_to_julian_day(Date(year=2020, month=6, day=30)), target_anga_id=30)
@@ -117,3 +139,22 @@ def test_get_previous_solstice():
   solstice = zodiac.get_previous_solstice_month_span(jd=time.ist_timezone.local_time_to_julian_day(Date(2018, 7, 14)))
   expected_jd_start = time.ist_timezone.local_time_to_julian_day(date=Date(year=2018, month=6, day=20, hour=21, minute=44))
   numpy.testing.assert_approx_equal(solstice.jd_start, expected_jd_start, significant=4)
+
+
+def test_get_all_angas_at_jds():
+  jds = 2444961.7125 + numpy.arange(10) * 0.37
+  all_angas = zodiac.get_all_angas_at_jds(jds=jds, ayanaamsha_id=Ayanamsha.CHITRA_AT_180)
+  assert len(all_angas) == len(jds)
+  for jd, angas in zip(jds, all_angas):
+    nd = NakshatraDivision(jd, ayanaamsha_id=Ayanamsha.CHITRA_AT_180)
+    assert sorted(angas.keys()) == sorted(anga_type.name for anga_type in zodiac.ALL_ANGA_TYPES)
+    for anga_type in zodiac.ALL_ANGA_TYPES:
+      assert angas[anga_type.name] == nd.get_anga(anga_type=anga_type)
+
+
+def test_get_all_angas_at_jds_with_ayanaamsha_curve():
+  jds = 2444961.7125 + numpy.arange(10) * 0.37
+  all_angas = zodiac.get_all_angas_at_jds(jds=jds, ayanaamsha_id=Ayanamsha.CHITRA_AT_180, ayanaamsha_curve_tolerance=1e-5)
+  assert all_angas == zodiac.get_all_angas_at_jds(jds=jds, ayanaamsha_id=Ayanamsha.CHITRA_AT_180)
+  # The curve is only used within the batch.
+  assert zodiac.get_ayanaamsha_curves() == {}